@@ -0,0 +1 @@
+"""Capa de datos y analítica del DSS de V&V Corporación."""
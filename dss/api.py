@@ -0,0 +1,289 @@
+"""API HTTP de datos en JSON para el dashboard Next.js.
+
+Sirve los endpoints que espera ``lib/data-integration.ts``
+(``/api/projects``, ``/api/clients``, ``/api/kpis``, ``/api/service-areas`` y
+``/health``) a partir de las mismas funciones de carga que usa la aplicación:
+embebida en ``streamlit_app.py`` (``DSS_API_PORT``) lee las columnas ya
+cacheadas por las sesiones; como proceso aparte lee del almacenamiento
+configurado, con los cambios de ``dss.deltas`` ya fusionados::
+
+    python -m dss.api --port 8502
+
+Cada respuesta lleva un ETag derivado de la versión de los datos y de la
+consulta, de modo que un dashboard que consulta periódicamente recibe
+``304 Not Modified`` sin que se lea ni se serialice nada mientras los datos no
+cambien. Las respuestas se comprimen con gzip, y las tablas admiten
+``fields=`` (proyección de columnas), ``limit=`` y ``offset=``.
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+import pandas as pd
+
+# Endpoint -> (dataset, clave de la lista en la respuesta). "client_table" es la
+# tabla de clientes con los totales derivados de sus proyectos (ver ClientJoin.table)
+TABLE_ENDPOINTS = {
+    "/api/projects": ("projects", "projects"),
+    "/api/clients": ("client_table", "clients"),
+    "/api/service-areas": ("service_areas", "serviceAreas"),
+}
+KPI_ENDPOINT = "/api/kpis"
+HEALTH_ENDPOINT = "/health"
+
+DEFAULT_LIMIT = 1_000
+MAX_LIMIT = 50_000
+
+# Respuestas más chicas que esto no se comprimen
+GZIP_MIN_BYTES = 1_024
+
+# Respuestas ya codificadas que se conservan por (ETag, codificación)
+BODY_CACHE_ENTRIES = 128
+
+
+def _version_text(version):
+    """Flatten a (possibly nested) version tuple into a string"""
+    if isinstance(version, tuple):
+        return "|".join(_version_text(part) for part in version)
+    return str(version)
+
+
+class ApiError(Exception):
+    """Client error reported as a JSON body with an HTTP status"""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class DataApi:
+    """Builds versioned JSON responses from dataset loader callables.
+
+    ``frame(name, columns)`` returns a dataset (optionally projected),
+    ``version(name)`` its current version token, ``columns(name)`` its column
+    names, ``kpis()`` the KPI dictionary and ``kpis_version()`` the token of
+    the data the KPIs derive from.
+    """
+
+    def __init__(self, frame, version, columns, kpis, kpis_version, api_key=None, cors_origin="*"):
+        self.frame = frame
+        self.version = version
+        self.columns = columns
+        self.kpis = kpis
+        self.kpis_version = kpis_version
+        self.api_key = api_key
+        self.cors_origin = cors_origin
+        self._bodies = OrderedDict()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_store(cls, store, **kwargs):
+        """Build an API over a ``dss.storage`` store, keeping the latest version of each dataset in memory"""
+        from dss import deltas, indexes, kpis as kpi_engine, storage
+
+        frames = {}
+        logs = {}
+        # Reentrante: la tabla de clientes se arma leyendo proyectos y clientes
+        lock = threading.RLock()
+
+        def version(name):
+            if name == "projects":
+                return store.version(name), deltas.delta_version(deltas.default_delta_dir())
+            if name == "client_table":
+                return version("projects"), store.version("clients")
+            return store.version(name)
+
+        def read(name, current):
+            if name == "client_table":
+                join = indexes.ClientJoin(frame("projects"), frame("clients", ["name"]))
+                return join.table(frame("clients"))
+            if name != "projects":
+                return store.read(name)
+            # Archivo base (leído una vez por versión) más los deltas fusionados
+            log = logs.get(current[0])
+            if log is None:
+                base = storage.read_only(store.read(name))
+                logs.clear()
+                log = logs[current[0]] = deltas.DeltaLog(base.__getitem__, base.columns)
+            snapshot = log.sync(deltas.default_delta_dir(), current[1])
+            return pd.DataFrame({column: log.column(column, snapshot.id) for column in log.columns}, copy=False)
+
+        def frame(name, columns=None):
+            current = version(name)
+            with lock:
+                cached = frames.get(name)
+                if cached is None or cached[0] != current:
+                    cached = frames[name] = (current, read(name, current))
+            return cached[1][list(columns)] if columns else cached[1]
+
+        def columns(name):
+            return list(frame(name).columns) if name == "client_table" else store.columns(name)
+
+        def kpis_version():
+            return tuple(version(name) for name in ("projects", "clients", "monthly_revenue"))
+
+        def kpis():
+            revenue = frame("monthly_revenue", ["month", "revenue"])
+            engine = kpi_engine.KpiEngine(projects=frame("projects"), clients=frame("clients"))
+            engine.add_revenue(revenue["month"], revenue["revenue"])
+            return engine.snapshot()
+
+        return cls(frame, version, columns, kpis, kpis_version, **kwargs)
+
+    # Respuestas
+
+    @staticmethod
+    def _etag(path, version, params):
+        query = "&".join(f"{key}={','.join(params[key])}" for key in sorted(params))
+        digest = hashlib.sha1(f"{path}|{version}|{query}".encode("utf-8")).hexdigest()[:20]
+        # Débil: el mismo contenido se envía con o sin gzip
+        return f'W/"{digest}"'
+
+    @staticmethod
+    def _int_param(params, key, default, minimum, maximum):
+        try:
+            value = int(params[key][0]) if key in params else default
+        except ValueError:
+            raise ApiError(400, f"'{key}' must be an integer")
+        return min(max(value, minimum), maximum)
+
+    def _table_body(self, name, key, params, version):
+        columns = None
+        if "fields" in params:
+            columns = [field for value in params["fields"] for field in value.split(",") if field]
+            available = set(self.columns(name))
+            unknown = [field for field in columns if field not in available]
+            if unknown:
+                raise ApiError(400, f"Unknown fields: {', '.join(unknown)}")
+        limit = self._int_param(params, "limit", DEFAULT_LIMIT, 0, MAX_LIMIT)
+        offset = self._int_param(params, "offset", 0, 0, 2 ** 62)
+        df = self.frame(name, columns)
+        page = df.iloc[offset:offset + limit]
+        for column in page.columns[page.dtypes == np.float32]:
+            # Representación más corta de cada float32 (92.9 y no 92.9000015259)
+            page = page.assign(**{column: page[column].astype(str).astype(np.float64)})
+        # pandas serializa las filas en C; el sobre se arma alrededor
+        records = page.to_json(orient="records", date_format="iso", date_unit="s", force_ascii=False)
+        return (
+            f'{{"{key}":{records},"total":{len(df)},"offset":{offset},"limit":{limit},'
+            f'"version":{json.dumps(version)}}}'
+        )
+
+    def respond(self, path, query, headers):
+        """Return ``(status, headers, body)`` for a GET request"""
+        base = {"Access-Control-Allow-Origin": self.cors_origin, "Vary": "Accept-Encoding"} if self.cors_origin \
+            else {"Vary": "Accept-Encoding"}
+        if path == HEALTH_ENDPOINT:
+            return 200, {**base, "Content-Type": "application/json"}, b'{"status":"ok"}'
+        if self.api_key and headers.get("Authorization") != f"Bearer {self.api_key}":
+            return self._error(401, "Unauthorized", base)
+        if path != KPI_ENDPOINT and path not in TABLE_ENDPOINTS:
+            return self._error(404, f"Unknown endpoint: {path}", base)
+
+        params = parse_qs(query)
+        try:
+            if path == KPI_ENDPOINT:
+                version = self.kpis_version()
+            else:
+                version = self.version(TABLE_ENDPOINTS[path][0])
+            version = _version_text(version)
+            etag = self._etag(path, version, params)
+            base.update({"ETag": etag, "Cache-Control": "no-cache"})
+            # Sin cambios en los datos: no se lee ni se serializa nada
+            if_none_match = [tag.strip() for tag in headers.get("If-None-Match", "").split(",")]
+            if etag in if_none_match or "*" in if_none_match:
+                return 304, base, b""
+
+            use_gzip = "gzip" in headers.get("Accept-Encoding", "")
+            with self._lock:
+                cached = self._bodies.get((etag, use_gzip))
+                if cached is not None:
+                    self._bodies.move_to_end((etag, use_gzip))
+            if cached is None:
+                if path == KPI_ENDPOINT:
+                    body = json.dumps({**self.kpis(), "version": version})
+                else:
+                    body = self._table_body(*TABLE_ENDPOINTS[path], params, version)
+                cached = body.encode("utf-8")
+                if use_gzip and len(cached) >= GZIP_MIN_BYTES:
+                    cached = gzip.compress(cached, compresslevel=5)
+                with self._lock:
+                    self._bodies[(etag, use_gzip)] = cached
+                    while len(self._bodies) > BODY_CACHE_ENTRIES:
+                        self._bodies.popitem(last=False)
+        except ApiError as e:
+            return self._error(e.status, str(e), base)
+        except Exception as e:
+            return self._error(500, f"Error loading data: {e}", base)
+
+        headers_out = {**base, "Content-Type": "application/json; charset=utf-8"}
+        if cached[:2] == b"\x1f\x8b":
+            headers_out["Content-Encoding"] = "gzip"
+        return 200, headers_out, cached
+
+    @staticmethod
+    def _error(status, message, base):
+        body = json.dumps({"error": message}).encode("utf-8")
+        return status, {**base, "Content-Type": "application/json; charset=utf-8"}, body
+
+    # Servidor
+
+    def serve(self, port, host="127.0.0.1"):
+        """Serve the API on ``host:port`` from a daemon thread; returns the server"""
+        api = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                url = urlsplit(self.path)
+                status, headers, body = api.respond(url.path.rstrip("/") or "/", url.query, self.headers)
+                self.send_response(status)
+                for key, value in headers.items():
+                    self.send_header(key, value)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_OPTIONS(self):
+                self.send_response(204)
+                if api.cors_origin:
+                    self.send_header("Access-Control-Allow-Origin", api.cors_origin)
+                    self.send_header("Access-Control-Allow-Headers", "Authorization, Content-Type, If-None-Match")
+                    self.send_header("Access-Control-Expose-Headers", "ETag")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            def log_message(self, format, *args):
+                pass
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, name="dss-api", daemon=True).start()
+        return server
+
+
+if __name__ == "__main__":
+    from dss import storage
+
+    parser = argparse.ArgumentParser(description="Sirve la API JSON de datos del DSS")
+    parser.add_argument("--host", default=os.environ.get("DSS_API_HOST", "127.0.0.1"))
+    parser.add_argument("--port", type=int, default=int(os.environ.get("DSS_API_PORT", 8502)))
+    args = parser.parse_args()
+
+    api = DataApi.from_store(storage.open_store(), api_key=os.environ.get("DSS_API_KEY"),
+                             cors_origin=os.environ.get("DSS_API_CORS_ORIGIN", "*"))
+    server = api.serve(args.port, args.host)
+    print(f"API en http://{args.host}:{args.port}", flush=True)
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -0,0 +1,309 @@
+"""Benchmark de las rutas críticas sobre carteras sintéticas de distinto tamaño.
+
+Para cada tamaño se genera una cartera con ``dss.synthetic`` y se mide:
+
+* componentes: lectura de cada dataset, construcción de índices, del cubo,
+  del join proyecto → cliente y del modelo de riesgo, fusión de un archivo de
+  deltas y actualización incremental del cubo, del join y del modelo de
+  riesgo, filtros de proyectos, agregados de métricas, KPIs, ranking de
+  proyectos en riesgo, exportación a cada formato y construcción de cada
+  gráfico (mediana y mínimo de ``--repeat`` repeticiones);
+* aplicación: la primera ejecución y los reruns de cada módulo de
+  ``streamlit_app.py``, ejecutado sin navegador con ``AppTest``, más el rerun
+  tras cambiar un filtro de proyectos y el orden de la tabla de clientes.
+
+El resultado se escribe como JSON. Con ``--baseline`` se compara contra una
+corrida anterior y el proceso termina con código 1 si alguna medición empeora
+más que ``--threshold``::
+
+    python -m dss.benchmark --rows 1000 100000 1000000 --out bench.json
+    python -m dss.benchmark --rows 1000 100000 --baseline bench.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, datetime
+
+import numpy as np
+import pandas as pd
+
+from dss import charts, cube, deltas, export, forecast, indexes, kpis, ledger, risk, storage, synthetic
+
+APP_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "streamlit_app.py")
+
+MODULES = ["Dashboard Principal", "Análisis de Proyectos", "Análisis de Clientes", "Áreas de Servicio", "Reportes Avanzados"]
+
+# Período global por defecto de la aplicación
+PERIOD = (date(2023, 1, 1), date(2023, 6, 30))
+
+# Cambios de widget medidos dentro de cada módulo: (medición, etiqueta, valores alternados)
+WIDGET_CHANGES = {
+    "Análisis de Proyectos": ("filter_rerun", "Estado:", ["En Progreso", "Todos"]),
+    "Análisis de Clientes": ("sort_rerun", "Ordenar por:", ["total_revenue", "Orden original"]),
+}
+
+# Mediciones por debajo de este piso no se comparan (ruido del reloj)
+MIN_COMPARE_SECONDS = 0.005
+
+
+def filter_cases(clients):
+    """Return the project filter combinations timed by the component benchmark"""
+    return {
+        "todos": {},
+        "estado": {"status": "En Progreso"},
+        "estado_area": {"status": "En Progreso", "area": synthetic.AREAS[0]},
+        # El primer cliente es el de más proyectos en la distribución sintética
+        "cliente": {"client": str(clients["name"].iloc[0])},
+    }
+
+
+def measure(func, repeat, setup=None):
+    """Run ``func`` ``repeat`` times and return its median and minimum wall time in seconds.
+
+    With ``setup``, each run times ``func(setup())`` and excludes the setup.
+    """
+    times = []
+    for _ in range(repeat):
+        args = (setup(),) if setup else ()
+        started = time.perf_counter()
+        func(*args)
+        times.append(time.perf_counter() - started)
+    return {"median": round(statistics.median(times), 6), "min": round(min(times), 6)}
+
+
+def bench_components(data_dir, repeat):
+    """Time loaders, indexes, filters, aggregates, exports and figure builds directly on the dss modules"""
+    store = storage.ArrowStore(data_dir)
+    results = {}
+    frames = {}
+    for name in storage.DATASETS:
+        results[f"load:{name}"] = measure(lambda: frames.__setitem__(name, store.read(name)), repeat)
+    projects, clients, areas = frames["projects"], frames["clients"], frames["service_areas"]
+
+    ledger_dir = os.path.join(data_dir, synthetic.LEDGER_DIR)
+    if ledger.ledger_files(ledger_dir):
+        results["load:ledger"] = measure(lambda: ledger.LedgerBuckets(ledger_dir, persist=False).sync(), repeat)
+
+    built = {}
+    results["index:period"] = measure(
+        lambda: built.__setitem__("period", indexes.IntervalIndex(projects["start_date"], projects["end_date"])), repeat)
+    results["index:category"] = measure(
+        lambda: built.__setitem__("category", indexes.CategoryIndex(projects, ["status", "area", "client"])), repeat)
+    results["index:cube"] = measure(lambda: built.__setitem__("cube", cube.AggregateCube(projects)), repeat)
+    results["index:client_join"] = measure(
+        lambda: built.__setitem__("client_join", indexes.ClientJoin(projects, clients)), repeat)
+    results["index:risk"] = measure(lambda: built.__setitem__("risk", risk.RiskModel(projects)), repeat)
+
+    delta_dir = os.path.join(data_dir, synthetic.DELTA_DIR)
+    if deltas.delta_files(delta_dir):
+        base = storage.read_only(projects)
+        results["delta:id_index"] = measure(lambda: deltas.DeltaLog(base.__getitem__, base.columns).id_index(), repeat)
+
+        def new_log():
+            log = deltas.DeltaLog(base.__getitem__, base.columns)
+            log.id_index()
+            return log
+
+        results["delta:merge"] = measure(lambda log: log.sync(delta_dir), repeat, setup=new_log)
+        log = deltas.DeltaLog(base.__getitem__, base.columns)
+        snapshot = log.sync(delta_dir)
+        rows = np.unique(np.concatenate(list(snapshot.changes.values())))
+        old = {m: log.values(m, 0, rows) for m in cube.MEASURES}
+        new = {m: log.values(m, snapshot.id, rows) for m in cube.MEASURES}
+        results["delta:cube_update"] = measure(lambda: built["cube"].updated(rows, new), repeat)
+        results["delta:client_join_update"] = measure(lambda: built["client_join"].updated(rows, old, new), repeat)
+        results["delta:risk_update"] = measure(lambda: built["risk"].updated(rows, new), repeat)
+
+    start, end = PERIOD
+    filtered = {}
+    for case, filters in filter_cases(clients).items():
+        def select(filters=filters, case=case):
+            rows = built["category"].select(filters, rows=built["period"].overlapping(start, end))
+            filtered[case] = projects.iloc[rows]
+        results[f"filter:{case}"] = measure(select, repeat)
+        results[f"aggregate:{case}"] = measure(lambda filters=filters: built["cube"].totals(filters, start, end), repeat)
+    results["aggregate:kpis"] = measure(lambda: kpis.KpiEngine(projects=projects, clients=clients).snapshot(), repeat)
+    results["aggregate:risk_ranking"] = measure(lambda: built["risk"].ranked(built["period"].overlapping(start, end)), repeat)
+
+    # Exportación por bloques de los proyectos del período a cada formato
+    period_rows = built["period"].overlapping(start, end)
+    for fmt in export.FORMATS:
+        results[f"export:{fmt.lower()}"] = measure(
+            lambda fmt=fmt: export.export(export.iter_batches(projects, period_rows), fmt).close(), repeat)
+
+    monthly = frames["monthly_revenue"]
+    monthly = pd.DataFrame({"Mes": monthly["month"], "Ingresos": monthly["revenue"]})
+    yearly = frames["yearly_summary"]
+    yearly = pd.DataFrame({"Año": yearly["year"], "Ingresos": yearly["revenue"], "Clientes": yearly["clients"]})
+    result = forecast.forecast(np.vstack([yearly["Ingresos"].to_numpy(dtype=float)]), 3)
+    projection = pd.DataFrame({
+        "Año": int(yearly["Año"].iloc[-1]) + np.arange(1, 4),
+        "Ingresos_Proyectados": result["mean"][0],
+        "Ingresos_Min": result["lower"][0],
+        "Ingresos_Max": result["upper"][0],
+    })
+    ranked = built["risk"].ranked(built["period"].overlapping(start, end), limit=None)[0]
+    at_risk = pd.concat([projects.iloc[ranked].reset_index(drop=True), built["risk"].scores(ranked)], axis=1)
+    figures = {
+        "project_progress_bar": lambda: charts.build_project_progress_bar(filtered["todos"]),
+        "budget_scatter": lambda: charts.build_budget_scatter(filtered["todos"], at_risk),
+        "area_revenue_pie": lambda: charts.build_area_revenue_pie(areas),
+        "monthly_revenue_line": lambda: charts.build_monthly_revenue_line(monthly),
+        "client_revenue_bar": lambda: charts.build_client_revenue_bar(clients),
+        "client_satisfaction_scatter": lambda: charts.build_client_satisfaction_scatter(clients),
+        "area_revenue_bar": lambda: charts.build_area_revenue_bar(areas),
+        "area_efficiency_scatter": lambda: charts.build_area_efficiency_scatter(areas),
+        "yearly_revenue_area": lambda: charts.build_yearly_revenue_area(yearly),
+        "yearly_clients_line": lambda: charts.build_yearly_clients_line(yearly),
+        "growth_projection": lambda: charts.build_growth_projection(yearly, projection),
+    }
+    for name, build in figures.items():
+        results[f"figure:{name}"] = measure(build, repeat)
+    return results
+
+
+def _widget(at, label):
+    return next(widget for widget in at.selectbox if widget.label == label)
+
+
+def _timed_run(at):
+    started = time.perf_counter()
+    at.run()
+    elapsed = time.perf_counter() - started
+    errors = [element.value for element in at.error] + [str(element.value) for element in at.exception]
+    if errors:
+        raise RuntimeError(f"La aplicación mostró errores: {errors}")
+    return elapsed
+
+
+def bench_app(data_dir, repeat, timeout=600):
+    """Run streamlit_app.py headlessly with AppTest against ``data_dir`` and time every module"""
+    import streamlit as st
+    from streamlit.testing.v1 import AppTest
+
+    from dss import startup
+
+    os.environ["DSS_DATA_DIR"] = data_dir
+    # Las cachés de proceso guardan el almacén abierto con el directorio anterior
+    st.cache_resource.clear()
+    st.cache_data.clear()
+    startup.PROFILE = startup.StartupProfile()
+
+    results = {}
+    for module in MODULES:
+        at = AppTest.from_file(APP_PATH, default_timeout=timeout)
+        at.run()
+        _widget(at, "Seleccionar módulo:").select(module)
+        first = _timed_run(at)
+        reruns = [_timed_run(at) for _ in range(repeat)]
+        results[f"module:{module}"] = {"first": round(first, 6), "median": round(statistics.median(reruns), 6),
+                                       "min": round(min(reruns), 6)}
+
+        if module in WIDGET_CHANGES:
+            name, label, values = WIDGET_CHANGES[module]
+            times = []
+            for i in range(repeat):
+                _widget(at, label).select(values[i % 2])
+                times.append(_timed_run(at))
+            results[f"{name}:{module}"] = {"median": round(statistics.median(times), 6), "min": round(min(times), 6)}
+
+    # Primera carga de cada fuente y primera construcción de cada gráfico dentro de la aplicación
+    for name, seconds in startup.PROFILE.loaders.items():
+        results[f"app_{name}"] = {"first": round(seconds, 6)}
+    return results
+
+
+def run(sizes, seed=0, repeat=5, ledger_ratio=0.0, app=True, work_dir=None, delta_ratio=0.01):
+    """Benchmark every size and return the JSON-serializable report"""
+    report = {
+        "meta": {
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "pandas": pd.__version__,
+            "numpy": np.__version__,
+            "seed": seed,
+            "repeat": repeat,
+        },
+        "results": [],
+    }
+    for rows in sizes:
+        with tempfile.TemporaryDirectory(dir=work_dir) as data_dir:
+            started = time.perf_counter()
+            synthetic.write_synthetic(data_dir, rows, seed, int(rows * ledger_ratio), int(rows * delta_ratio))
+            entry = {
+                "rows": rows,
+                "clients": synthetic.client_count(rows),
+                "ledger_rows": int(rows * ledger_ratio),
+                "delta_rows": int(rows * delta_ratio),
+                "generate_seconds": round(time.perf_counter() - started, 3),
+                "components": bench_components(data_dir, repeat),
+            }
+            if app:
+                entry["app"] = bench_app(data_dir, repeat)
+            report["results"].append(entry)
+            print(f"{rows:>10,} filas: listo", file=sys.stderr, flush=True)
+    return report
+
+
+def compare(report, baseline, threshold=1.25):
+    """Return the measurements of ``report`` slower than ``threshold`` × ``baseline`` (by median or first run)"""
+    previous = {entry["rows"]: entry for entry in baseline["results"]}
+    regressions = []
+    for entry in report["results"]:
+        before = previous.get(entry["rows"])
+        if before is None:
+            continue
+        for section in ("components", "app"):
+            for name, timing in entry.get(section, {}).items():
+                old = before.get(section, {}).get(name)
+                if old is None:
+                    continue
+                for stat in ("median", "first"):
+                    if stat in timing and stat in old and old[stat] >= MIN_COMPARE_SECONDS \
+                            and timing[stat] > old[stat] * threshold:
+                        regressions.append({
+                            "rows": entry["rows"], "name": name, "stat": stat,
+                            "baseline": old[stat], "current": timing[stat],
+                            "ratio": round(timing[stat] / old[stat], 2),
+                        })
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark de las rutas críticas sobre carteras sintéticas")
+    parser.add_argument("--rows", type=int, nargs="+", default=[1_000, 100_000], help="tamaños de cartera (proyectos)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--ledger-ratio", type=float, default=0.0, help="líneas del libro por proyecto (0: sin libro)")
+    parser.add_argument("--delta-ratio", type=float, default=0.01, help="proyectos con cambios en el archivo de deltas (0: sin deltas)")
+    parser.add_argument("--no-app", action="store_true", help="medir solo los componentes, sin AppTest")
+    parser.add_argument("--work-dir", default=None, help="directorio para los datos temporales")
+    parser.add_argument("--out", default=None, help="archivo JSON de salida (por defecto, salida estándar)")
+    parser.add_argument("--baseline", default=None, help="JSON de una corrida anterior para detectar regresiones")
+    parser.add_argument("--threshold", type=float, default=1.25)
+    args = parser.parse_args()
+
+    # El refresco en segundo plano no debe competir con las mediciones
+    os.environ.setdefault("DSS_REFRESH_SECONDS", "3600")
+    report = run(args.rows, args.seed, args.repeat, args.ledger_ratio, not args.no_app, args.work_dir, args.delta_ratio)
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as fh:
+            report["regressions"] = compare(report, json.load(fh), args.threshold)
+    output = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as fh:
+            fh.write(output + "\n")
+    else:
+        print(output)
+    if report.get("regressions"):
+        for item in report["regressions"]:
+            print(f"regresión: {item['rows']:,} filas {item['name']} ({item['stat']}) "
+                  f"{item['baseline'] * 1000:.1f} ms -> {item['current'] * 1000:.1f} ms", file=sys.stderr)
+        sys.exit(1)
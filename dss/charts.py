@@ -0,0 +1,521 @@
+"""Construcción de los gráficos Plotly del DSS y caché de figuras.
+
+Cada gráfico se construye en una función ``build_*`` a partir de su DataFrame.
+``FigureCache`` guarda las figuras ya construidas por (gráfico, versión de
+datos, estado de filtros) con desalojo LRU y un presupuesto de memoria estimado
+sobre sus arreglos de datos, de modo que un rerun que no cambia los datos de un
+gráfico no vuelve a ejecutar ``px.*`` ni las llamadas ``update_*``: un acierto
+devuelve la misma figura, sin reconstruirla ni serializarla. Las figuras en caché se comparten
+entre sesiones: quien necesite modificar una debe copiarla (``go.Figure(fig)``).
+
+``plotly.express`` se importa dentro de cada ``build_*`` y no al cargar el
+módulo: es el import más caro de la aplicación después de Streamlit y pandas,
+y solo hace falta cuando una figura no está en caché.
+"""
+
+import sys
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+from plotly.colors import qualitative
+
+# Umbrales del modo de datos grandes para los gráficos de dispersión
+SVG_MAX_POINTS = 2_000
+WEBGL_MAX_POINTS = 50_000
+# Máximo de celdas (puntos) enviadas en modo densidad, sumando todos los grupos
+DENSITY_MAX_CELLS = 12_000
+# Proyectos en riesgo marcados uno a uno (los de mayor sobrecosto, como la lista por defecto)
+RISK_RING_MAX = 50
+# Celdas de proyectos en riesgo enviadas en modo densidad
+RISK_MAX_CELLS = 1_000
+
+
+# Propiedades de traza que llevan los datos; el resto de la figura pesa poco
+DATA_PROPERTIES = ("x", "y", "z", "customdata", "text", "hovertext", "labels", "values", "marker.size", "marker.color")
+
+
+def figure_bytes(fig):
+    """Estimate the memory held by the data arrays of ``fig`` without serializing it"""
+    total = 0
+    for trace in fig.data:
+        for prop in DATA_PROPERTIES:
+            if prop not in trace or trace[prop] is None or isinstance(trace[prop], str):
+                continue
+            values = np.asarray(trace[prop])
+            total += values.nbytes
+            if values.dtype == object:
+                total += sum(map(sys.getsizeof, values.ravel()))
+    return total
+
+
+class FigureCache:
+    """LRU cache of built figures bounded by entry count and by the size of their data arrays.
+
+    Cached figures are shared across sessions and returned as is: callers
+    must not mutate them.
+    """
+
+    def __init__(self, max_bytes=64 * 1024 * 1024, max_entries=512):
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_build(self, key, builder):
+        """Return the cached figure for ``key``, building it with ``builder()`` on a miss"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+        fig = builder()
+        size = figure_bytes(fig)
+        with self._lock:
+            if key not in self._entries and size <= self.max_bytes:
+                self._entries[key] = (fig, size)
+                self.bytes += size
+                # Desalojar las figuras menos usadas hasta respetar el presupuesto
+                while self.bytes > self.max_bytes or len(self._entries) > self.max_entries:
+                    _, (_, evicted) = self._entries.popitem(last=False)
+                    self.bytes -= evicted
+        return fig
+
+    def clear(self):
+        """Drop every cached figure"""
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+
+def scatter_mode(n):
+    """Return ``"svg"``, ``"webgl"`` or ``"density"`` for a scatter of ``n`` points"""
+    if n <= SVG_MAX_POINTS:
+        return "svg"
+    if n <= WEBGL_MAX_POINTS:
+        return "webgl"
+    return "density"
+
+
+def bin_points(df, x, y, color, size=None, max_cells=DENSITY_MAX_CELLS):
+    """Aggregate points into a per-group grid: one row per non-empty cell.
+
+    Each cell carries its point count and the mean ``x``/``y`` (and ``size``)
+    of the points it holds, so the result size is bounded by ``max_cells``
+    regardless of the number of input rows.
+    """
+    groups, labels = pd.factorize(df[color], sort=True)
+    xs = df[x].to_numpy(dtype=np.float64)
+    ys = df[y].to_numpy(dtype=np.float64)
+    bins = max(10, int(np.sqrt(max_cells / max(len(labels), 1))))
+
+    def _bin(values):
+        lo, hi = np.nanmin(values), np.nanmax(values)
+        scaled = (values - lo) / (hi - lo) if hi > lo else np.zeros_like(values)
+        return np.clip((scaled * bins).astype(np.int64), 0, bins - 1)
+
+    key = (groups.astype(np.int64) * bins + _bin(xs)) * bins + _bin(ys)
+    cells, inverse = np.unique(key, return_inverse=True)
+    counts = np.bincount(inverse)
+    result = pd.DataFrame({
+        color: np.asarray(labels)[cells // (bins * bins)],
+        x: np.bincount(inverse, weights=xs) / counts,
+        y: np.bincount(inverse, weights=ys) / counts,
+        "count": counts
+    })
+    if size is not None:
+        result[size] = np.bincount(inverse, weights=df[size].to_numpy(dtype=np.float64)) / counts
+    return result
+
+
+def build_density_scatter(df, x, y, color, title, x_title, y_title):
+    """Build a WebGL scatter of server-side binned points, sized by point count"""
+    cells = bin_points(df, x, y, color)
+    marker_size = 4 + 16 * np.sqrt(cells["count"] / cells["count"].max())
+    palette = qualitative.Plotly
+    fig = go.Figure()
+    for i, (group, part) in enumerate(cells.groupby(color, sort=True)):
+        fig.add_trace(go.Scattergl(
+            x=part[x],
+            y=part[y],
+            mode='markers',
+            name=str(group),
+            marker=dict(size=marker_size[part.index], color=palette[i % len(palette)], opacity=0.7),
+            customdata=part[["count"]],
+            hovertemplate=f'<b>%{{fullData.name}}</b><br>Puntos: %{{customdata[0]:,}}<br>{x_title}: %{{x:,.0f}}<br>{y_title}: %{{y:,.0f}}<extra></extra>'
+        ))
+    fig.update_layout(
+        title=f"{title} · densidad de {len(df):,} puntos",
+        xaxis_title=x_title,
+        yaxis_title=y_title
+    )
+    return fig
+
+
+def build_area_revenue_pie(df):
+    """Build the revenue share pie by service area"""
+    import plotly.express as px
+    fig = px.pie(
+        df, 
+        values='revenue', 
+        names='area',
+        title="🏭 Distribución de Ingresos por Área de Servicio",
+        color_discrete_sequence=['#003DA5', '#FFCC00', '#28a745', '#dc3545', '#17a2b8', '#6f42c1']
+    )
+    fig.update_traces(
+        textposition='inside', 
+        textinfo='percent+label',
+        hovertemplate='<b>%{label}</b><br>Ingresos: S/ %{value:,.0f}<br>Porcentaje: %{percent}<extra></extra>'
+    )
+    fig.update_layout(
+        showlegend=True,
+        legend=dict(orientation="v", yanchor="middle", y=0.5, xanchor="left", x=1.05),
+        margin=dict(t=50, b=50, l=50, r=150),
+        font=dict(size=12)
+    )
+    return fig
+
+
+def build_monthly_revenue_line(df):
+    """Build the monthly revenue evolution line chart"""
+    import plotly.express as px
+    fig = px.line(
+        df, 
+        x='Mes', 
+        y='Ingresos',
+        title="📈 Evolución de Ingresos Mensuales",
+        markers=True
+    )
+    fig.update_traces(
+        line=dict(color='#003DA5', width=4),
+        marker=dict(size=10, color='#FFCC00', line=dict(width=2, color='#003DA5')),
+        hovertemplate='<b>%{x}</b><br>Ingresos: S/ %{y:,.0f}<extra></extra>'
+    )
+    fig.update_layout(
+        xaxis_title="Mes",
+        yaxis_title="Ingresos (S/)",
+        yaxis=dict(tickformat=',.0f'),
+        hovermode='x unified',
+        font=dict(size=12)
+    )
+    return fig
+
+
+def build_project_progress_bar(df):
+    """Build the progress bar chart per project, colored by status"""
+    import plotly.express as px
+    fig = px.bar(
+        df, 
+        x='name', 
+        y='progress',
+        color='status',
+        title="📊 Progreso de Proyectos (%)",
+        color_discrete_map={
+            'En Progreso': '#FFCC00',
+            'Completado': '#28a745',
+            'Pendiente': '#dc3545'
+        },
+        text='progress'
+    )
+    fig.update_traces(
+        texttemplate='%{text}%', 
+        textposition='outside',
+        hovertemplate='<b>%{x}</b><br>Progreso: %{y}%<br>Estado: %{fullData.name}<extra></extra>'
+    )
+    fig.update_layout(
+        xaxis=dict(tickangle=-45),
+        yaxis=dict(range=[0, 110]),
+        showlegend=True
+    )
+    return fig
+
+
+def add_risk_points(fig, at_risk, webgl=False, limit=RISK_RING_MAX):
+    """Ring the first ``limit`` at-risk projects (budget, spent, name, projected_overrun) on a budget vs spend scatter.
+
+    ``at_risk`` comes ranked by projected overrun, so the rings mark the
+    projects at the top of the risk list and the payload stays bounded.
+    """
+    trace = go.Scattergl if webgl else go.Scatter
+    name = "⚠️ En riesgo" if len(at_risk) <= limit else f"⚠️ En riesgo (top {limit})"
+    at_risk = at_risk.head(limit)
+    fig.add_trace(trace(
+        x=at_risk['budget'],
+        y=at_risk['spent'],
+        mode='markers',
+        name=name,
+        marker=dict(symbol='circle-open', size=14, color='#dc3545', line=dict(width=2)),
+        customdata=list(zip(at_risk['name'].astype(str), at_risk['projected_overrun'] * 100)),
+        hovertemplate='<b>%{customdata[0]}</b><br>Presupuesto: S/ %{x:,.0f}<br>Gastado: S/ %{y:,.0f}<br>Sobrecosto proyectado: %{customdata[1]:.1f}%<extra>En riesgo</extra>'
+    ))
+    return fig
+
+
+def add_risk_density(fig, at_risk):
+    """Mark the at-risk projects on a density scatter as binned cells sized by project count"""
+    points = at_risk[['budget', 'spent', 'projected_overrun']].assign(group="⚠️ En riesgo")
+    cells = bin_points(points, 'budget', 'spent', 'group', size='projected_overrun', max_cells=RISK_MAX_CELLS)
+    fig.add_trace(go.Scattergl(
+        x=cells['budget'],
+        y=cells['spent'],
+        mode='markers',
+        name=f"⚠️ En riesgo ({len(at_risk):,})",
+        marker=dict(symbol='circle-open', size=8 + 12 * np.sqrt(cells['count'] / cells['count'].max()),
+                    color='#dc3545', line=dict(width=2)),
+        customdata=np.column_stack([cells['count'], cells['projected_overrun'] * 100]),
+        hovertemplate='<b>En riesgo</b><br>Proyectos: %{customdata[0]:,}<br>Presupuesto: S/ %{x:,.0f}<br>Gastado: S/ %{y:,.0f}<br>Sobrecosto proyectado medio: %{customdata[1]:.1f}%<extra></extra>'
+    ))
+    return fig
+
+
+def build_budget_scatter(df, at_risk=None):
+    """Build the budget vs actual spend scatter per project, ringing the ``at_risk`` projects"""
+    import plotly.express as px
+    mode = scatter_mode(len(df))
+    if mode == "density":
+        fig = build_density_scatter(df, 'budget', 'spent', 'area', "💰 Presupuesto vs Gasto Real",
+                                    "Presupuesto (S/)", "Gasto Real (S/)")
+        return add_risk_density(fig, at_risk) if at_risk is not None and len(at_risk) else fig
+    fig = px.scatter(
+        df,
+        x='budget',
+        y='spent',
+        size='progress',
+        color='area',
+        title="💰 Presupuesto vs Gasto Real",
+        hover_data=['name', 'client'],
+        size_max=20,
+        render_mode=mode
+    )
+    fig.update_traces(
+        hovertemplate='<b>%{customdata[0]}</b><br>Cliente: %{customdata[1]}<br>Presupuesto: S/ %{x:,.0f}<br>Gastado: S/ %{y:,.0f}<br>Progreso: %{marker.size}%<extra></extra>'
+    )
+    fig.update_layout(
+        xaxis_title="Presupuesto (S/)",
+        yaxis_title="Gasto Real (S/)"
+    )
+    if at_risk is not None and len(at_risk):
+        add_risk_points(fig, at_risk, webgl=mode == "webgl")
+    return fig
+
+
+def build_client_revenue_bar(df):
+    """Build the horizontal revenue bar chart per client"""
+    import plotly.express as px
+    fig = px.bar(
+        df.sort_values('total_revenue', ascending=True),
+        x='total_revenue',
+        y='name',
+        orientation='h',
+        title="💼 Ingresos por Cliente",
+        color='total_revenue',
+        color_continuous_scale='Blues'
+    )
+    fig.update_traces(
+        hovertemplate='<b>%{y}</b><br>Ingresos: S/ %{x:,.0f}<extra></extra>'
+    )
+    fig.update_layout(
+        xaxis_title="Ingresos (S/)",
+        yaxis_title="Cliente"
+    )
+    return fig
+
+
+def build_client_satisfaction_scatter(df):
+    """Build the satisfaction vs number of projects scatter per client"""
+    import plotly.express as px
+    fig = px.scatter(
+        df,
+        x='projects_count',
+        y='satisfaction',
+        size='total_revenue',
+        color='sector',
+        title="📈 Satisfacción vs Número de Proyectos",
+        hover_data=['name'],
+        size_max=20
+    )
+    fig.update_traces(
+        hovertemplate='<b>%{customdata[0]}</b><br>Proyectos: %{x}<br>Satisfacción: %{y}%<br>Sector: %{fullData.name}<extra></extra>'
+    )
+    fig.update_layout(
+        xaxis_title="Número de Proyectos",
+        yaxis_title="Satisfacción (%)"
+    )
+    return fig
+
+
+def build_area_revenue_bar(df):
+    """Build the revenue bar chart per service area"""
+    import plotly.express as px
+    fig = px.bar(
+        df.sort_values('revenue', ascending=False),
+        x='area',
+        y='revenue',
+        title="💰 Ingresos por Área de Servicio",
+        color='revenue',
+        color_continuous_scale='Viridis'
+    )
+    fig.update_traces(
+        hovertemplate='<b>%{x}</b><br>Ingresos: S/ %{y:,.0f}<extra></extra>'
+    )
+    fig.update_layout(
+        xaxis=dict(tickangle=-45),
+        xaxis_title="Área de Servicio",
+        yaxis_title="Ingresos (S/)"
+    )
+    return fig
+
+
+def build_area_efficiency_scatter(df):
+    """Build the efficiency vs number of projects scatter per service area"""
+    import plotly.express as px
+    mode = scatter_mode(len(df))
+    if mode == "density":
+        return build_density_scatter(df, 'projects', 'efficiency', 'area', "⚡ Eficiencia vs Número de Proyectos",
+                                     "Número de Proyectos", "Eficiencia (%)")
+    fig = px.scatter(
+        df,
+        x='projects',
+        y='efficiency',
+        size='revenue',
+        color='area',
+        title="⚡ Eficiencia vs Número de Proyectos",
+        size_max=20,
+        render_mode=mode
+    )
+    fig.update_traces(
+        hovertemplate='<b>%{fullData.name}</b><br>Proyectos: %{x}<br>Eficiencia: %{y}%<br>Ingresos: S/ %{marker.size:,.0f}<extra></extra>'
+    )
+    fig.update_layout(
+        xaxis_title="Número de Proyectos",
+        yaxis_title="Eficiencia (%)"
+    )
+    return fig
+
+
+def build_yearly_revenue_area(yearly):
+    """Build the yearly revenue area chart"""
+    import plotly.express as px
+    fig = px.area(
+        yearly,
+        x='Año',
+        y='Ingresos',
+        title="📈 Evolución de Ingresos Anuales",
+        color_discrete_sequence=['#003DA5']
+    )
+
+    fig.update_traces(
+        fill='tonexty',
+        hovertemplate='<b>Año: %{x}</b><br>Ingresos: S/ %{y:,.0f}<extra></extra>'
+    )
+
+    fig.update_layout(
+        xaxis_title="Año",
+        yaxis_title="Ingresos (S/)",
+        yaxis=dict(tickformat=',.0f'),
+        hovermode='x unified',
+        font=dict(size=12),
+        plot_bgcolor='white',
+        paper_bgcolor='white'
+    )
+    return fig
+
+
+def build_yearly_clients_line(yearly):
+    """Build the yearly number of clients line chart"""
+    import plotly.express as px
+    fig = px.line(
+        yearly,
+        x='Año',
+        y='Clientes',
+        title="👥 Evolución del Número de Clientes",
+        markers=True,
+        color_discrete_sequence=['#FFCC00']
+    )
+
+    fig.update_traces(
+        line=dict(width=4),
+        marker=dict(size=12, line=dict(width=2, color='#003DA5')),
+        hovertemplate='<b>Año: %{x}</b><br>Clientes: %{y}<extra></extra>'
+    )
+
+    fig.update_layout(
+        xaxis_title="Año",
+        yaxis_title="Número de Clientes",
+        hovermode='x unified',
+        font=dict(size=12),
+        plot_bgcolor='white'
+    )
+    return fig
+
+
+def build_growth_projection(yearly, projection):
+    """Build the historical vs projected revenue chart with its prediction interval"""
+    fig = go.Figure()
+
+    # Datos históricos
+    fig.add_trace(go.Scatter(
+        x=yearly['Año'],
+        y=yearly['Ingresos'],
+        mode='lines+markers',
+        name='Ingresos Históricos',
+        line=dict(color='#003DA5', width=3),
+        marker=dict(size=10),
+        hovertemplate='<b>Año: %{x}</b><br>Ingresos: S/ %{y:,.0f}<extra></extra>'
+    ))
+
+    # Intervalo de predicción (95%)
+    fig.add_trace(go.Scatter(
+        x=projection['Año'],
+        y=projection['Ingresos_Max'],
+        mode='lines',
+        line=dict(width=0),
+        showlegend=False,
+        hoverinfo='skip'
+    ))
+    fig.add_trace(go.Scatter(
+        x=projection['Año'],
+        y=projection['Ingresos_Min'],
+        mode='lines',
+        line=dict(width=0),
+        fill='tonexty',
+        fillcolor='rgba(255, 204, 0, 0.2)',
+        name='Intervalo 95%',
+        hoverinfo='skip'
+    ))
+
+    # Proyecciones
+    fig.add_trace(go.Scatter(
+        x=projection['Año'],
+        y=projection['Ingresos_Proyectados'],
+        mode='lines+markers',
+        name='Ingresos Proyectados',
+        line=dict(color='#FFCC00', width=3, dash='dash'),
+        marker=dict(size=10),
+        hovertemplate='<b>Año: %{x}</b><br>Proyección: S/ %{y:,.0f}<extra></extra>'
+    ))
+
+    fig.update_layout(
+        title={
+            'text': f"🚀 Proyección de Ingresos {projection['Año'].iloc[0]}-{projection['Año'].iloc[-1]}",
+            'x': 0.5,
+            'xanchor': 'center'
+        },
+        xaxis_title="Año",
+        yaxis_title="Ingresos (S/)",
+        yaxis=dict(tickformat=',.0f'),
+        hovermode='x unified',
+        font=dict(size=12),
+        plot_bgcolor='white'
+    )
+    return fig
@@ -0,0 +1,228 @@
+"""Cubo de agregados pre-materializado sobre las dimensiones de proyectos."""
+
+import copy
+
+import numpy as np
+import pandas as pd
+
+from dss.indexes import MISSING_DAY, day_number, to_days
+
+DIMENSIONS = ("area", "client", "status", "location")
+# Dimensiones de las celdas; el cliente (miles de valores) se resuelve con sus filas
+CELL_DIMENSIONS = ("area", "status", "location")
+MEASURES = ("budget", "spent", "progress")
+
+# Centinelas de mes para fechas faltantes (sin inicio => desde siempre, sin fin => vigente)
+MONTH_MIN = np.iinfo(np.int64).min
+MONTH_MAX = np.iinfo(np.int64).max
+
+
+def _months(days, sentinel):
+    months = days.astype("datetime64[D]").astype("datetime64[M]").astype(np.int64)
+    return np.where(days == MISSING_DAY, sentinel, months)
+
+
+def _csr(keys):
+    """Group row positions by ``keys``: returns (sorted keys, offsets, rows)"""
+    order = np.argsort(keys, kind="stable")
+    sorted_keys = keys[order]
+    uniques, starts = np.unique(sorted_keys, return_index=True)
+    return uniques, np.append(starts, len(keys)), order
+
+
+def _prefix_sums(cells, weights, shape):
+    """Return the running sums along the month axis of ``weights`` binned into ``cells``.
+
+    The result has one more column than months: column ``k`` holds the sum
+    of the rows whose month comes before month ``k``.
+    """
+    grid = np.bincount(cells, weights=weights, minlength=shape[0] * shape[1]).reshape(shape)
+    prefix = np.zeros((shape[0], shape[1] + 1))
+    np.cumsum(grid, axis=1, out=prefix[:, 1:])
+    return prefix
+
+
+class AggregateCube:
+    """Sums and counts over area × status × location, as running sums by start and end month.
+
+    A project overlaps ``[a, b]`` when it starts by ``b`` and does not end
+    before ``a``. Projects cannot end before they start, so those ending
+    before ``a`` are a subset of those starting by ``b``: the overlap total of
+    a combination is its start-month prefix sum at ``b`` minus its end-month
+    prefix sum at ``a``, two lookups per combination whatever the period.
+    Rows are read back only for a period bound that falls mid-month (the
+    projects starting or ending in that single month) and for the few
+    projects whose end date precedes their start date.
+
+    The client is not a cell dimension: with thousands of values it would
+    multiply the cells, so a client filter is answered from the rows of that
+    client, grouped once at build time.
+    """
+
+    def __init__(self, df):
+        self.values = {}
+        self.lookup = {}
+        row_codes = {}
+        for dim in DIMENSIONS:
+            codes, uniques = pd.factorize(df[dim], sort=False)
+            row_codes[dim] = codes.astype(np.int32)
+            self.values[dim] = list(uniques)
+            self.lookup[dim] = {value: code for code, value in enumerate(uniques)}
+
+        start_days = to_days(df["start_date"])
+        end_days = to_days(df["end_date"])
+        start_months = _months(start_days, MONTH_MIN)
+        end_months = _months(end_days, MONTH_MAX)
+        measures = {m: pd.to_numeric(df[m], errors="coerce").fillna(0).to_numpy(dtype=np.float64) for m in MEASURES}
+        measures["count"] = np.ones(len(df))
+
+        # Una combinación por valor distinto de área × estado × ubicación
+        keys = pd.DataFrame({dim: row_codes[dim] for dim in CELL_DIMENSIONS})
+        row_combos = keys.groupby(list(CELL_DIMENSIONS), sort=False).ngroup().to_numpy(dtype=np.int64)
+        _, first_rows = np.unique(row_combos, return_index=True)
+        self.combo_codes = {dim: row_codes[dim][first_rows] for dim in CELL_DIMENSIONS}
+
+        # Sumas acumuladas por mes de inicio y por mes de fin de cada combinación
+        self.start_months, start_index = np.unique(start_months, return_inverse=True)
+        self.end_months, end_index = np.unique(end_months, return_inverse=True)
+        self.start_shape = (len(first_rows), len(self.start_months))
+        self.end_shape = (len(first_rows), len(self.end_months))
+        self.row_start_cells = row_combos * self.start_shape[1] + start_index
+        self.row_end_cells = row_combos * self.end_shape[1] + end_index
+        self.start_sums = {m: _prefix_sums(self.row_start_cells, w, self.start_shape) for m, w in measures.items()}
+        self.end_sums = {m: _prefix_sums(self.row_end_cells, w, self.end_shape) for m, w in measures.items()}
+
+        # Filas por mes de inicio / fin y por cliente, solo para las correcciones y el filtro de cliente
+        self.row_codes = row_codes
+        self.row_start = start_days
+        self.row_end = np.where(end_days == MISSING_DAY, np.iinfo(np.int64).max, end_days)
+        self.row_measures = measures
+        self.by_start_month = _csr(start_months)
+        self.by_end_month = _csr(end_months)
+        self.by_client = _csr(row_codes["client"])
+        self.inverted = np.flatnonzero(self.row_end < self.row_start)
+        self.rows = len(df)
+
+    def __len__(self):
+        return self.start_shape[0] * self.start_shape[1]
+
+    def updated(self, rows, measures):
+        """Return a copy of the cube with new ``measures`` values for ``rows``.
+
+        Only valid when the dimensions and dates of ``rows`` did not change:
+        each row stays in its cells, so the running sums are corrected by the
+        running sum of the per-cell difference of the changed rows instead of
+        being rebuilt from every row.
+        """
+        cube = copy.copy(self)
+        cube.row_measures = dict(self.row_measures)
+        cube.start_sums = dict(self.start_sums)
+        cube.end_sums = dict(self.end_sums)
+        for m, values in measures.items():
+            values = pd.to_numeric(pd.Series(values), errors="coerce").fillna(0).to_numpy(dtype=np.float64)
+            row_values = self.row_measures[m].copy()
+            diff = values - row_values[rows]
+            row_values[rows] = values
+            cube.row_measures[m] = row_values
+            cube.start_sums[m] = self.start_sums[m] + _prefix_sums(self.row_start_cells[rows], diff, self.start_shape)
+            cube.end_sums[m] = self.end_sums[m] + _prefix_sums(self.row_end_cells[rows], diff, self.end_shape)
+        return cube
+
+    def _code(self, dim, value):
+        return self.lookup[dim].get(value, -2)
+
+    def _group_rows(self, csr, key):
+        keys, offsets, order = csr
+        i = np.searchsorted(keys, key)
+        if i == len(keys) or keys[i] != key:
+            return np.empty(0, dtype=np.int64)
+        return order[offsets[i]:offsets[i + 1]]
+
+    def _row_mask(self, rows, filters):
+        keep = np.ones(len(rows), dtype=bool)
+        for dim, value in filters.items():
+            keep &= self.row_codes[dim][rows] == self._code(dim, value)
+        return keep
+
+    def _sum(self, codes, weights, by):
+        if by is None:
+            return weights.sum()
+        valid = codes >= 0
+        return np.bincount(codes[valid], weights=weights[valid], minlength=len(self.values[by]))
+
+    def _row_aggregate(self, rows, filters, start, end, by):
+        """Aggregate the given rows directly (client filter or a reversed period)"""
+        keep = self._row_mask(rows, filters)
+        if start is not None and end is not None:
+            keep &= (self.row_start[rows] <= day_number(end)) & (self.row_end[rows] >= day_number(start))
+        rows = rows[keep]
+        codes = None if by is None else self.row_codes[by][rows]
+        return {name: self._sum(codes, values[rows], by) for name, values in self.row_measures.items()}
+
+    def _aggregate(self, filters, start, end, by=None):
+        filters = {dim: value for dim, value in (filters or {}).items() if value is not None}
+        if "client" in filters:
+            rows = self._group_rows(self.by_client, self._code("client", filters["client"]))
+            return self._row_aggregate(rows, filters, start, end, by)
+
+        combo_mask = np.ones(self.start_shape[0], dtype=bool)
+        for dim, value in filters.items():
+            combo_mask &= self.combo_codes[dim] == self._code(dim, value)
+        combo_by = None if by is None else self.combo_codes[by][combo_mask]
+
+        if start is None or end is None:
+            return {name: self._sum(combo_by, sums[combo_mask, -1], by) for name, sums in self.start_sums.items()}
+        a, b = day_number(start), day_number(end)
+        if a > b:
+            return self._row_aggregate(np.arange(self.rows), filters, start, end, by)
+
+        a_month = np.datetime64(start, "M").astype(np.int64)
+        b_month = np.datetime64(end, "M").astype(np.int64)
+        a_full = np.datetime64(start, "D") == np.datetime64(start, "M").astype("datetime64[D]")
+        b_full = np.datetime64(np.datetime64(end, "D") + 1, "M") != np.datetime64(end, "M")
+        # Meses completos por prefijo: inicio hasta el mes de b, fin antes del mes de a
+        k_start = np.searchsorted(self.start_months, b_month, side="right" if b_full else "left")
+        k_end = np.searchsorted(self.end_months, a_month, side="left")
+
+        # Correcciones por filas: meses frontera a mitad de mes y proyectos con fin anterior al inicio
+        parts, signs = [], []
+        if not b_full:
+            rows = self._group_rows(self.by_start_month, b_month)
+            parts.append(rows[self.row_start[rows] <= b])
+            signs.append(1.0)
+        if not a_full:
+            rows = self._group_rows(self.by_end_month, a_month)
+            parts.append(rows[self.row_end[rows] < a])
+            signs.append(-1.0)
+        rows = self.inverted
+        # Restados por terminar antes de a pero nunca sumados por empezar después de b
+        parts.append(rows[(self.row_end[rows] < a) & (self.row_start[rows] > b)])
+        signs.append(1.0)
+        sign = np.concatenate([np.full(len(part), s) for part, s in zip(parts, signs)])
+        rows = np.concatenate(parts)
+        keep = self._row_mask(rows, filters)
+        rows, sign = rows[keep], sign[keep]
+        row_by = None if by is None else self.row_codes[by][rows]
+
+        totals = {}
+        for name, sums in self.start_sums.items():
+            combos = sums[combo_mask, k_start] - self.end_sums[name][combo_mask, k_end]
+            totals[name] = self._sum(combo_by, combos, by) + self._sum(row_by, sign * self.row_measures[name][rows], by)
+        return totals
+
+    def totals(self, filters=None, start=None, end=None):
+        """Return count, sums and average progress for a filter combination"""
+        totals = self._aggregate(filters, start, end)
+        totals["count"] = int(round(totals["count"]))
+        totals["avg_progress"] = totals["progress"] / totals["count"] if totals["count"] else None
+        return totals
+
+    def rollup(self, dimension, filters=None, start=None, end=None):
+        """Return per-value sums along a cell dimension as a DataFrame"""
+        if dimension not in CELL_DIMENSIONS:
+            raise ValueError(f"Unknown cube dimension: {dimension}")
+        totals = self._aggregate(filters, start, end, by=dimension)
+        df = pd.DataFrame({dimension: self.values[dimension], **totals})
+        df["count"] = df["count"].round().astype(np.int64)
+        df["avg_progress"] = df["progress"] / df["count"].where(df["count"] > 0)
+        return df[df["count"] > 0].reset_index(drop=True)
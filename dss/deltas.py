@@ -0,0 +1,335 @@
+"""Ingesta incremental de cambios de proyectos (upserts por ``id``).
+
+Los cambios diarios de avance y gasto llegan como archivos CSV o Parquet en
+``$DSS_DATA_DIR/deltas`` (o ``DSS_DELTA_DIR``), de solo anexado: cada archivo
+trae la columna ``id`` y las columnas que cambian. Una celda vacía significa
+"sin cambio". Los ``id`` existentes se actualizan y los nuevos se agregan como
+proyectos (y en ese caso deben traer todas las columnas).
+
+``DeltaLog`` fusiona los archivos sobre las columnas del archivo base de
+proyectos mediante un índice hash ``id -> fila``: ubicar las filas cuesta
+O(cambios) y solo se copian las columnas que cambian (copia en escritura), de
+modo que las sesiones que leen una instantánea anterior no ven escrituras a
+medias. Cada sincronización produce una instantánea numerada que registra, por
+columna, en qué instantánea cambió por última vez y qué filas tocó. Así las
+cachés derivadas (índices, agregados, figuras) pueden llevar como versión solo
+la de las columnas que leen, y las que admiten actualización incremental se
+recalculan con las filas cambiadas en lugar de reconstruirse.
+"""
+
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+from pandas.api.types import union_categoricals
+
+from dss import schema, storage
+
+DELTA_EXTENSIONS = (".csv", ".parquet")
+DELTA_KEY = "id"
+
+# Instantáneas cuyas columnas se conservan en memoria (la publicada y la anterior)
+KEEP_SNAPSHOTS = 2
+
+
+def default_delta_dir():
+    """Return ``$DSS_DELTA_DIR``, or the ``deltas`` folder inside ``$DSS_DATA_DIR``"""
+    if os.environ.get("DSS_DELTA_DIR"):
+        return os.environ["DSS_DELTA_DIR"]
+    if os.environ.get("DSS_DATA_DIR"):
+        return os.path.join(os.environ["DSS_DATA_DIR"], "deltas")
+    return None
+
+
+def _file_signature(path):
+    stat = os.stat(path)
+    return (os.path.basename(path), stat.st_size, stat.st_mtime_ns)
+
+
+def delta_files(delta_dir):
+    """Return the delta files in ``delta_dir`` sorted by name (the order they are applied in)"""
+    if not delta_dir or not os.path.isdir(delta_dir):
+        return []
+    return sorted(
+        entry.path for entry in os.scandir(delta_dir)
+        if entry.is_file() and entry.name.endswith(DELTA_EXTENSIONS)
+    )
+
+
+def delta_version(delta_dir):
+    """Return a token that changes when delta files are added or modified"""
+    return tuple(_file_signature(path) for path in delta_files(delta_dir))
+
+
+def read_delta(path, key=DELTA_KEY):
+    """Read one delta file; when an ``id`` repeats, its last row wins"""
+    if path.endswith(".parquet"):
+        df = pq.read_table(path).to_pandas()
+    else:
+        df = pd.read_csv(path)
+    if key not in df.columns:
+        raise ValueError(f"{os.path.basename(path)}: falta la columna '{key}'")
+    df[key] = df[key].astype("string")
+    return df.drop_duplicates(subset=key, keep="last").reset_index(drop=True)
+
+
+def _fits(values, dtype):
+    """Return whether the numeric ``values`` can be stored as ``dtype`` without loss"""
+    array = values.to_numpy(dtype=np.float64, na_value=np.nan)
+    if np.issubdtype(dtype, np.integer):
+        info = np.iinfo(dtype)
+        return bool(np.isfinite(array).all() and np.array_equal(array, np.round(array))
+                    and (len(array) == 0 or (info.min <= array.min() and array.max() <= info.max)))
+    if dtype == np.float32:
+        # Misma regla que el esquema compacto: float32 mientras no se pierdan unidades
+        finite = array[np.isfinite(array)]
+        return bool(len(finite) == 0 or np.abs(finite).max() < schema.FLOAT32_EXACT)
+    return True
+
+
+def _cast(values, like):
+    """Convert delta values to the dtype of the column ``like``.
+
+    Numeric values that do not fit the (compact) dtype of ``like`` keep a
+    wider dtype; ``_widened`` then widens the column before they are written.
+    """
+    if isinstance(like.dtype, pd.CategoricalDtype):
+        return values.astype(like.cat.categories.dtype)
+    if pd.api.types.is_datetime64_any_dtype(like.dtype):
+        return pd.to_datetime(values).astype(like.dtype)
+    if isinstance(like.dtype, np.dtype) and pd.api.types.is_numeric_dtype(like.dtype):
+        numbers = pd.to_numeric(values)
+        return numbers.astype(like.dtype) if _fits(numbers, like.dtype) else numbers
+    return values.astype(like.dtype)
+
+
+def _widened(column, values):
+    """Return ``column`` with a dtype that holds both its values and ``values`` (not copied when it already does)"""
+    if isinstance(column.dtype, pd.CategoricalDtype) or values.dtype == column.dtype:
+        return column
+    dtype = np.result_type(column.dtype, values.dtype)
+    return column if dtype == column.dtype else column.astype(dtype)
+
+
+def _with_values(column, rows, values):
+    """Return a copy of ``column`` with ``values`` written at ``rows``"""
+    if isinstance(column.dtype, pd.CategoricalDtype):
+        categories = column.cat.categories
+        extra = pd.Index(pd.unique(values[~values.isin(categories)]))
+        categories = categories.append(extra) if len(extra) else categories
+        codes = column.cat.codes.to_numpy().copy()
+        codes[rows] = categories.get_indexer(values)
+        return pd.Series(pd.Categorical.from_codes(codes, categories=categories))
+    widened = _widened(column, values)
+    updated = widened.copy(deep=True) if widened is column else widened
+    updated.iloc[rows] = values.to_numpy()
+    return updated
+
+
+def _appended(column, values):
+    """Return ``column`` with ``values`` appended"""
+    if isinstance(column.dtype, pd.CategoricalDtype):
+        return pd.Series(union_categoricals([column.array, pd.Categorical(values)]))
+    return pd.concat([column, values], ignore_index=True)
+
+
+class Snapshot:
+    """One merged state of the project columns.
+
+    ``column_ids`` maps each column to the snapshot that last changed it (0 is
+    the base file), ``changes`` the columns changed here to their sorted row
+    positions, and ``inserted`` counts the rows appended here.
+    """
+
+    def __init__(self, id, parent, size, column_ids, changes=None, inserted=0):
+        self.id = id
+        self.parent = parent
+        self.size = size
+        self.column_ids = column_ids
+        self.changes = changes or {}
+        self.inserted = inserted
+
+    def columns_id(self, columns):
+        """Return the last snapshot that changed any of ``columns``"""
+        return max(self.column_ids[column] for column in columns)
+
+
+class DeltaLog:
+    """Merges append-only upsert files into the columns of one base projects file.
+
+    ``read_base(column)`` returns a base column as a read-only Series. Merged
+    columns are read with ``column(name, snapshot_id)``, and structures built
+    on them can be kept up to date with ``derive``.
+    """
+
+    def __init__(self, read_base, columns, key=DELTA_KEY):
+        self.read_base = read_base
+        self.columns = list(columns)
+        self.key = key
+        base = Snapshot(0, None, None, {column: 0 for column in self.columns})
+        self.snapshots = {0: base}
+        self.tokens = {(): 0}
+        self.applied = ()
+        self.latest = 0
+        self._ids = None
+        self._arrays = {}
+        self._derived = {}
+        self._lock = threading.Lock()
+
+    # Columnas
+
+    def column(self, name, snapshot_id):
+        """Return column ``name`` as of snapshot ``snapshot_id``"""
+        column_id = self.snapshots[snapshot_id].column_ids[name]
+        if column_id == 0:
+            return self.read_base(name)
+        try:
+            return self._arrays[(name, column_id)]
+        except KeyError:
+            raise KeyError(f"La instantánea {snapshot_id} de '{name}' ya no está en memoria") from None
+
+    def values(self, name, snapshot_id, rows):
+        """Return the values of column ``name`` at ``rows`` as of snapshot ``snapshot_id``"""
+        return self.column(name, snapshot_id).iloc[rows].reset_index(drop=True)
+
+    def _base_ids(self):
+        ids = pd.Index(self.read_base(self.key).astype("string"))
+        if not ids.is_unique:
+            raise ValueError(f"La columna '{self.key}' de proyectos tiene valores repetidos")
+        # Construir la tabla hash ahora: las búsquedas de cada delta cuestan O(cambios)
+        ids.get_indexer(ids[:1])
+        return ids
+
+    def id_index(self):
+        """Return the hash index ``id -> row`` of the latest published snapshot, built once"""
+        if self._ids is None:
+            self._ids = self._base_ids()
+        return self._ids
+
+    # Sincronización
+
+    def snapshot(self, token):
+        """Return the snapshot built for the delta files ``token`` (see ``delta_version``)"""
+        return self.snapshots[self.tokens[token]]
+
+    def sync(self, delta_dir, token=None):
+        """Merge the delta files not applied yet and return the resulting snapshot"""
+        token = delta_version(delta_dir) if token is None else token
+        with self._lock:
+            if token in self.tokens:
+                return self.snapshots[self.tokens[token]]
+            paths = {os.path.basename(path): path for path in delta_files(delta_dir)}
+            files = [signature for signature in token if signature[0] in paths]
+            if tuple(files[:len(self.applied)]) == self.applied:
+                parent, ids = self.snapshots[self.latest], self.id_index()
+                pending = files[len(self.applied):]
+            else:
+                # Archivo ya aplicado modificado o eliminado: se vuelve a fusionar todo desde la base
+                parent, ids = self.snapshots[0], self._base_ids()
+                pending = files
+            snapshot = self._merge(parent, ids, [paths[name] for name, _, _ in pending])
+            self.applied = tuple(files)
+            self.tokens[token] = snapshot.id
+            self.latest = snapshot.id
+            self._prune()
+            return snapshot
+
+    def _merge(self, parent, ids, paths):
+        working = {}
+        touched = {}
+        size = parent.size if parent.size is not None else len(self.read_base(self.key))
+        inserted = 0
+        current = lambda name: working[name] if name in working else self.column(name, parent.id)
+        for path in paths:
+            delta = read_delta(path, self.key)
+            unknown = [column for column in delta.columns if column not in self.columns]
+            if unknown:
+                raise ValueError(f"{os.path.basename(path)}: columnas desconocidas {', '.join(unknown)}")
+            rows = ids.get_indexer(delta[self.key])
+
+            new = rows < 0
+            if new.any():
+                missing = [column for column in self.columns if column not in delta.columns]
+                if missing or delta.loc[new].isna().any().any():
+                    raise ValueError(f"{os.path.basename(path)}: los proyectos nuevos deben traer todas las columnas")
+                added = delta.loc[new].reset_index(drop=True)
+                for column in self.columns:
+                    working[column] = _appended(current(column), _cast(added[column], current(column)))
+                # Índice local: los ids nuevos se publican junto con la instantánea
+                ids = ids.append(pd.Index(added[self.key]))
+                inserted += len(added)
+                size += len(added)
+
+            updates = delta.loc[~new].reset_index(drop=True)
+            rows = rows[~new]
+            for column in updates.columns:
+                if column == self.key:
+                    continue
+                present = updates[column].notna().to_numpy()
+                if not present.any():
+                    continue
+                target = rows[present]
+                values = _cast(updates[column][present].reset_index(drop=True), current(column))
+                if column in working and not isinstance(working[column].dtype, pd.CategoricalDtype):
+                    # Columna ya copiada en esta sincronización: se escribe sobre la copia propia
+                    working[column] = _widened(working[column], values)
+                    working[column].iloc[target] = values.to_numpy()
+                else:
+                    working[column] = _with_values(current(column), target, values)
+                touched.setdefault(column, []).append(target)
+
+        snapshot_id = max(self.snapshots) + 1
+        column_ids = dict(parent.column_ids)
+        # Las columnas publicadas se comparten entre sesiones: de solo lectura, como las del archivo base
+        for column, series in storage.read_only(pd.DataFrame(working, copy=False)).items():
+            self._arrays[(column, snapshot_id)] = series
+            column_ids[column] = snapshot_id
+        changes = {column: np.unique(np.concatenate(parts)) for column, parts in touched.items()}
+        snapshot = Snapshot(snapshot_id, parent.id, size, column_ids, changes, inserted)
+        self.snapshots[snapshot_id] = snapshot
+        self._ids = ids
+        return snapshot
+
+    def _prune(self):
+        recent = sorted(self.snapshots)[-KEEP_SNAPSHOTS:]
+        referenced = {(column, self.snapshots[sid].column_ids[column]) for sid in recent for column in self.columns}
+        for key in [key for key in self._arrays if key not in referenced]:
+            del self._arrays[key]
+
+    # Estructuras derivadas
+
+    def derive(self, name, columns, snapshot_id, build, update=None):
+        """Return the structure ``name`` built on ``columns`` as of ``snapshot_id``.
+
+        When the structure kept from a previous call is still valid for the
+        parent of ``snapshot_id`` (none of ``columns`` changed in between),
+        ``update(previous, snapshot, rows, added)`` refreshes it from the
+        parent rows the snapshot changed in ``columns`` and the positions of
+        the rows it appended; it may return None to force a rebuild (for
+        instance, a structure that cannot append rows). Otherwise ``build()``
+        is called.
+        """
+        with self._lock:
+            snapshot = self.snapshots[snapshot_id]
+            previous = self._derived.get(name)
+            if previous is not None and previous[0] == snapshot.columns_id(columns):
+                return previous[1]
+            result = None
+            if update is not None and previous is not None and snapshot.parent is not None \
+                    and previous[0] == self.snapshots[snapshot.parent].columns_id(columns):
+                # Las filas agregadas van al final; sus cambios posteriores en la misma fusión ya están en sus valores
+                start = snapshot.size - snapshot.inserted
+                changed = [snapshot.changes[column] for column in columns if column in snapshot.changes]
+                rows = np.unique(np.concatenate(changed)) if changed else np.empty(0, dtype=np.int64)
+                added = np.arange(start, snapshot.size)
+                try:
+                    result = update(previous[1], snapshot, rows[rows < start], added)
+                except KeyError:
+                    # La instantánea anterior ya no está en memoria: se reconstruye
+                    result = None
+            if result is None:
+                result = build()
+            self._derived[name] = (snapshot.columns_id(columns), result)
+            return result
@@ -0,0 +1,253 @@
+"""Exportación por bloques de tablas filtradas a CSV, Parquet o Excel.
+
+Las filas se escriben en bloques de ``EXPORT_CHUNK_ROWS`` a un archivo
+(temporal o de salida): durante la escritura solo vive en memoria un bloque y
+su texto, nunca el resultado completo como DataFrame. El XML de la hoja de
+Excel se arma por columnas con operaciones vectorizadas y se escribe directo en
+el zip, sin bibliotecas de hojas de cálculo.
+
+La descarga desde el tablero sí termina en memoria: ``st.download_button``
+necesita los bytes del archivo terminado, por eso se limita a
+``DOWNLOAD_MAX_ROWS`` filas. La línea de comandos escribe directo al archivo de
+salida y no tiene ese límite.
+
+Para exportar un dataset completo del almacenamiento configurado::
+
+    python -m dss.export projects proyectos.parquet
+"""
+
+import argparse
+import io
+import os
+import tempfile
+import zipfile
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# Formato -> (extensión, tipo MIME)
+FORMATS = {
+    "CSV": ("csv", "text/csv"),
+    "Parquet": ("parquet", "application/vnd.apache.parquet"),
+    "Excel": ("xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+}
+
+EXPORT_CHUNK_ROWS = 50_000
+
+# Filas de datos que admite una hoja de Excel (la primera es el encabezado)
+XLSX_MAX_ROWS = 1_048_575
+
+# Filas que se pueden descargar desde el tablero: el archivo terminado se entrega en memoria
+DOWNLOAD_MAX_ROWS = 500_000
+
+
+def iter_batches(frame, rows=None, chunk_rows=EXPORT_CHUNK_ROWS):
+    """Yield ``frame`` (or its ``rows`` positions) in blocks of ``chunk_rows`` rows"""
+    total = len(frame) if rows is None else len(rows)
+    # Un resultado vacío da un bloque vacío: el archivo igual lleva encabezado y esquema
+    for start in range(0, max(total, 1), chunk_rows):
+        if rows is None:
+            yield frame.iloc[start:start + chunk_rows]
+        else:
+            yield frame.iloc[rows[start:start + chunk_rows]]
+
+
+def write_csv(batches, fh):
+    """Write the batches as UTF-8 CSV to the binary file ``fh``"""
+    # Con BOM para que Excel reconozca los acentos al abrir el archivo
+    text = io.TextIOWrapper(fh, encoding="utf-8-sig", newline="")
+    header = True
+    for batch in batches:
+        batch.to_csv(text, index=False, header=header)
+        header = False
+    text.flush()
+    text.detach()
+
+
+def write_parquet(batches, fh):
+    """Write each batch as one row group of a Parquet file"""
+    writer = None
+    try:
+        for batch in batches:
+            table = pa.Table.from_pandas(batch, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(fh, table.schema)
+            writer.write_table(table.cast(writer.schema))
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+# Partes fijas del libro: una hoja, con estilos de fecha (s="1") y fecha y hora (s="2")
+_XLSX_PARTS = {
+    "[Content_Types].xml": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        '<Override PartName="/xl/styles.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+        '</Types>'
+    ),
+    "_rels/.rels": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Target="xl/workbook.xml" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument"/>'
+        '</Relationships>'
+    ),
+    "xl/workbook.xml": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+        'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+        '<sheets><sheet name="datos" sheetId="1" r:id="rId1"/></sheets></workbook>'
+    ),
+    "xl/_rels/workbook.xml.rels": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Target="worksheets/sheet1.xml" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet"/>'
+        '<Relationship Id="rId2" Target="styles.xml" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles"/>'
+        '</Relationships>'
+    ),
+    "xl/styles.xml": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<styleSheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+        '<numFmts count="2"><numFmt numFmtId="164" formatCode="yyyy-mm-dd"/>'
+        '<numFmt numFmtId="165" formatCode="yyyy-mm-dd hh:mm:ss"/></numFmts>'
+        '<fonts count="1"><font><sz val="11"/><name val="Calibri"/></font></fonts>'
+        '<fills count="2"><fill><patternFill patternType="none"/></fill>'
+        '<fill><patternFill patternType="gray125"/></fill></fills>'
+        '<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>'
+        '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+        '<cellXfs count="3"><xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>'
+        '<xf numFmtId="164" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/>'
+        '<xf numFmtId="165" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/></cellXfs>'
+        '<cellStyles count="1"><cellStyle name="Normal" xfId="0" builtinId="0"/></cellStyles>'
+        '</styleSheet>'
+    ),
+}
+_XLSX_SHEET_START = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+)
+_XLSX_SHEET_END = '</sheetData></worksheet>'
+
+# Caracteres de control que XML no admite (sin r"": el motor de regex de Arrow no acepta \u)
+_XML_INVALID = "[\x00-\x08\x0b\x0c\x0e-\x1f\ufffe\uffff]"
+_EXCEL_EPOCH = pd.Timestamp("1899-12-30")
+
+
+def _xml_text(values):
+    """Escape a string Series for XML element content"""
+    return (values.str.replace("&", "&amp;", regex=False).str.replace("<", "&lt;", regex=False)
+            .str.replace(">", "&gt;", regex=False).str.replace(_XML_INVALID, "", regex=True))
+
+
+def _xlsx_cells(column):
+    """Return the ``<c>`` element of every value of ``column`` (vectorized over the column)"""
+    if isinstance(column.dtype, pd.CategoricalDtype):
+        column = column.astype(column.cat.categories.dtype)
+    missing = column.isna().to_numpy()
+    if pd.api.types.is_bool_dtype(column.dtype):
+        cells = np.where(column.fillna(False).to_numpy(dtype=bool), '<c t="b"><v>1</v></c>', '<c t="b"><v>0</v></c>')
+    elif pd.api.types.is_numeric_dtype(column.dtype):
+        values = column.to_numpy(dtype=np.float64, na_value=np.nan)
+        missing = missing | ~np.isfinite(values)
+        # La representación más corta del tipo original (92.9 y no 92.9000015259 en float32)
+        cells = ("<c><v>" + column.astype(str) + "</v></c>").to_numpy()
+    elif pd.api.types.is_datetime64_any_dtype(column.dtype):
+        if column.dt.tz is not None:
+            column = column.dt.tz_localize(None)
+        has_time = bool((column.dropna() != column.dropna().dt.normalize()).any())
+        serial = (column - _EXCEL_EPOCH) / pd.Timedelta(days=1)
+        cells = (f'<c s="{2 if has_time else 1}"><v>' + serial.astype(str) + "</v></c>").to_numpy()
+    else:
+        text = _xml_text(column.astype(str))
+        cells = ('<c t="inlineStr"><is><t xml:space="preserve">' + text + "</t></is></c>").to_numpy()
+    return np.where(missing, "<c/>", cells)
+
+
+def _xlsx_rows(frame):
+    """Return the ``<row>`` elements of ``frame`` as one string"""
+    rows = np.full(len(frame), "<row>", dtype=object)
+    for name in frame.columns:
+        rows = rows + _xlsx_cells(frame[name]).astype(object)
+    return "</row>".join(rows) + "</row>" if len(rows) else ""
+
+
+def write_xlsx(batches, fh):
+    """Write the batches to the single sheet of an Excel workbook.
+
+    The sheet XML is built per batch with vectorized string operations and
+    streamed into the zip entry, so no spreadsheet library is needed and only
+    one batch is serialized at a time.
+    """
+    with zipfile.ZipFile(fh, "w", zipfile.ZIP_DEFLATED) as archive:
+        for part, content in _XLSX_PARTS.items():
+            archive.writestr(part, content)
+        with archive.open("xl/worksheets/sheet1.xml", "w", force_zip64=True) as sheet:
+            sheet.write(_XLSX_SHEET_START.encode("utf-8"))
+            written = 0
+            for batch in batches:
+                if written == 0:
+                    sheet.write(_xlsx_rows(pd.DataFrame([[str(name) for name in batch.columns]])).encode("utf-8"))
+                written += len(batch)
+                if written > XLSX_MAX_ROWS:
+                    raise ValueError(f"Excel admite hasta {XLSX_MAX_ROWS:,} filas; usa CSV o Parquet")
+                sheet.write(_xlsx_rows(batch).encode("utf-8"))
+            sheet.write(_XLSX_SHEET_END.encode("utf-8"))
+
+
+WRITERS = {"CSV": write_csv, "Parquet": write_parquet, "Excel": write_xlsx}
+
+
+def export(batches, fmt, directory=None):
+    """Write ``batches`` in format ``fmt`` to an anonymous temporary file.
+
+    Returns the file opened in binary mode and positioned at its start; it is
+    deleted when closed.
+    """
+    if fmt not in WRITERS:
+        raise ValueError(f"Formato desconocido: {fmt}")
+    fh = tempfile.TemporaryFile(dir=directory)
+    try:
+        WRITERS[fmt](batches, fh)
+        fh.seek(0)
+    except Exception:
+        fh.close()
+        raise
+    return fh
+
+
+def file_name(name, fmt, stamp=None):
+    """Return the download name of table ``name`` in format ``fmt``"""
+    stamp = stamp or pd.Timestamp.now().strftime("%Y%m%d_%H%M")
+    return f"{name}_{stamp}.{FORMATS[fmt][0]}"
+
+
+if __name__ == "__main__":
+    from dss import storage
+
+    extensions = {extension: fmt for fmt, (extension, _) in FORMATS.items()}
+    parser = argparse.ArgumentParser(description="Exporta un dataset del almacenamiento configurado")
+    parser.add_argument("dataset", choices=storage.DATASETS)
+    parser.add_argument("out", help="archivo de salida (.csv, .parquet o .xlsx)")
+    parser.add_argument("--columns", nargs="+")
+    parser.add_argument("--chunk-rows", type=int, default=EXPORT_CHUNK_ROWS)
+    args = parser.parse_args()
+
+    extension = os.path.splitext(args.out)[1].lstrip(".").lower()
+    if extension not in extensions:
+        parser.error(f"extensión no soportada: .{extension}")
+    df = storage.open_store().read(args.dataset, args.columns)
+    with open(args.out, "wb") as out:
+        WRITERS[extensions[extension]](iter_batches(df, chunk_rows=args.chunk_rows), out)
+    print(f"{len(df)} filas -> {args.out}")
@@ -0,0 +1,121 @@
+"""Motor de proyecciones vectorizado para series anuales de ingresos.
+
+Todas las series (total, por área, por cliente) se apilan en una matriz
+``k × T`` y cada modelo se ajusta a todas a la vez con operaciones de NumPy:
+regresión lineal, regresión log-lineal y suavizamiento exponencial de Holt
+(con búsqueda de parámetros en rejilla). Por serie se elige el modelo con
+menor AIC y se devuelven la proyección y su intervalo de predicción.
+"""
+
+import numpy as np
+
+MODELS = ("lineal", "log-lineal", "holt")
+
+# Rejilla de parámetros de Holt (nivel, tendencia)
+HOLT_GRID = np.linspace(0.1, 0.9, 9)
+
+# Cuantiles normales para los niveles de confianza soportados
+Z_SCORES = {0.8: 1.2816, 0.9: 1.6449, 0.95: 1.9600, 0.99: 2.5758}
+
+
+def _ols(y, x):
+    """Row-wise least squares of ``y`` (k × T) on ``x`` (T,)"""
+    x_mean = x.mean()
+    sxx = ((x - x_mean) ** 2).sum()
+    y_mean = y.mean(axis=1, keepdims=True)
+    slope = ((y - y_mean) * (x - x_mean)).sum(axis=1, keepdims=True) / sxx
+    intercept = y_mean - slope * x_mean
+    return intercept, slope, x_mean, sxx
+
+
+def _fit_linear(y, x, future, z):
+    intercept, slope, x_mean, sxx = _ols(y, x)
+    fitted = intercept + slope * x
+    dof = len(x) - 2
+    # Sin grados de libertad no hay estimación del error: intervalo indefinido
+    sigma = np.sqrt(((y - fitted) ** 2).sum(axis=1, keepdims=True) / dof) if dof > 0 else np.full((len(y), 1), np.nan)
+    mean = intercept + slope * future
+    spread = z * sigma * np.sqrt(1 + 1 / len(x) + (future - x_mean) ** 2 / sxx)
+    return fitted, mean, mean - spread, mean + spread
+
+
+def _fit_log_linear(y, x, future, z):
+    log_y = np.log(np.clip(y, 1e-9, None))
+    intercept, slope, x_mean, sxx = _ols(log_y, x)
+    fitted_log = intercept + slope * x
+    dof = len(x) - 2
+    sigma = np.sqrt(((log_y - fitted_log) ** 2).sum(axis=1, keepdims=True) / dof) if dof > 0 else np.full((len(y), 1), np.nan)
+    mean_log = intercept + slope * future
+    spread = z * sigma * np.sqrt(1 + 1 / len(x) + (future - x_mean) ** 2 / sxx)
+    return np.exp(fitted_log), np.exp(mean_log), np.exp(mean_log - spread), np.exp(mean_log + spread)
+
+
+def _fit_holt(y, horizon, z):
+    k, t = y.shape
+    alphas, betas = np.meshgrid(HOLT_GRID, HOLT_GRID, indexing="ij")
+    alphas, betas = alphas.ravel()[:, None], betas.ravel()[:, None]
+
+    # Recursión vectorizada sobre (combinación de parámetros × serie)
+    level = np.broadcast_to(y[:, 0], (len(alphas), k)).copy()
+    trend = np.broadcast_to(y[:, 1] - y[:, 0] if t > 1 else np.zeros(k), (len(alphas), k)).copy()
+    fitted = np.empty((len(alphas), k, t))
+    fitted[:, :, 0] = y[:, 0]
+    sse = np.zeros((len(alphas), k))
+    for i in range(1, t):
+        prediction = level + trend
+        fitted[:, :, i] = prediction
+        sse += (y[:, i] - prediction) ** 2
+        new_level = alphas * y[:, i] + (1 - alphas) * prediction
+        trend = betas * (new_level - level) + (1 - betas) * trend
+        level = new_level
+
+    best = sse.argmin(axis=0)
+    cols = np.arange(k)
+    alpha, beta = alphas[best, 0][:, None], betas[best, 0][:, None]
+    steps = np.arange(1, horizon + 1)
+    mean = level[best, cols][:, None] + steps * trend[best, cols][:, None]
+    dof = t - 3
+    sigma = np.sqrt(sse[best, cols][:, None] / dof) if dof > 0 else np.full((k, 1), np.nan)
+    # Varianza del pronóstico h pasos adelante en el modelo de Holt
+    j = np.arange(horizon)
+    growth = np.cumsum(np.where(j == 0, 0.0, 1.0) * (alpha * (1 + j * beta)) ** 2, axis=1)
+    spread = z * sigma * np.sqrt(1 + growth)
+    return fitted[best, cols], mean, mean - spread, mean + spread
+
+
+def forecast(series, horizon=3, level=0.95):
+    """Fit every model to every row of ``series`` and keep the best one per row.
+
+    ``series`` is a ``k × T`` array of historical values (one row per series,
+    one column per period). Returns a dict with ``model`` (k,), and
+    ``mean``/``lower``/``upper`` (k × horizon) arrays.
+    """
+    y = np.atleast_2d(np.asarray(series, dtype=np.float64))
+    k, t = y.shape
+    z = Z_SCORES.get(level, 1.96)
+    x = np.arange(t, dtype=np.float64)
+    future = np.arange(t, t + horizon, dtype=np.float64)
+
+    fits = {
+        "lineal": _fit_linear(y, x, future, z),
+        "log-lineal": _fit_log_linear(y, x, future, z),
+        "holt": _fit_holt(y, horizon, z),
+    }
+    params = {"lineal": 2, "log-lineal": 2, "holt": 4}
+
+    # AIC con la suma de cuadrados en la escala original
+    aic = np.stack([
+        t * np.log(((y - fits[name][0]) ** 2).sum(axis=1) / t + 1e-12) + 2 * params[name]
+        for name in MODELS
+    ])
+    # Log-lineal solo es válido para series estrictamente positivas
+    aic[MODELS.index("log-lineal"), (y <= 0).any(axis=1)] = np.inf
+    choice = aic.argmin(axis=0)
+    rows = np.arange(k)
+    stacked = [np.stack([fits[name][i] for name in MODELS]) for i in (1, 2, 3)]
+    return {
+        "model": np.array(MODELS)[choice],
+        "mean": stacked[0][choice, rows],
+        "lower": np.maximum(stacked[1][choice, rows], 0.0),
+        "upper": stacked[2][choice, rows],
+    }
@@ -0,0 +1,337 @@
+"""Índices en memoria construidos una vez por versión de datos."""
+
+import copy
+
+import numpy as np
+import pandas as pd
+
+# Fracción de intervalos más largos que se consultan por barrido lineal
+LONG_INTERVAL_QUANTILE = 0.99
+# Día de las fechas faltantes: fuera del rango de fechas válidas, también de las anteriores a 1970
+MISSING_DAY = np.iinfo(np.int64).min
+
+
+def to_days(values):
+    """Convert dates (strings, ``date`` or datetime64) to int64 day numbers; NaT becomes ``MISSING_DAY``"""
+    days = pd.to_datetime(pd.Series(values), errors="coerce").to_numpy(dtype="datetime64[D]")
+    out = days.astype(np.int64)
+    out[np.isnat(days)] = MISSING_DAY
+    return out
+
+
+def day_number(value):
+    """Convert a single date to its int64 day number"""
+    return np.datetime64(value, "D").astype(np.int64)
+
+
+class IntervalIndex:
+    """Sorted index over ``[start, end]`` intervals answering overlap queries.
+
+    Intervals are sorted by start. Because no "short" interval spans more than
+    ``max_span`` days, every interval overlapping ``[a, b]`` starts inside
+    ``[a - max_span, b]``; two binary searches bound that window, so a query
+    costs O(log n + k) where k is the window size. The few longest intervals
+    (and open-ended ones) are kept apart and checked directly so a single
+    multi-year project does not widen the window for everyone.
+    """
+
+    def __init__(self, starts, ends):
+        starts = to_days(starts)
+        ends = to_days(ends)
+        n = len(starts)
+        missing = (starts == MISSING_DAY) | (ends == MISSING_DAY)
+        spans = np.where(missing, 0, ends - starts)
+        threshold = np.quantile(spans[~missing], LONG_INTERVAL_QUANTILE) if (~missing).any() else 0
+        apart = missing | (spans > threshold)
+
+        # Intervalos "cortos": ordenados por inicio
+        short = np.flatnonzero(~apart)
+        order = np.argsort(starts[short], kind="stable")
+        self.rows = short[order]
+        self.starts = starts[self.rows]
+        self.ends = ends[self.rows]
+        self.max_span = int(spans[self.rows].max()) if len(self.rows) else 0
+
+        # Límites por posición de fila: sin inicio => desde siempre (MISSING_DAY es el mínimo), sin fin => vigente
+        self.row_starts = starts
+        self.row_ends = np.where(ends == MISSING_DAY, np.iinfo(np.int64).max, ends)
+
+        # Intervalos largos o abiertos, consultados por barrido
+        self.long_rows = np.flatnonzero(apart)
+        self.long_starts = self.row_starts[self.long_rows]
+        self.long_ends = self.row_ends[self.long_rows]
+        self.size = n
+
+    def overlapping(self, start, end):
+        """Return sorted row positions whose interval overlaps ``[start, end]``"""
+        a, b = day_number(start), day_number(end)
+        lo = np.searchsorted(self.starts, a - self.max_span, side="left")
+        hi = np.searchsorted(self.starts, b, side="right")
+        hits = self.rows[lo:hi][self.ends[lo:hi] >= a]
+        long_hits = self.long_rows[(self.long_starts <= b) & (self.long_ends >= a)]
+        return np.sort(np.concatenate([hits, long_hits]))
+
+    def contains(self, rows, start, end):
+        """Return a boolean mask telling which of ``rows`` overlap ``[start, end]``"""
+        a, b = day_number(start), day_number(end)
+        return (self.row_starts[rows] <= b) & (self.row_ends[rows] >= a)
+
+    def __len__(self):
+        return self.size
+
+
+class CategoryIndex:
+    """Inverted index over low-cardinality columns for equality filters.
+
+    Each column is factorized once into integer codes, and the rows holding
+    each value are stored as a sorted row-id list (CSR layout: one argsort,
+    one offsets array). A filter combination starts from the shortest
+    candidate list and narrows it by code lookups on the remaining columns,
+    so the cost is proportional to the smallest selection rather than to the
+    table size, and the frame is never copied or masked as a whole.
+    """
+
+    def __init__(self, df, columns):
+        self.size = len(df)
+        self.codes = {}
+        self.values = {}
+        self.lookup = {}
+        self.order = {}
+        self.offsets = {}
+        for col in columns:
+            codes, uniques = pd.factorize(df[col], sort=False)
+            order = np.argsort(codes, kind="stable")
+            counts = np.bincount(codes[codes >= 0], minlength=len(uniques))
+            self.codes[col] = codes
+            self.values[col] = list(uniques)
+            self.lookup[col] = {value: code for code, value in enumerate(uniques)}
+            # Las filas sin valor (código -1) quedan al inicio del orden
+            skip = len(codes) - counts.sum()
+            self.order[col] = order[skip:]
+            self.offsets[col] = np.concatenate([[0], np.cumsum(counts)])
+
+    def options(self, column):
+        """Return the distinct values of ``column`` in order of first appearance"""
+        return self.values[column]
+
+    def rows_for(self, column, value):
+        """Return the sorted row positions where ``column == value``"""
+        code = self.lookup[column].get(value)
+        if code is None:
+            return np.empty(0, dtype=np.int64)
+        return self.order[column][self.offsets[column][code]:self.offsets[column][code + 1]]
+
+    def select(self, filters, rows=None):
+        """Return sorted row positions matching every ``column == value`` in ``filters``.
+
+        ``rows`` optionally restricts the result to a sorted candidate set
+        (e.g. the rows of the active period).
+        """
+        filters = {col: value for col, value in filters.items() if value is not None}
+        if not filters:
+            return np.arange(self.size) if rows is None else rows
+        lists = {col: self.rows_for(col, value) for col, value in filters.items()}
+        first = min(lists, key=lambda col: len(lists[col]))
+        if rows is not None and len(rows) < len(lists[first]):
+            # El conjunto candidato es menor que cualquier lista: partir de él
+            result, first = rows, None
+        else:
+            result = lists[first]
+        for col, value in filters.items():
+            if col != first:
+                result = result[self.codes[col][result] == self.lookup[col].get(value, -2)]
+        if rows is not None and first is not None:
+            # Ambos conjuntos están ordenados: pertenencia por búsqueda binaria
+            pos = np.searchsorted(rows, result)
+            hit = pos < len(rows)
+            hit[hit] = rows[pos[hit]] == result[hit]
+            result = result[hit]
+        return result
+
+    def __len__(self):
+        return self.size
+
+
+class SortIndex:
+    """Per-column sort permutations for server-side ordering and paging.
+
+    Each column is argsorted once (lazily, on first use) and the permutation
+    is kept with its inverse (the rank of every row). Ordering a filtered
+    subset then needs no value comparisons: small subsets are ordered by
+    their integer ranks, large ones by walking the permutation with a
+    membership mask.
+    """
+
+    def __init__(self, df):
+        self.frame = df
+        self.size = len(df)
+        self._orders = {}
+        self._ranks = {}
+
+    def order(self, column, ascending=True):
+        """Return the row permutation sorting ``column`` (missing values last)"""
+        key = (column, ascending)
+        if key not in self._orders:
+            values = self.frame[column].reset_index(drop=True)
+            base = values.sort_values(kind="stable", na_position="last").index.to_numpy()
+            valid = base[:self.size - int(values.isna().sum())]
+            order = np.concatenate([valid if ascending else valid[::-1], base[len(valid):]])
+            rank = np.empty(self.size, dtype=np.int64)
+            rank[order] = np.arange(self.size)
+            self._orders[key], self._ranks[key] = order, rank
+        return self._orders[key]
+
+    def sorted_rows(self, column, ascending=True, rows=None):
+        """Return ``rows`` (all rows by default) ordered by ``column``"""
+        order = self.order(column, ascending)
+        if rows is None:
+            return order
+        if len(rows) * 16 < self.size:
+            # Subconjunto pequeño: ordenar por rango entero
+            return rows[np.argsort(self._ranks[(column, ascending)][rows], kind="stable")]
+        mask = np.zeros(self.size, dtype=bool)
+        mask[rows] = True
+        return order[mask[order]]
+
+    def page(self, column, ascending=True, rows=None, page=1, page_size=25):
+        """Return the row positions of one page of ``rows`` ordered by ``column``"""
+        ordered = self.sorted_rows(column, ascending, rows)
+        start = (page - 1) * page_size
+        return ordered[start:start + page_size]
+
+    def __len__(self):
+        return self.size
+
+
+class PointIndex:
+    """Sorted index over a single date column"""
+
+    def __init__(self, values):
+        days = to_days(values)
+        valid = np.flatnonzero(days != MISSING_DAY)
+        order = np.argsort(days[valid], kind="stable")
+        self.rows = valid[order]
+        self.days = days[self.rows]
+        self.size = len(days)
+
+    def between(self, start=None, end=None):
+        """Return sorted row positions with ``start <= date <= end`` (open bounds allowed)"""
+        lo = 0 if start is None else np.searchsorted(self.days, day_number(start), side="left")
+        hi = len(self.days) if end is None else np.searchsorted(self.days, day_number(end), side="right")
+        return np.sort(self.rows[lo:hi])
+
+    def __len__(self):
+        return self.size
+
+
+def month_slice(months, start, end):
+    """Return the slice of a sorted month-start series that overlaps ``[start, end]``"""
+    months = np.asarray(months, dtype="datetime64[D]")
+    first = np.datetime64(start, "M").astype("datetime64[D]")
+    lo = np.searchsorted(months, first, side="left")
+    hi = np.searchsorted(months, np.datetime64(end, "D"), side="right")
+    return slice(lo, hi)
+
+
+class ClientJoin:
+    """Project → client join with per-client rollups.
+
+    Project ``client`` values are resolved once against the client ``key``
+    column into client row positions, and the project rows of each client
+    are stored in CSR layout (one argsort, one offsets array), so drilling
+    down into a client is a slice. The rollups (project count, budget,
+    spent, average progress and revenue recognized by progress) come from a
+    single grouped reduction over the joined rows and are aligned with the
+    client rows.
+    """
+
+    ROLLUP_COLUMNS = ("projects_count", "budget", "spent", "avg_progress", "total_revenue")
+
+    def __init__(self, projects, clients, key="name"):
+        values = projects["client"]
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            # Resolver cada categoría una sola vez y propagar por código
+            lookup = pd.Index(clients[key]).get_indexer(values.cat.categories)
+            codes = values.cat.codes.to_numpy()
+            client_rows = np.where(codes >= 0, lookup[codes], -1)
+        else:
+            client_rows = pd.Index(clients[key]).get_indexer(values)
+        self.client_rows = client_rows.astype(np.int64)
+        self.size = len(clients)
+
+        matched = self.client_rows >= 0
+        counts = np.bincount(self.client_rows[matched], minlength=self.size)
+        order = np.argsort(self.client_rows, kind="stable")
+        # Los proyectos sin cliente (fila -1) quedan al inicio del orden
+        self.unmatched = len(order) - int(counts.sum())
+        self.order = order[self.unmatched:]
+        self.offsets = np.concatenate([[0], np.cumsum(counts)])
+
+        budget = pd.to_numeric(projects["budget"], errors="coerce").fillna(0).to_numpy(dtype=np.float64)
+        progress = pd.to_numeric(projects["progress"], errors="coerce").fillna(0).to_numpy(dtype=np.float64)
+        spent = pd.to_numeric(projects["spent"], errors="coerce").fillna(0).to_numpy(dtype=np.float64)
+        measures = pd.DataFrame({
+            "projects_count": 1,
+            "budget": budget,
+            "spent": spent,
+            "progress": progress,
+            "total_revenue": budget * progress / 100.0,
+        })[matched]
+        sums = measures.groupby(self.client_rows[matched], sort=False).sum().reindex(np.arange(self.size), fill_value=0)
+        self._set_rollups(
+            sums["projects_count"].to_numpy(dtype=np.int64),
+            {m: sums[m].to_numpy(dtype=np.float64) for m in ("budget", "spent", "progress", "total_revenue")},
+        )
+
+    def _set_rollups(self, count, sums):
+        self.progress_sum = sums["progress"]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            avg_progress = np.where(count > 0, sums["progress"] / count, np.nan)
+        self.rollups = pd.DataFrame({
+            "projects_count": count,
+            "budget": sums["budget"],
+            "spent": sums["spent"],
+            "avg_progress": np.round(avg_progress, 1),
+            "total_revenue": sums["total_revenue"],
+        })
+
+    def table(self, clients):
+        """Return the ``clients`` rows with the derived rollups in place of their own rollup columns"""
+        attributes = clients.drop(columns=[col for col in self.ROLLUP_COLUMNS if col in clients.columns])
+        return pd.concat([attributes.reset_index(drop=True), self.rollups], axis=1)
+
+    def updated(self, rows, old, new):
+        """Return a copy of the join whose rollups reflect new budget/spent/progress values for ``rows``.
+
+        ``old`` and ``new`` map each of those measures to its values at
+        ``rows``; the projects must keep their client, so only the rollups of
+        the affected clients change, by the difference of the changed rows.
+        """
+        join = copy.copy(self)
+        clients = self.client_rows[rows]
+        matched = clients >= 0
+
+        def measures(frame):
+            values = {m: pd.to_numeric(pd.Series(frame[m]), errors="coerce").fillna(0).to_numpy(dtype=np.float64)[matched]
+                      for m in ("budget", "spent", "progress")}
+            values["total_revenue"] = values["budget"] * values["progress"] / 100.0
+            return values
+
+        before, after = measures(old), measures(new)
+        current = {
+            "budget": self.rollups["budget"].to_numpy(),
+            "spent": self.rollups["spent"].to_numpy(),
+            "progress": self.progress_sum,
+            "total_revenue": self.rollups["total_revenue"].to_numpy(),
+        }
+        sums = {m: current[m] + np.bincount(clients[matched], weights=after[m] - before[m], minlength=self.size)
+                for m in current}
+        join._set_rollups(self.rollups["projects_count"].to_numpy(), sums)
+        return join
+
+    def projects_of(self, client_row):
+        """Return the sorted project row positions of the client at ``client_row``"""
+        return self.order[self.offsets[client_row]:self.offsets[client_row + 1]]
+
+    def __len__(self):
+        return self.size
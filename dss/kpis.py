@@ -0,0 +1,119 @@
+"""Motor de KPIs derivados de las tablas de proyectos, clientes e ingresos.
+
+Los indicadores del Dashboard Ejecutivo se mantienen como acumuladores
+(sumas y conteos) en lugar de recalcularse sobre todas las filas: agregar o
+actualizar filas solo recorre las filas afectadas.
+"""
+
+import copy
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+ACTIVE_STATUS = "En Progreso"
+
+# Ventana (en meses) para contar clientes nuevos
+NEW_CLIENT_MONTHS = 12
+
+
+def _month_numbers(values):
+    months = pd.to_datetime(pd.Series(values), errors="coerce").to_numpy(dtype="datetime64[M]")
+    return months[~np.isnat(months)].astype(np.int64)
+
+
+class KpiEngine:
+    """Incrementally maintained executive KPIs"""
+
+    def __init__(self, projects=None, clients=None, monthly_revenue=None):
+        self.active_projects = 0
+        self.earned_value = 0.0
+        self.spent = 0.0
+        self.clients = 0
+        self.satisfaction_sum = 0.0
+        self.satisfaction_count = 0
+        self.contract_months = Counter()
+        self.revenue_by_month = Counter()
+        if projects is not None:
+            self.add_projects(projects)
+        if clients is not None:
+            self.add_clients(clients)
+        if monthly_revenue is not None:
+            self.add_revenue(monthly_revenue["Fecha"], monthly_revenue["Ingresos"])
+
+    # Proyectos
+
+    def _apply_projects(self, df, sign):
+        status = df["status"].to_numpy()
+        budget = df["budget"].to_numpy(dtype=np.float64)
+        progress = df["progress"].to_numpy(dtype=np.float64)
+        spent = df["spent"].to_numpy(dtype=np.float64)
+        self.active_projects += sign * int(np.count_nonzero(status == ACTIVE_STATUS))
+        # Valor ganado: presupuesto ejecutado según el avance declarado
+        self.earned_value += sign * float(np.dot(budget, progress) / 100.0)
+        self.spent += sign * float(spent.sum())
+
+    def add_projects(self, df):
+        """Add the contribution of new project rows"""
+        self._apply_projects(df, 1)
+
+    def update_projects(self, old, new):
+        """Replace the contribution of ``old`` rows with their ``new`` values"""
+        self._apply_projects(old, -1)
+        self._apply_projects(new, 1)
+
+    def updated(self, old, new, added=None):
+        """Return a copy of the engine with the ``old`` project rows replaced by their ``new`` values
+        and the ``added`` project rows, if any, appended.
+
+        Only the project accumulators (scalars) change; the client and revenue
+        counters are shared with this engine, not copied.
+        """
+        engine = copy.copy(self)
+        engine.update_projects(old, new)
+        if added is not None:
+            engine.add_projects(added)
+        return engine
+
+    # Clientes
+
+    def add_clients(self, df):
+        """Add the contribution of new client rows"""
+        satisfaction = pd.to_numeric(df["satisfaction"], errors="coerce").to_numpy(dtype=np.float64)
+        valid = ~np.isnan(satisfaction)
+        self.clients += len(df)
+        self.satisfaction_sum += float(satisfaction[valid].sum())
+        self.satisfaction_count += int(valid.sum())
+        months, counts = np.unique(_month_numbers(df["contract_date"]), return_counts=True)
+        for month, count in zip(months.tolist(), counts.tolist()):
+            self.contract_months[month] += count
+
+    # Ingresos
+
+    def add_revenue(self, dates, amounts):
+        """Add revenue amounts to their calendar months"""
+        months = pd.to_datetime(pd.Series(dates), errors="coerce").to_numpy(dtype="datetime64[M]").astype(np.int64)
+        sums = pd.Series(np.asarray(amounts, dtype=np.float64)).groupby(months).sum()
+        for month, amount in sums.items():
+            self.revenue_by_month[int(month)] += float(amount)
+
+    def snapshot(self):
+        """Return the KPI dictionary consumed by the executive dashboard"""
+        months = sorted(m for m, v in self.revenue_by_month.items() if v)
+        revenue = self.revenue_by_month[months[-1]] if months else 0.0
+        previous = self.revenue_by_month[months[-2]] if len(months) > 1 else 0.0
+        growth = (revenue / previous - 1) * 100 if previous else 0.0
+
+        contract_months = [m for m, v in self.contract_months.items() if v > 0]
+        latest = max(contract_months) if contract_months else 0
+        new_clients = sum(self.contract_months[m] for m in range(latest - NEW_CLIENT_MONTHS + 1, latest + 1))
+
+        return {
+            "revenue": round(revenue),
+            "activeProjects": self.active_projects,
+            "clientSatisfaction": round(self.satisfaction_sum / self.satisfaction_count, 1) if self.satisfaction_count else 0.0,
+            "efficiency": round(self.earned_value / self.spent * 100, 1) if self.spent else 0.0,
+            "monthlyGrowth": round(growth, 1),
+            "clients": self.clients,
+            "newClients": new_clients
+        }
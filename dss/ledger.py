@@ -0,0 +1,186 @@
+"""Ingesta en streaming del libro de ingresos hacia cubetas mes × área × cliente.
+
+Los archivos del libro (CSV o Parquet con columnas ``date``, ``area``,
+``client``, ``amount``) se leen por bloques y cada bloque se reduce a sus
+cubetas antes de leer el siguiente, de modo que la memoria depende del número
+de cubetas y no de las líneas de factura. Un manifiesto registra los archivos
+ya procesados: agregar archivos nuevos al directorio solo procesa esos.
+"""
+
+import json
+import os
+import threading
+
+import pandas as pd
+import pyarrow.parquet as pq
+
+LEDGER_COLUMNS = ["date", "area", "client", "amount"]
+BUCKET_KEYS = ["month", "area", "client"]
+LEDGER_EXTENSIONS = (".csv", ".parquet")
+
+# Líneas por bloque de lectura y cubetas parciales antes de consolidar
+CHUNK_ROWS = 500_000
+COMPACT_BUCKETS = 1_000_000
+
+STATE_DIR = ".state"
+BUCKETS_FILE = "buckets.parquet"
+MANIFEST_FILE = "manifest.json"
+
+
+def default_ledger_dir():
+    """Return ``$DSS_LEDGER_DIR``, or the ``ledger`` folder inside ``$DSS_DATA_DIR``"""
+    if os.environ.get("DSS_LEDGER_DIR"):
+        return os.environ["DSS_LEDGER_DIR"]
+    if os.environ.get("DSS_DATA_DIR"):
+        return os.path.join(os.environ["DSS_DATA_DIR"], "ledger")
+    return None
+
+
+def _file_signature(path):
+    stat = os.stat(path)
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def ledger_files(ledger_dir):
+    """Return the ledger files in ``ledger_dir`` sorted by name"""
+    if not ledger_dir or not os.path.isdir(ledger_dir):
+        return []
+    return sorted(
+        entry.path for entry in os.scandir(ledger_dir)
+        if entry.is_file() and entry.name.endswith(LEDGER_EXTENSIONS)
+    )
+
+
+def ledger_version(ledger_dir):
+    """Return a token that changes when ledger files are added or modified"""
+    files = ledger_files(ledger_dir)
+    return tuple((os.path.basename(path), *_file_signature(path)) for path in files)
+
+
+def _read_chunks(path, chunk_rows=CHUNK_ROWS):
+    if path.endswith(".parquet"):
+        parquet = pq.ParquetFile(path, memory_map=True)
+        for batch in parquet.iter_batches(batch_size=chunk_rows, columns=LEDGER_COLUMNS):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(path, usecols=LEDGER_COLUMNS, chunksize=chunk_rows)
+
+
+def _reduce(chunk):
+    """Fold ledger lines into (month, area, client) buckets"""
+    month = pd.to_datetime(chunk["date"], errors="coerce").dt.to_period("M").dt.to_timestamp()
+    frame = pd.DataFrame({
+        "month": month,
+        "area": chunk["area"].astype("string"),
+        "client": chunk["client"].astype("string"),
+        "amount": pd.to_numeric(chunk["amount"], errors="coerce").fillna(0.0),
+        "lines": 1
+    })
+    return frame.dropna(subset=["month"]).groupby(BUCKET_KEYS, sort=False, dropna=False, observed=True).sum().reset_index()
+
+
+def _combine(frames):
+    frames = [f for f in frames if len(f)]
+    if not frames:
+        return pd.DataFrame({
+            "month": pd.Series(dtype="datetime64[ns]"),
+            "area": pd.Series(dtype="string"),
+            "client": pd.Series(dtype="string"),
+            "amount": pd.Series(dtype="float64"),
+            "lines": pd.Series(dtype="int64")
+        })
+    combined = pd.concat(frames, ignore_index=True)
+    return combined.groupby(BUCKET_KEYS, sort=True, dropna=False, observed=True).sum().reset_index()
+
+
+class LedgerBuckets:
+    """Month × area × client revenue buckets with incremental file ingestion"""
+
+    def __init__(self, ledger_dir=None, persist=True):
+        self.ledger_dir = ledger_dir
+        self.persist = persist and bool(ledger_dir)
+        self.manifest = {}
+        self.buckets = _combine([])
+        self._lock = threading.Lock()
+        if self.persist:
+            self._load_state()
+
+    def _state_path(self, name):
+        return os.path.join(self.ledger_dir, STATE_DIR, name)
+
+    def _load_state(self):
+        try:
+            with open(self._state_path(MANIFEST_FILE), encoding="utf-8") as fh:
+                manifest = json.load(fh)
+            buckets = pd.read_parquet(self._state_path(BUCKETS_FILE))
+        except (OSError, ValueError):
+            return
+        self.manifest = manifest
+        self.buckets = _combine([buckets])
+
+    def _save_state(self):
+        os.makedirs(os.path.join(self.ledger_dir, STATE_DIR), exist_ok=True)
+        # Escritura atómica: primero las cubetas, después el manifiesto que las referencia
+        tmp = self._state_path(BUCKETS_FILE + ".tmp")
+        self.buckets.to_parquet(tmp, index=False)
+        os.replace(tmp, self._state_path(BUCKETS_FILE))
+        tmp = self._state_path(MANIFEST_FILE + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump(self.manifest, fh)
+        os.replace(tmp, self._state_path(MANIFEST_FILE))
+
+    def ingest(self, path, chunk_rows=CHUNK_ROWS):
+        """Stream one ledger file into the buckets"""
+        partials, pending = [self.buckets], 0
+        for chunk in _read_chunks(path, chunk_rows):
+            reduced = _reduce(chunk)
+            partials.append(reduced)
+            pending += len(reduced)
+            if pending > COMPACT_BUCKETS:
+                partials, pending = [_combine(partials)], 0
+        self.buckets = _combine(partials)
+        self.manifest[os.path.basename(path)] = _file_signature(path)
+
+    def sync(self):
+        """Ingest ledger files not seen before; returns the number of files processed"""
+        with self._lock:
+            files = ledger_files(self.ledger_dir)
+            known = {os.path.basename(p): p for p in files}
+            changed = [name for name, signature in self.manifest.items()
+                       if name not in known or _file_signature(known[name]) != signature]
+            if changed:
+                # El libro es de solo anexado: un archivo modificado o eliminado obliga a reconstruir
+                self.manifest, self.buckets = {}, _combine([])
+            new_files = [p for p in files if os.path.basename(p) not in self.manifest]
+            for path in new_files:
+                self.ingest(path)
+            if new_files and self.persist:
+                self._save_state()
+            return len(new_files)
+
+    def __len__(self):
+        return len(self.buckets)
+
+    def monthly(self, by=None):
+        """Return revenue per month, optionally broken down by ``area`` or ``client``"""
+        keys = ["month"] + ([by] if by else [])
+        return self.buckets.groupby(keys, sort=True, observed=True)["amount"].sum().reset_index()
+
+    def yearly(self):
+        """Return revenue, distinct clients and months covered per calendar year"""
+        year = self.buckets["month"].dt.year.rename("year")
+        grouped = self.buckets.groupby(year, sort=True)
+        return pd.DataFrame({
+            "revenue": grouped["amount"].sum(),
+            "clients": grouped["client"].nunique(),
+            "months": grouped["month"].nunique()
+        }).reset_index()
+
+    def annual(self, by):
+        """Return revenue per ``by`` value (rows) and complete calendar year (columns)"""
+        year = self.buckets["month"].dt.year.rename("year")
+        months = self.buckets.groupby(year)["month"].nunique()
+        table = self.buckets.assign(year=year).pivot_table(
+            index=by, columns="year", values="amount", aggfunc="sum", fill_value=0.0, observed=True
+        )
+        return table.loc[:, table.columns.isin(months.index[months == 12])]
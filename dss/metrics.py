@@ -0,0 +1,192 @@
+"""Instrumentación liviana de las rutas críticas de cada rerun.
+
+``METRICS`` acumula, para todo el proceso, la duración de cada tramo
+(carga, filtro, módulo, gráfico, tabla), contadores de consultas y fallos de
+caché y la cantidad de filas de los últimos resultados. Además guarda la traza
+de la ejecución en curso de cada sesión (por hilo), que la aplicación muestra
+en el panel de depuración de la barra lateral.
+
+Los valores se exportan en el formato de texto de Prometheus, ya sea a un
+archivo (``DSS_METRICS_FILE``) o en un endpoint HTTP local
+(``DSS_METRICS_PORT``, ruta ``/metrics``).
+"""
+
+import functools
+import os
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Límites superiores (segundos) de los buckets del histograma de tramos
+SPAN_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _labels(labels):
+    if not labels:
+        return ""
+    escaped = (str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for value in labels.values())
+    return "{" + ",".join(f'{key}="{value}"' for key, value in zip(labels, escaped)) + "}"
+
+
+class MetricsRegistry:
+    """Thread-safe span histograms, counters and gauges plus a per-thread trace of the current run"""
+
+    def __init__(self, prefix="dss"):
+        self.prefix = prefix
+        self._spans = {}
+        self._counters = {}
+        self._gauges = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    # Traza de la ejecución en curso
+
+    def start_run(self):
+        """Start a new trace for the script run executing in this thread"""
+        self._local.trace = []
+        self._local.started = time.perf_counter()
+
+    def trace(self):
+        """Return the ``(kind, name, seconds, rows)`` entries recorded by this thread's current run"""
+        return list(getattr(self._local, "trace", []))
+
+    def run_seconds(self):
+        """Return the time elapsed since ``start_run`` in this thread"""
+        started = getattr(self._local, "started", None)
+        return None if started is None else time.perf_counter() - started
+
+    def _trace(self, kind, name, seconds=None, rows=None):
+        trace = getattr(self._local, "trace", None)
+        if trace is not None:
+            trace.append((kind, name, seconds, rows))
+
+    # Registro
+
+    def record(self, kind, name, seconds):
+        """Record one span ``kind``/``name`` that lasted ``seconds``"""
+        key = (kind, name)
+        with self._lock:
+            stats = self._spans.get(key)
+            if stats is None:
+                stats = self._spans[key] = {"count": 0, "sum": 0.0, "buckets": [0] * len(SPAN_BUCKETS)}
+            stats["count"] += 1
+            stats["sum"] += seconds
+            for i, bound in enumerate(SPAN_BUCKETS):
+                if seconds <= bound:
+                    stats["buckets"][i] += 1
+        self._trace(kind, name, seconds)
+
+    @contextmanager
+    def span(self, kind, name):
+        """Time the enclosed block as span ``kind``/``name``"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(kind, name, time.perf_counter() - started)
+
+    def timed(self, kind, name=None):
+        """Decorator that records every call of the function as a span"""
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.span(kind, name or func.__name__):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def inc(self, counter, value=1, **labels):
+        """Add ``value`` to ``counter`` with the given labels"""
+        key = (counter, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def cache_lookup(self, cache, count=1):
+        """Count lookups of ``cache``; hits are lookups minus misses"""
+        self.inc("cache_lookups_total", count, cache=cache)
+
+    def cache_miss(self, cache, count=1):
+        """Count misses of ``cache`` (entries that had to be computed)"""
+        self.inc("cache_misses_total", count, cache=cache)
+
+    def rows(self, name, count):
+        """Record the row count of the latest ``name`` result"""
+        with self._lock:
+            self._gauges[("rows", (("name", name),))] = int(count)
+        self._trace("rows", name, rows=int(count))
+
+    def counters(self):
+        """Return a snapshot of the counters as ``{(name, labels): value}``"""
+        with self._lock:
+            return dict(self._counters)
+
+    # Exportación
+
+    def prometheus(self):
+        """Render every metric in the Prometheus text exposition format"""
+        with self._lock:
+            spans = {key: {**stats, "buckets": list(stats["buckets"])} for key, stats in self._spans.items()}
+            counters = dict(self._counters)
+            gauges = dict(self._gauges)
+        lines = []
+        metric = f"{self.prefix}_span_seconds"
+        lines += [f"# HELP {metric} Duración de los tramos instrumentados por tipo y nombre.",
+                  f"# TYPE {metric} histogram"]
+        for (kind, name), stats in sorted(spans.items()):
+            labels = {"kind": kind, "name": name}
+            for bound, count in zip(SPAN_BUCKETS, stats["buckets"]):
+                lines.append(f"{metric}_bucket{_labels({**labels, 'le': bound})} {count}")
+            lines.append(f"{metric}_bucket{_labels({**labels, 'le': '+Inf'})} {stats['count']}")
+            lines.append(f"{metric}_sum{_labels(labels)} {stats['sum']:.6f}")
+            lines.append(f"{metric}_count{_labels(labels)} {stats['count']}")
+        for counter in sorted({name for name, _ in counters}):
+            metric = f"{self.prefix}_{counter}"
+            lines.append(f"# TYPE {metric} counter")
+            for (name, labels), value in sorted(counters.items()):
+                if name == counter:
+                    lines.append(f"{metric}{_labels(dict(labels))} {value}")
+        for gauge in sorted({name for name, _ in gauges}):
+            metric = f"{self.prefix}_{gauge}"
+            lines.append(f"# TYPE {metric} gauge")
+            for (name, labels), value in sorted(gauges.items()):
+                if name == gauge:
+                    lines.append(f"{metric}{_labels(dict(labels))} {value}")
+        return "\n".join(lines) + "\n"
+
+    def write(self, path):
+        """Write the Prometheus text to ``path`` atomically (for node_exporter's textfile collector)"""
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as fh:
+            fh.write(self.prometheus())
+        os.replace(tmp, path)
+        return path
+
+    def serve(self, port, host="127.0.0.1"):
+        """Serve ``/metrics`` on ``host:port`` from a daemon thread; returns the server"""
+        registry = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = registry.prometheus().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", PROMETHEUS_CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=server.serve_forever, name="dss-metrics", daemon=True).start()
+        return server
+
+
+# Registro del proceso
+METRICS = MetricsRegistry()
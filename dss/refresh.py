@@ -0,0 +1,84 @@
+"""Refresco en segundo plano de las fuentes de datos (stale-while-revalidate).
+
+Cada fuente expone una función ``probe`` que devuelve su versión actual (una
+consulta barata: fecha y tamaño de archivo) y una función ``load`` que carga
+una versión en las cachés. Un hilo revisa las fuentes periódicamente; cuando
+una versión cambia, la carga fuera del ciclo de las sesiones y solo entonces
+la publica. Las sesiones siempre leen la última versión publicada, de modo que
+nunca esperan una recarga y, si la carga falla, siguen con el snapshot
+anterior.
+"""
+
+import threading
+import time
+from datetime import datetime
+
+
+class SnapshotRefresher:
+    """Publishes source versions only after they have been loaded"""
+
+    def __init__(self, sources, interval=30.0):
+        self.sources = sources
+        self.interval = interval
+        self.versions = {}
+        self.last_check = None
+        self.last_refresh = None
+        self.last_duration = None
+        self.last_error = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _refresh_source(self, name):
+        probe, load = self.sources[name]
+        version = probe()
+        if name in self.versions and self.versions[name] == version:
+            return False
+        load(version)
+        # Reemplazar el diccionario completo: los lectores nunca ven un estado a medias
+        self.versions = {**self.versions, name: version}
+        return True
+
+    def version(self, name):
+        """Return the published version of ``name``, loading it synchronously the first time"""
+        versions = self.versions
+        if name in versions:
+            return versions[name]
+        with self._lock:
+            if name not in self.versions:
+                self._refresh_source(name)
+        return self.versions[name]
+
+    def refresh(self):
+        """Check every source once and publish the ones that changed; returns their names"""
+        with self._lock:
+            started = time.perf_counter()
+            changed, errors = [], []
+            for name in self.sources:
+                try:
+                    if self._refresh_source(name):
+                        changed.append(name)
+                except Exception as e:
+                    # Se conserva la última versión buena de esta fuente
+                    errors.append(f"{name}: {e}")
+            self.last_check = datetime.now()
+            self.last_error = "; ".join(errors) or None
+            if changed:
+                self.last_refresh = self.last_check
+                self.last_duration = time.perf_counter() - started
+            return changed
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.refresh()
+
+    def start(self):
+        """Start the background refresh thread (once)"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="dss-refresher", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop the background refresh thread"""
+        self._stop.set()
@@ -0,0 +1,158 @@
+"""Detección vectorizada de sobrecostos y anomalías de gasto en la cartera de proyectos.
+
+Para todos los proyectos a la vez (operaciones NumPy, sin recorrer filas) se
+calcula:
+
+* ritmo de gasto: gasto real / valor ganado (presupuesto × avance). Mayor que 1
+  significa que el proyecto gasta más rápido de lo que avanza;
+* costo proyectado al término: gasto / avance, cuando el avance alcanza
+  ``MIN_PROGRESS`` para extrapolar; por debajo, gasto más el presupuesto del
+  trabajo pendiente;
+* sobrecosto proyectado: costo proyectado / presupuesto − 1;
+* z robusto del ritmo de gasto dentro de su área: 0.6745 × (x − mediana) / MAD.
+
+Un proyecto sin terminar está en riesgo si su sobrecosto proyectado supera
+``OVERRUN_THRESHOLD`` o su z robusto supera ``Z_THRESHOLD``.
+"""
+
+import copy
+
+import numpy as np
+import pandas as pd
+
+COLUMNS = ("area", "budget", "spent", "progress")
+MEASURES = ("budget", "spent", "progress")
+
+# Avance mínimo (%) para extrapolar el costo final con el ritmo de gasto
+MIN_PROGRESS = 5.0
+OVERRUN_THRESHOLD = 0.10
+Z_THRESHOLD = 3.5
+# Escala que hace comparable la MAD con la desviación estándar de una normal
+MAD_SCALE = 0.6745
+
+RISK_LIST_SIZE = 50
+
+
+def project_metrics(budget, spent, progress):
+    """Return the (burn rate, projected cost, projected overrun) arrays of the given projects"""
+    fraction = np.clip(progress, 0, 100) / 100
+    earned = budget * fraction
+    with np.errstate(divide="ignore", invalid="ignore"):
+        burn_rate = np.where(earned > 0, spent / earned, np.nan)
+        projected = np.where(fraction * 100 >= MIN_PROGRESS, spent / fraction, spent + budget - earned)
+        overrun = np.where(budget > 0, projected / budget - 1, np.nan)
+    return burn_rate, projected, overrun
+
+
+def _measure(values):
+    return pd.to_numeric(pd.Series(values), errors="coerce").to_numpy(dtype=np.float64, na_value=np.nan)
+
+
+def group_rows(codes, n_groups):
+    """Group row positions by code: returns (order, offsets); codes < 0 are left out"""
+    order = np.argsort(codes, kind="stable")
+    offsets = np.searchsorted(codes[order], np.arange(n_groups + 1))
+    return order[offsets[0]:], offsets - offsets[0]
+
+
+class RiskModel:
+    """Overrun metrics of every project and per-area robust statistics of the burn rate.
+
+    The per-project metrics are materialized once per version of the project
+    measures; robust z-scores, the at-risk mask and the ranking are computed
+    only for the rows a view asks for, from the per-area median and MAD.
+    """
+
+    def __init__(self, df):
+        codes, uniques = pd.factorize(df["area"], sort=False)
+        self.area_codes = codes.astype(np.int32)
+        self.areas = list(uniques)
+        # Filas de cada área, agrupadas una sola vez: los cambios de avance y gasto no cambian el área
+        self.area_rows = group_rows(self.area_codes, len(self.areas))
+        self.measures = {m: _measure(df[m]) for m in MEASURES}
+        self.burn_rate, self.projected, self.overrun = project_metrics(*(self.measures[m] for m in MEASURES))
+        self.area_median = np.full(len(self.areas), np.nan)
+        self.area_mad = np.full(len(self.areas), np.nan)
+        self._area_stats(range(len(self.areas)))
+
+    def _area_stats(self, areas):
+        """Recompute the median and MAD of the burn rate of ``areas``, ignoring NaN"""
+        order, offsets = self.area_rows
+        for area in areas:
+            rate = self.burn_rate[order[offsets[area]:offsets[area + 1]]]
+            rate = rate[np.isfinite(rate)]
+            median = np.median(rate) if len(rate) else np.nan
+            self.area_median[area] = median
+            self.area_mad[area] = np.median(np.abs(rate - median)) if len(rate) else np.nan
+
+    def __len__(self):
+        return len(self.area_codes)
+
+    def updated(self, rows, measures):
+        """Return a copy of the model with new ``measures`` values for ``rows``.
+
+        Only valid when the area of ``rows`` did not change. The per-project
+        metrics are recomputed for ``rows`` alone, and the median and MAD only
+        for the areas those rows belong to.
+        """
+        model = copy.copy(self)
+        model.measures = dict(self.measures)
+        for m, values in measures.items():
+            column = self.measures[m].copy()
+            column[rows] = _measure(values)
+            model.measures[m] = column
+        burn_rate, projected, overrun = project_metrics(*(model.measures[m][rows] for m in MEASURES))
+        model.burn_rate, model.projected, model.overrun = self.burn_rate.copy(), self.projected.copy(), self.overrun.copy()
+        model.burn_rate[rows], model.projected[rows], model.overrun[rows] = burn_rate, projected, overrun
+        model.area_median, model.area_mad = self.area_median.copy(), self.area_mad.copy()
+        codes = self.area_codes[rows]
+        model._area_stats(np.unique(codes[codes >= 0]))
+        return model
+
+    def zscores(self, rows=None):
+        """Return the robust z-score of the burn rate of ``rows`` within their area"""
+        rows = np.arange(len(self)) if rows is None else np.asarray(rows)
+        codes = self.area_codes[rows]
+        mad = np.where(codes >= 0, self.area_mad[codes], np.nan)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            z = MAD_SCALE * (self.burn_rate[rows] - self.area_median[codes]) / mad
+        # Área sin dispersión (MAD 0): no hay escala para decidir qué es anómalo
+        return np.where((codes >= 0) & (mad > 0), z, np.nan)
+
+    def at_risk(self, rows=None):
+        """Return the at-risk mask of ``rows``: unfinished with a projected overrun or an outlier burn rate"""
+        rows = np.arange(len(self)) if rows is None else np.asarray(rows)
+        z = self.zscores(rows)
+        with np.errstate(invalid="ignore"):
+            flagged = (self.overrun[rows] > OVERRUN_THRESHOLD) | (z > Z_THRESHOLD)
+        return flagged & (self.measures["progress"][rows] < 100)
+
+    def scores(self, rows=None):
+        """Return the risk metrics of ``rows`` as a DataFrame"""
+        rows = np.arange(len(self)) if rows is None else np.asarray(rows)
+        return pd.DataFrame({
+            "burn_rate": self.burn_rate[rows],
+            "projected_cost": self.projected[rows],
+            "projected_overrun": self.overrun[rows],
+            "area_zscore": self.zscores(rows),
+            "at_risk": self.at_risk(rows),
+        })
+
+    def ranked(self, rows=None, limit=RISK_LIST_SIZE):
+        """Return the at-risk ``rows`` (all of them, by default) ordered by projected overrun amount.
+
+        Returns ``(rows, count, overrun_amount)``: up to ``limit`` row
+        positions (every at-risk row when ``limit`` is None), the number of
+        at-risk rows and their total projected overrun over budget.
+        """
+        rows = np.arange(len(self)) if rows is None else np.asarray(rows)
+        risky = rows[self.at_risk(rows)]
+        count = len(risky)
+        amount = np.nan_to_num(self.projected[risky] - self.measures["budget"][risky], nan=0.0)
+        total = float(np.clip(amount, 0, None).sum())
+        if limit is not None and count > limit:
+            # Solo se ordenan los ``limit`` mayores
+            top = np.argpartition(-amount, limit - 1)[:limit]
+            risky, amount = risky[top], amount[top]
+        order = np.lexsort((-np.nan_to_num(self.zscores(risky), nan=0.0), -amount))
+        return risky[order], count, total
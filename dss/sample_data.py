@@ -0,0 +1,147 @@
+"""Datos de ejemplo embebidos, usados cuando no hay una fuente de datos configurada."""
+
+PROJECTS = [
+    {
+        "id": "P001",
+        "name": "Automatización Planta ABB",
+        "client": "ABB",
+        "status": "En Progreso",
+        "progress": 75,
+        "budget": 450000,
+        "spent": 337500,
+        "area": "Automatización",
+        "location": "Lima Norte",
+        "start_date": "2023-01-15",
+        "end_date": "2023-07-30"
+    },
+    {
+        "id": "P002",
+        "name": "Sistema Eléctrico Schneider",
+        "client": "Schneider Electric",
+        "status": "Completado",
+        "progress": 100,
+        "budget": 320000,
+        "spent": 315000,
+        "area": "Electricidad",
+        "location": "Lima Centro",
+        "start_date": "2023-02-01",
+        "end_date": "2023-05-15"
+    },
+    {
+        "id": "P003",
+        "name": "Refrigeración Industrial Carrier",
+        "client": "Carrier",
+        "status": "En Progreso",
+        "progress": 60,
+        "budget": 280000,
+        "spent": 168000,
+        "area": "Refrigeración",
+        "location": "Callao",
+        "start_date": "2023-03-10",
+        "end_date": "2023-08-20"
+    },
+    {
+        "id": "P004",
+        "name": "Mantenimiento Preventivo Siemens",
+        "client": "Siemens",
+        "status": "Pendiente",
+        "progress": 25,
+        "budget": 150000,
+        "spent": 37500,
+        "area": "Mantenimiento",
+        "location": "Lima Sur",
+        "start_date": "2023-04-01",
+        "end_date": "2023-09-30"
+    },
+    {
+        "id": "P005",
+        "name": "Obras Civiles Constructora ABC",
+        "client": "Constructora ABC",
+        "status": "En Progreso",
+        "progress": 85,
+        "budget": 520000,
+        "spent": 442000,
+        "area": "Obras Civiles",
+        "location": "Lima Este",
+        "start_date": "2023-01-20",
+        "end_date": "2023-06-15"
+    }
+]
+
+CLIENTS = [
+    {
+        "id": "C001",
+        "name": "ABB",
+        "sector": "Industrial",
+        "projects_count": 3,
+        "total_revenue": 850000,
+        "satisfaction": 95.5,
+        "location": "Lima Norte",
+        "contract_date": "2022-06-15"
+    },
+    {
+        "id": "C002",
+        "name": "Schneider Electric",
+        "sector": "Eléctrico",
+        "projects_count": 2,
+        "total_revenue": 520000,
+        "satisfaction": 92.8,
+        "location": "Lima Centro",
+        "contract_date": "2022-08-20"
+    },
+    {
+        "id": "C003",
+        "name": "Carrier",
+        "sector": "HVAC",
+        "projects_count": 2,
+        "total_revenue": 480000,
+        "satisfaction": 94.2,
+        "location": "Callao",
+        "contract_date": "2022-09-10"
+    },
+    {
+        "id": "C004",
+        "name": "Siemens",
+        "sector": "Automatización",
+        "projects_count": 4,
+        "total_revenue": 720000,
+        "satisfaction": 96.1,
+        "location": "Lima Sur",
+        "contract_date": "2022-05-05"
+    },
+    {
+        "id": "C005",
+        "name": "Constructora ABC",
+        "sector": "Construcción",
+        "projects_count": 1,
+        "total_revenue": 520000,
+        "satisfaction": 93.7,
+        "location": "Lima Este",
+        "contract_date": "2022-12-01"
+    }
+]
+
+SERVICE_AREAS = [
+    {"area": "Metal Mecánica", "revenue": 650000, "projects": 8, "efficiency": 89.5},
+    {"area": "Electricidad", "revenue": 520000, "projects": 6, "efficiency": 92.1},
+    {"area": "Automatización", "revenue": 480000, "projects": 5, "efficiency": 87.3},
+    {"area": "Refrigeración", "revenue": 410000, "projects": 4, "efficiency": 85.7},
+    {"area": "Mantenimiento", "revenue": 390000, "projects": 7, "efficiency": 91.2},
+    {"area": "Obras Civiles", "revenue": 400000, "projects": 3, "efficiency": 88.9}
+]
+
+MONTHLY_REVENUE = [
+    {"month": "2023-01-01", "revenue": 2200000},
+    {"month": "2023-02-01", "revenue": 2350000},
+    {"month": "2023-03-01", "revenue": 2180000},
+    {"month": "2023-04-01", "revenue": 2420000},
+    {"month": "2023-05-01", "revenue": 2650000},
+    {"month": "2023-06-01", "revenue": 2850000}
+]
+
+YEARLY_SUMMARY = [
+    {"year": 2020, "revenue": 18500000, "clients": 45, "projects": 120},
+    {"year": 2021, "revenue": 21500000, "clients": 62, "projects": 145},
+    {"year": 2022, "revenue": 24500000, "clients": 75, "projects": 168},
+    {"year": 2023, "revenue": 28500000, "clients": 89, "projects": 195}
+]
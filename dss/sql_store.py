@@ -0,0 +1,218 @@
+"""Backend SQL embebido (SQLite o DuckDB) con pool de conexiones.
+
+Los filtros del módulo de proyectos, las métricas y los agregados por área o
+cliente se compilan a SQL y se ejecutan en el motor embebido: solo las filas
+de resultado cruzan a Python. SQLite viene con la biblioteca estándar; DuckDB
+se usa cuando la ruta termina en ``.duckdb`` y el paquete está instalado.
+
+Para generar la base a partir del almacenamiento configurado::
+
+    python -m dss.sql_store dss.sqlite
+"""
+
+import os
+import queue
+import sqlite3
+import sys
+import threading
+from contextlib import contextmanager
+
+import pandas as pd
+
+from dss import storage
+
+# Tablas exportadas y columnas indexadas en cada una
+TABLES = {
+    "projects": ["status", "area", "client", "start_date", "end_date"],
+    "clients": ["name", "contract_date"],
+    "service_areas": ["area"],
+}
+
+PROJECT_DIMENSIONS = ("status", "area", "client", "location")
+
+# Columnas de fecha que se guardan como texto ISO (AAAA-MM-DD)
+DATE_COLUMNS = ("start_date", "end_date", "contract_date")
+
+
+def _is_duckdb(path):
+    return path.endswith(".duckdb")
+
+
+class ConnectionPool:
+    """Fixed-size pool of read-only connections shared across sessions"""
+
+    def __init__(self, path, size=4):
+        self.path = path
+        self.size = size
+        self._idle = queue.LifoQueue()
+        self._created = 0
+        self._root = None
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        # Se llama con el candado tomado: una sola conexión raíz de DuckDB por pool
+        if _is_duckdb(self.path):
+            import duckdb  # dependencia opcional
+            if self._root is None:
+                self._root = duckdb.connect(self.path, read_only=True)
+            return self._root.cursor()
+        return sqlite3.connect(f"file:{self.path}?mode=ro", uri=True, check_same_thread=False)
+
+    @contextmanager
+    def connection(self):
+        """Borrow a connection, creating one while the pool is below its size"""
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            conn = None
+            with self._lock:
+                if self._created < self.size:
+                    conn = self._connect()
+                    self._created += 1
+            if conn is None:
+                conn = self._idle.get()
+        try:
+            yield conn
+        finally:
+            self._idle.put(conn)
+
+
+class SqlStore:
+    """Pushes project filters and aggregates down to an embedded SQL database"""
+
+    def __init__(self, path, pool_size=4):
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"SQL database not found: {path}")
+        self.path = path
+        self.pool_size = pool_size
+        self.pool = ConnectionPool(path, pool_size)
+        self._pool_version = self.version()
+
+    def version(self):
+        """Return a token that changes whenever the database file changes"""
+        stat = os.stat(self.path)
+        return f"sql-{stat.st_mtime_ns}-{stat.st_size}"
+
+    def query(self, sql, params=()):
+        """Run ``sql`` and return the result as a DataFrame"""
+        version = self.version()
+        if version != self._pool_version:
+            # La base se reemplazó: las conexiones abiertas apuntan al archivo anterior
+            self.pool, self._pool_version = ConnectionPool(self.path, self.pool_size), version
+        with self.pool.connection() as conn:
+            if _is_duckdb(self.path):
+                return conn.execute(sql, list(params)).df()
+            return pd.read_sql_query(sql, conn, params=list(params))
+
+    @staticmethod
+    def _project_where(filters=None, start=None, end=None):
+        clauses, params = [], []
+        for column, value in (filters or {}).items():
+            if value is None:
+                continue
+            if column not in PROJECT_DIMENSIONS:
+                raise ValueError(f"Unknown project filter: {column}")
+            clauses.append(f"{column} = ?")
+            params.append(value)
+        if start is not None and end is not None:
+            # Solapamiento del proyecto con el período (fechas ISO comparables como texto)
+            clauses.append("(start_date IS NULL OR start_date <= ?) AND (end_date IS NULL OR end_date >= ?)")
+            params += [str(end), str(start)]
+        where = " WHERE " + " AND ".join(clauses) if clauses else ""
+        return where, params
+
+    def options(self, column):
+        """Return the distinct values of a project dimension in order of first appearance"""
+        if column not in PROJECT_DIMENSIONS:
+            raise ValueError(f"Unknown project filter: {column}")
+        df = self.query(
+            f"SELECT {column} FROM projects WHERE {column} IS NOT NULL "
+            f"GROUP BY {column} ORDER BY MIN(rowid)"
+        )
+        return df[column].tolist()
+
+    def project_count(self, filters=None, start=None, end=None):
+        """Return the number of projects matching the filters"""
+        where, params = self._project_where(filters, start, end)
+        return int(self.query(f"SELECT COUNT(*) AS n FROM projects{where}", params)["n"].iloc[0])
+
+    def project_totals(self, filters=None, start=None, end=None):
+        """Return count, sums and average progress computed in the database"""
+        where, params = self._project_where(filters, start, end)
+        row = self.query(
+            "SELECT COUNT(*) AS count, COALESCE(SUM(budget), 0) AS budget, COALESCE(SUM(spent), 0) AS spent, "
+            f"COALESCE(SUM(progress), 0) AS progress, AVG(progress) AS avg_progress FROM projects{where}",
+            params
+        ).iloc[0]
+        totals = {key: row[key] for key in ("budget", "spent", "progress")}
+        totals["count"] = int(row["count"])
+        totals["avg_progress"] = None if pd.isna(row["avg_progress"]) else float(row["avg_progress"])
+        return totals
+
+    def project_rows(self, columns, filters=None, start=None, end=None, order_by=None, ascending=True,
+                     limit=None, offset=0):
+        """Return the matching project rows, optionally ordered and paged in the database"""
+        where, params = self._project_where(filters, start, end)
+        sql = f"SELECT {', '.join(columns)} FROM projects{where}"
+        if order_by is not None:
+            if order_by not in columns:
+                raise ValueError(f"Unknown sort column: {order_by}")
+            sql += f" ORDER BY {order_by} IS NULL, {order_by} {'ASC' if ascending else 'DESC'}, rowid"
+        else:
+            sql += f" ORDER BY rowid {'ASC' if ascending else 'DESC'}"
+        if limit is not None:
+            sql += " LIMIT ? OFFSET ?"
+            params += [int(limit), int(offset)]
+        return self.query(sql, params)
+
+    def rollup(self, dimension, filters=None, start=None, end=None):
+        """Return per-value project count, budget, spent and average progress"""
+        if dimension not in PROJECT_DIMENSIONS:
+            raise ValueError(f"Unknown project dimension: {dimension}")
+        where, params = self._project_where(filters, start, end)
+        return self.query(
+            f"SELECT {dimension}, COUNT(*) AS count, SUM(budget) AS budget, SUM(spent) AS spent, "
+            f"AVG(progress) AS avg_progress FROM projects{where} GROUP BY {dimension} ORDER BY {dimension}",
+            params
+        )
+
+
+def build_database(path, store=None):
+    """Export the datasets of ``store`` into a new SQLite/DuckDB file with filter indexes"""
+    store = store or storage.open_store()
+    tmp = path + ".tmp"
+    if os.path.exists(tmp):
+        os.remove(tmp)
+    if _is_duckdb(path):
+        import duckdb  # dependencia opcional
+        conn = duckdb.connect(tmp)
+    else:
+        conn = sqlite3.connect(tmp)
+    try:
+        for table, indexed in TABLES.items():
+            df = store.read(table)
+            for column in DATE_COLUMNS:
+                if column in df.columns:
+                    # Texto ISO: el orden lexicográfico coincide con el cronológico
+                    df[column] = pd.to_datetime(df[column], errors="coerce").dt.strftime("%Y-%m-%d")
+            if _is_duckdb(path):
+                conn.register("frame", df)
+                conn.execute(f"CREATE TABLE {table} AS SELECT * FROM frame")
+                conn.unregister("frame")
+            else:
+                df.to_sql(table, conn, index=False)
+            for column in indexed:
+                if column in df.columns:
+                    conn.execute(f"CREATE INDEX idx_{table}_{column} ON {table} ({column})")
+        conn.commit()
+    finally:
+        conn.close()
+    # Reemplazo atómico para que los lectores nunca vean una base a medio escribir
+    os.replace(tmp, path)
+    return path
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        sys.exit("uso: python -m dss.sql_store <ruta.sqlite|ruta.duckdb>")
+    print(build_database(sys.argv[1]))
@@ -0,0 +1,145 @@
+"""Perfil de arranque en frío: tiempo de cada import y de cada carga inicial.
+
+Con ``DSS_PROFILE_STARTUP=1`` la aplicación registra en ``PROFILE`` el tiempo
+de su bloque de imports, de los imports diferidos (``plotly.express``,
+``dss.forecast``, ``dss.sql_store``) y de la primera carga de cada fuente, y al
+terminar la primera ejecución del proceso escribe el reporte como una línea
+JSON en la salida estándar.
+
+Para medir el arranque en un proceso nuevo, fuera de Streamlit (apto para
+registrarlo como métrica en CI)::
+
+    python -m dss.startup --json
+"""
+
+import argparse
+import importlib
+import json
+import os
+import sys
+import time
+from contextlib import contextmanager
+
+PROFILE_ENV = "DSS_PROFILE_STARTUP"
+
+# Imports en el orden en que los necesita la aplicación; los diferidos al final
+APP_IMPORTS = (
+    "streamlit",
+    "pandas",
+    "numpy",
+    "pyarrow",
+    "pyarrow.parquet",
+    "dss.storage",
+    "dss.refresh",
+    "dss.ledger",
+    "dss.indexes",
+    "dss.cube",
+    "dss.kpis",
+    "dss.charts",
+    "plotly.express",
+    "dss.forecast",
+    "dss.sql_store",
+)
+
+
+def enabled():
+    """Return whether startup profiling was requested through ``$DSS_PROFILE_STARTUP``"""
+    return os.environ.get(PROFILE_ENV, "").lower() not in ("", "0", "false", "no")
+
+
+class StartupProfile:
+    """Collects per-import and per-loader wall times of one process"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.imports = {}
+        self.loaders = {}
+        self.reported = False
+
+    def import_module(self, name):
+        """Import ``name`` and record how long it took (zero when it was already loaded)"""
+        loaded = name in sys.modules
+        started = time.perf_counter()
+        module = importlib.import_module(name)
+        if not loaded:
+            self.imports[name] = time.perf_counter() - started
+        return module
+
+    def record_import(self, name, seconds):
+        """Record an import block timed by the caller, keeping the first (cold) measurement"""
+        self.imports.setdefault(name, seconds)
+
+    @contextmanager
+    def timed(self, name):
+        """Record the wall time of the first run of loader ``name``"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.loaders.setdefault(name, time.perf_counter() - started)
+
+    def report(self):
+        """Return the collected times, in seconds, as a JSON-serializable dict"""
+        return {
+            "imports": {name: round(seconds, 4) for name, seconds in self.imports.items()},
+            "loaders": {name: round(seconds, 4) for name, seconds in self.loaders.items()},
+            "import_seconds": round(sum(self.imports.values()), 4),
+            "loader_seconds": round(sum(self.loaders.values()), 4),
+            "total_seconds": round(time.perf_counter() - self.started, 4),
+        }
+
+    def emit(self, stream=None):
+        """Write the report once per process as a single JSON line"""
+        if self.reported:
+            return
+        self.reported = True
+        print(json.dumps({"startup_profile": self.report()}), file=stream or sys.stdout, flush=True)
+
+
+# Perfil del proceso actual; sobrevive a los reruns porque el módulo se importa una sola vez
+PROFILE = StartupProfile()
+
+
+def profile_cold_start(profile=None):
+    """Import the application dependencies and load every data source in this process"""
+    profile = profile or PROFILE
+    for name in APP_IMPORTS:
+        profile.import_module(name)
+
+    from dss import indexes, kpis, ledger, storage
+
+    with profile.timed("open_store"):
+        store = storage.open_store()
+    frames = {}
+    for name in storage.DATASETS:
+        with profile.timed(f"dataset:{name}"):
+            frames[name] = store.read(name)
+    with profile.timed("index:projects"):
+        indexes.IntervalIndex(frames["projects"]["start_date"], frames["projects"]["end_date"])
+    with profile.timed("index:clients"):
+        indexes.PointIndex(frames["clients"]["contract_date"])
+    ledger_dir = ledger.default_ledger_dir()
+    if ledger.ledger_version(ledger_dir):
+        with profile.timed("ledger"):
+            ledger.LedgerBuckets(ledger_dir).sync()
+    with profile.timed("kpis"):
+        engine = kpis.KpiEngine(projects=frames["projects"], clients=frames["clients"])
+        engine.add_revenue(frames["monthly_revenue"]["month"], frames["monthly_revenue"]["revenue"])
+        engine.snapshot()
+    return profile.report()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mide el arranque en frío de la aplicación en un proceso nuevo")
+    parser.add_argument("--json", action="store_true", help="imprimir el reporte como una línea JSON")
+    args = parser.parse_args()
+
+    report = profile_cold_start()
+    if args.json:
+        print(json.dumps(report))
+    else:
+        for section in ("imports", "loaders"):
+            print(section)
+            for name, seconds in sorted(report[section].items(), key=lambda item: -item[1]):
+                print(f"  {name:<28} {seconds * 1000:9.1f} ms")
+        print(f"total {report['total_seconds'] * 1000:.1f} ms")
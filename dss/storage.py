@@ -0,0 +1,271 @@
+"""Capa de almacenamiento enchufable detrás de los loaders de ``streamlit_app.py``.
+
+Cada conjunto de datos (``projects``, ``clients``, ``service_areas``,
+``monthly_revenue``, ``yearly_summary``) se lee como tabla columnar. ``ArrowStore`` abre archivos Parquet o Arrow IPC (Feather v2)
+mediante memory mapping y proyección de columnas, de modo que solo se paginan
+las columnas que pide cada módulo. ``InlineStore`` sirve los datos de ejemplo
+embebidos cuando no hay un directorio de datos configurado, y
+``SharedMemoryStore`` lee el snapshot que un proceso publicador deja en
+memoria compartida para que varios workers usen las mismas páginas.
+"""
+
+import argparse
+import hashlib
+import os
+import shutil
+import time
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+import pyarrow.parquet as pq
+
+from dss import sample_data, schema
+
+DATASETS = ("projects", "clients", "service_areas", "monthly_revenue", "yearly_summary")
+
+# Extensiones soportadas por orden de preferencia
+ARROW_EXTENSIONS = (".arrow", ".feather")
+PARQUET_EXTENSIONS = (".parquet",)
+
+# Memoria compartida: puntero a la versión publicada y versiones que se conservan
+CURRENT_FILE = "CURRENT"
+KEEP_VERSIONS = 2
+
+
+class DataStore:
+    """Base interface for dataset backends"""
+
+    def read(self, name, columns=None):
+        """Return dataset ``name`` as a DataFrame with compact dtypes, optionally projected to ``columns``"""
+        df = self.read_table(name, columns).to_pandas(split_blocks=True, self_destruct=True)
+        return schema.apply_schema(df, name)
+
+    def read_table(self, name, columns=None):
+        """Return dataset ``name`` as a ``pyarrow.Table``"""
+        raise NotImplementedError
+
+    def version(self, name):
+        """Return a token that changes whenever dataset ``name`` changes"""
+        raise NotImplementedError
+
+    def columns(self, name):
+        """Return the column names available for dataset ``name``"""
+        return self.read_table(name).column_names
+
+
+class InlineStore(DataStore):
+    """Serves the embedded sample data"""
+
+    _records = {
+        "projects": sample_data.PROJECTS,
+        "clients": sample_data.CLIENTS,
+        "service_areas": sample_data.SERVICE_AREAS,
+        "monthly_revenue": sample_data.MONTHLY_REVENUE,
+        "yearly_summary": sample_data.YEARLY_SUMMARY,
+    }
+
+    def read_table(self, name, columns=None):
+        if name not in self._records:
+            raise KeyError(f"Unknown dataset: {name}")
+        table = pa.Table.from_pylist(self._records[name])
+        return table.select(list(columns)) if columns else table
+
+    def version(self, name):
+        return "inline"
+
+
+class ArrowStore(DataStore):
+    """Reads ``<name>.parquet`` / ``<name>.arrow`` files from a directory"""
+
+    def __init__(self, root):
+        self.root = root
+
+    def _path(self, name):
+        for ext in ARROW_EXTENSIONS + PARQUET_EXTENSIONS:
+            path = os.path.join(self.root, name + ext)
+            if os.path.exists(path):
+                return path
+        return None
+
+    def read_table(self, name, columns=None):
+        path = self._path(name)
+        if path is None:
+            # Sin archivo para este dataset: usar los datos de ejemplo
+            return InlineStore().read_table(name, columns)
+        columns = list(columns) if columns else None
+        if path.endswith(PARQUET_EXTENSIONS):
+            return pq.read_table(path, columns=columns, memory_map=True)
+        # Arrow IPC: las columnas quedan respaldadas por el mapa de memoria
+        # (feather.read_table copia los buffers aun con memory_map=True)
+        table = pa.ipc.open_file(pa.memory_map(path)).read_all()
+        return table.select(columns) if columns else table
+
+    def columns(self, name):
+        path = self._path(name)
+        if path is None:
+            return InlineStore().columns(name)
+        if path.endswith(PARQUET_EXTENSIONS):
+            return pq.read_schema(path, memory_map=True).names
+        with pa.memory_map(path) as source:
+            return pa.ipc.open_file(source).schema.names
+
+    def version(self, name):
+        path = self._path(name)
+        if path is None:
+            return "inline"
+        stat = os.stat(path)
+        return f"{stat.st_mtime_ns}-{stat.st_size}"
+
+
+class SharedMemoryStore(DataStore):
+    """Attaches to datasets published as Arrow IPC files in shared memory.
+
+    A publisher writes every dataset of a snapshot into ``<root>/<stamp>/``
+    and then swaps the ``CURRENT`` pointer file atomically. Worker processes
+    memory-map the files of the current snapshot, so the pages are shared by
+    all of them, and a refresh becomes visible to every worker at once. Until
+    something is published, reads go to ``fallback``.
+    """
+
+    def __init__(self, root, fallback=None):
+        self.root = root
+        self.fallback = fallback or InlineStore()
+
+    def current(self):
+        """Return the stamp of the published snapshot, or None if nothing was published"""
+        try:
+            with open(os.path.join(self.root, CURRENT_FILE), encoding="utf-8") as fh:
+                return fh.read().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def _snapshot(self):
+        stamp = self.current()
+        return ArrowStore(os.path.join(self.root, stamp)) if stamp else self.fallback
+
+    def read_table(self, name, columns=None):
+        return self._snapshot().read_table(name, columns)
+
+    def columns(self, name):
+        return self._snapshot().columns(name)
+
+    def version(self, name):
+        stamp = self.current()
+        return f"shm-{stamp}" if stamp else self.fallback.version(name)
+
+
+def snapshot_stamp(source):
+    """Return a stamp that changes whenever any dataset of ``source`` changes"""
+    versions = "|".join(f"{name}={source.version(name)}" for name in DATASETS)
+    return hashlib.sha1(versions.encode("utf-8")).hexdigest()[:16]
+
+
+def publish_shared(source, root):
+    """Publish every dataset of ``source`` under ``root`` and point ``CURRENT`` at it.
+
+    Returns the stamp of the published snapshot; nothing is written when it is
+    already the current one.
+    """
+    shared = SharedMemoryStore(root)
+    stamp = snapshot_stamp(source)
+    if shared.current() == stamp:
+        return stamp
+    target = os.path.join(root, stamp)
+    tmp = target + ".tmp"
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+    for name in DATASETS:
+        # Se publica ya con el esquema compacto: los workers no vuelven a convertir
+        write_dataset(source.read(name), os.path.join(tmp, name + ".arrow"))
+    shutil.rmtree(target, ignore_errors=True)
+    os.replace(tmp, target)
+    pointer = os.path.join(root, CURRENT_FILE + ".tmp")
+    with open(pointer, "w", encoding="utf-8") as fh:
+        fh.write(stamp)
+    os.replace(pointer, os.path.join(root, CURRENT_FILE))
+
+    # Borrar snapshots antiguos; los archivos ya mapeados siguen válidos hasta que se liberan
+    snapshots = sorted(
+        (entry for entry in os.scandir(root) if entry.is_dir() and entry.name != stamp),
+        key=lambda entry: entry.stat().st_mtime_ns, reverse=True
+    )
+    for entry in snapshots[KEEP_VERSIONS - 1:]:
+        shutil.rmtree(entry.path, ignore_errors=True)
+    return stamp
+
+
+def _open_source(data_dir):
+    if data_dir and os.path.isdir(data_dir):
+        return ArrowStore(data_dir)
+    return InlineStore()
+
+
+def open_store(data_dir=None):
+    """Return the store for ``data_dir`` (or ``$DSS_DATA_DIR``), falling back to sample data.
+
+    With ``$DSS_SHM_DIR`` set, datasets are read from the snapshot published
+    there by ``python -m dss.storage publish``.
+    """
+    store = _open_source(data_dir or os.environ.get("DSS_DATA_DIR"))
+    if os.environ.get("DSS_SHM_DIR"):
+        return SharedMemoryStore(os.environ["DSS_SHM_DIR"], fallback=store)
+    return store
+
+
+def read_only(df):
+    """Return ``df`` rebuilt, without copying, on read-only arrays.
+
+    The result can be shared between sessions: in-place writes raise instead
+    of changing the data seen by everyone else. Arrow-backed columns are
+    immutable already and are passed through.
+    """
+    columns = {}
+    for column, series in df.items():
+        values = series.array
+        if isinstance(values, pd.Categorical):
+            # ``codes`` ya es una vista de solo lectura
+            values = pd.Categorical.from_codes(values.codes, dtype=series.dtype)
+        elif isinstance(series.dtype, np.dtype):
+            values = series.to_numpy().view()
+            values.flags.writeable = False
+        columns[column] = values
+    return pd.DataFrame(columns, index=df.index, copy=False)
+
+
+def write_dataset(df, path):
+    """Write ``df`` to ``path`` as Parquet or Arrow IPC depending on the extension.
+
+    The file is written next to ``path`` and moved into place, so processes
+    that have the previous file memory-mapped keep reading it intact.
+    """
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    tmp = path + ".tmp"
+    if path.endswith(PARQUET_EXTENSIONS):
+        pq.write_table(table, tmp)
+    else:
+        # Un solo lote por archivo: las columnas se mapean sin concatenar ni copiar
+        table = table.combine_chunks()
+        feather.write_feather(table, tmp, compression="uncompressed", chunksize=max(table.num_rows, 1))
+    os.replace(tmp, path)
+    return path
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Publica los datasets en memoria compartida para los workers")
+    parser.add_argument("command", choices=["publish"])
+    parser.add_argument("--shm-dir", default=os.environ.get("DSS_SHM_DIR", "/dev/shm/dss"))
+    parser.add_argument("--data-dir", default=os.environ.get("DSS_DATA_DIR"))
+    parser.add_argument("--interval", type=float, default=0, help="segundos entre revisiones (0: publicar una vez)")
+    args = parser.parse_args()
+
+    os.makedirs(args.shm_dir, exist_ok=True)
+    published = None
+    while True:
+        stamp = publish_shared(_open_source(args.data_dir), args.shm_dir)
+        if stamp != published:
+            print(f"publicado {stamp} en {args.shm_dir}", flush=True)
+            published = stamp
+        if not args.interval:
+            break
+        time.sleep(args.interval)
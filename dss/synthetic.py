@@ -0,0 +1,207 @@
+"""Generador sintético (con semilla) de carteras de proyectos para pruebas de escala.
+
+Produce los mismos datasets que lee ``dss.storage`` (proyectos, clientes,
+áreas, ingresos mensuales y resumen anual) y, opcionalmente, archivos del
+libro de ingresos, desde 10³ hasta 10⁷ proyectos. Las categorías (áreas,
+estados, ubicaciones y sectores) son las de los datos de ejemplo; el número
+de clientes crece con la cartera (un cliente cada ``PROJECTS_PER_CLIENT``
+proyectos) y los montos siguen una distribución log-normal. La misma semilla
+genera siempre los mismos datos. Opcionalmente escribe también un archivo de
+cambios de avance y gasto para ``dss.deltas``.
+
+Para escribir una cartera en un directorio de datos::
+
+    python -m dss.synthetic /tmp/dss-1e6 --rows 1000000 --ledger-rows 5000000
+    export DSS_DATA_DIR=/tmp/dss-1e6
+"""
+
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+from dss import sample_data, storage
+
+AREAS = [area["area"] for area in sample_data.SERVICE_AREAS]
+STATUSES = ["En Progreso", "Completado", "Pendiente"]
+STATUS_WEIGHTS = [0.45, 0.4, 0.15]
+LOCATIONS = sorted({project["location"] for project in sample_data.PROJECTS} | {client["location"] for client in sample_data.CLIENTS})
+SECTORS = sorted({client["sector"] for client in sample_data.CLIENTS})
+
+PROJECTS_PER_CLIENT = 40
+MIN_CLIENTS = 5
+MAX_CLIENTS = 100_000
+
+# Período cubierto por la cartera sintética
+FIRST_DAY = np.datetime64("2020-01-01")
+LAST_DAY = np.datetime64("2025-12-31")
+
+# Archivos del libro: uno por año, para que agregar un año sea incremental
+LEDGER_DIR = "ledger"
+
+# Cambios de avance y gasto (upserts por id) que lee dss.deltas
+DELTA_DIR = "deltas"
+
+
+def client_count(rows):
+    """Return the number of clients generated for a portfolio of ``rows`` projects"""
+    return int(np.clip(rows // PROJECTS_PER_CLIENT, MIN_CLIENTS, MAX_CLIENTS))
+
+
+def _codes(prefix, n):
+    width = max(len(str(n)), 3)
+    return pd.Series(np.arange(1, n + 1)).astype("string").str.zfill(width).radd(prefix)
+
+
+def generate_clients(n, rng):
+    """Return ``n`` clients with sector, location, satisfaction and contract date"""
+    span = int((LAST_DAY - FIRST_DAY).astype(int))
+    return pd.DataFrame({
+        "id": _codes("C", n),
+        "name": _codes("Cliente ", n),
+        "sector": pd.Categorical.from_codes(rng.integers(0, len(SECTORS), n), SECTORS),
+        "location": pd.Categorical.from_codes(rng.integers(0, len(LOCATIONS), n), LOCATIONS),
+        "satisfaction": np.round(rng.uniform(70, 100, n), 1),
+        "contract_date": FIRST_DAY - 365 + rng.integers(0, span, n).astype("timedelta64[D]"),
+    })
+
+
+def generate_projects(rows, clients, rng):
+    """Return ``rows`` projects assigned to ``clients`` with a skewed (Zipf-like) distribution"""
+    # Pocos clientes concentran la mayoría de los proyectos, como en una cartera real
+    weights = 1.0 / np.arange(1, len(clients) + 1)
+    client_rows = rng.choice(len(clients), size=rows, p=weights / weights.sum())
+    status = rng.choice(len(STATUSES), size=rows, p=STATUS_WEIGHTS)
+    progress = np.where(status == STATUSES.index("Completado"), 100,
+                        np.where(status == STATUSES.index("Pendiente"), 0, rng.integers(1, 100, rows)))
+    budget = np.round(rng.lognormal(mean=12.3, sigma=0.6, size=rows), -3)
+    spent = np.round(budget * progress / 100 * rng.normal(1.0, 0.12, rows).clip(0.5, 1.6), -2)
+    span = int((LAST_DAY - FIRST_DAY).astype(int))
+    start = FIRST_DAY + rng.integers(0, span - 30, rows).astype("timedelta64[D]")
+    end = np.minimum(start + rng.integers(30, 540, rows).astype("timedelta64[D]"), LAST_DAY)
+    return pd.DataFrame({
+        "id": _codes("P", rows),
+        "name": _codes("Proyecto ", rows),
+        "client": pd.Categorical(clients["name"].to_numpy()[client_rows], categories=clients["name"]),
+        "status": pd.Categorical.from_codes(status, STATUSES),
+        "progress": progress.astype(np.int8),
+        "budget": budget,
+        "spent": spent,
+        "area": pd.Categorical.from_codes(rng.integers(0, len(AREAS), rows), AREAS),
+        "location": pd.Categorical.from_codes(rng.integers(0, len(LOCATIONS), rows), LOCATIONS),
+        "start_date": start,
+        "end_date": end,
+    })
+
+
+def generate_ledger(rows, projects, rng):
+    """Return ``rows`` invoice lines drawn from the projects, dated within each project's span"""
+    picks = rng.integers(0, len(projects), rows)
+    start = projects["start_date"].to_numpy()[picks]
+    days = (projects["end_date"].to_numpy()[picks] - start).astype("timedelta64[D]").astype(np.int64)
+    offsets = (rng.random(rows) * (days + 1)).astype(np.int64)
+    return pd.DataFrame({
+        "date": start + offsets.astype("timedelta64[D]"),
+        "area": projects["area"].to_numpy()[picks],
+        "client": projects["client"].to_numpy()[picks],
+        "amount": np.round(rng.lognormal(mean=9.5, sigma=0.8, size=rows), 2),
+    })
+
+
+def generate_delta(rows, projects, rng):
+    """Return ``rows`` progress/spent upserts for distinct existing projects"""
+    picks = np.sort(rng.choice(len(projects), size=min(rows, len(projects)), replace=False))
+    progress = np.minimum(projects["progress"].to_numpy()[picks].astype(np.int64) + rng.integers(0, 10, len(picks)), 100)
+    budget = projects["budget"].to_numpy()[picks]
+    return pd.DataFrame({
+        "id": projects["id"].to_numpy()[picks],
+        "progress": progress.astype(np.int8),
+        "spent": np.round(budget * progress / 100 * rng.normal(1.0, 0.12, len(picks)).clip(0.5, 1.6), -2),
+    })
+
+
+def generate(rows, seed=0, ledger_rows=0, delta_rows=0):
+    """Return the synthetic datasets (and ledger lines when ``ledger_rows``) as DataFrames"""
+    rng = np.random.default_rng(seed)
+    clients = generate_clients(client_count(rows), rng)
+    projects = generate_projects(rows, clients, rng)
+
+    by_client = projects.groupby("client", observed=False)["budget"].agg(["size", "sum"])
+    clients = clients.assign(
+        projects_count=by_client["size"].to_numpy(),
+        total_revenue=by_client["sum"].to_numpy(),
+    )[["id", "name", "sector", "projects_count", "total_revenue", "satisfaction", "location", "contract_date"]]
+
+    by_area = projects.groupby("area", observed=False).agg(revenue=("budget", "sum"), projects=("id", "size"))
+    service_areas = pd.DataFrame({
+        "area": AREAS,
+        "revenue": by_area["revenue"].reindex(AREAS, fill_value=0).to_numpy(),
+        "projects": by_area["projects"].reindex(AREAS, fill_value=0).to_numpy(),
+        "efficiency": np.round(rng.uniform(80, 98, len(AREAS)), 1),
+    })
+
+    # Ingresos: lo gastado en cada proyecto, imputado a su mes de inicio
+    month = projects["start_date"].to_numpy().astype("datetime64[M]")
+    monthly = pd.Series(projects["spent"].to_numpy()).groupby(month).sum()
+    monthly_revenue = pd.DataFrame({
+        "month": monthly.index.astype("datetime64[ns]").strftime("%Y-%m-%d"),
+        "revenue": monthly.to_numpy(),
+    })
+
+    year = projects["start_date"].dt.year
+    yearly_summary = pd.DataFrame({
+        "year": np.sort(year.unique()),
+    })
+    yearly_summary["revenue"] = yearly_summary["year"].map(projects["spent"].groupby(year).sum()).to_numpy()
+    yearly_summary["clients"] = yearly_summary["year"].map(projects.groupby(year)["client"].nunique()).to_numpy()
+    yearly_summary["projects"] = yearly_summary["year"].map(year.value_counts()).to_numpy()
+
+    datasets = {
+        "projects": projects,
+        "clients": clients,
+        "service_areas": service_areas,
+        "monthly_revenue": monthly_revenue,
+        "yearly_summary": yearly_summary,
+    }
+    if ledger_rows:
+        datasets["ledger"] = generate_ledger(ledger_rows, projects, rng)
+    if delta_rows:
+        datasets["delta"] = generate_delta(delta_rows, projects, rng)
+    return datasets
+
+
+def write_synthetic(data_dir, rows, seed=0, ledger_rows=0, delta_rows=0):
+    """Write a synthetic portfolio into ``data_dir`` as a ``DSS_DATA_DIR`` layout; returns the file paths"""
+    os.makedirs(data_dir, exist_ok=True)
+    datasets = generate(rows, seed, ledger_rows, delta_rows)
+    ledger = datasets.pop("ledger", None)
+    delta = datasets.pop("delta", None)
+    paths = []
+    for name, df in datasets.items():
+        # Tablas grandes en Arrow IPC (lectura sin copia), las pequeñas en Parquet
+        ext = ".arrow" if name in ("projects", "clients") else ".parquet"
+        paths.append(storage.write_dataset(df, os.path.join(data_dir, name + ext)))
+    if ledger is not None:
+        ledger_dir = os.path.join(data_dir, LEDGER_DIR)
+        os.makedirs(ledger_dir, exist_ok=True)
+        for year, lines in ledger.groupby(ledger["date"].dt.year):
+            paths.append(storage.write_dataset(lines, os.path.join(ledger_dir, f"ledger_{year}.parquet")))
+    if delta is not None:
+        delta_dir = os.path.join(data_dir, DELTA_DIR)
+        os.makedirs(delta_dir, exist_ok=True)
+        paths.append(storage.write_dataset(delta, os.path.join(delta_dir, "delta_0001.parquet")))
+    return paths
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Genera una cartera sintética en un directorio de datos")
+    parser.add_argument("data_dir")
+    parser.add_argument("--rows", type=int, default=100_000, help="número de proyectos")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--ledger-rows", type=int, default=0, help="líneas del libro de ingresos (0: sin libro)")
+    parser.add_argument("--delta-rows", type=int, default=0, help="proyectos con cambios de avance y gasto (0: sin deltas)")
+    args = parser.parse_args()
+
+    for path in write_synthetic(args.data_dir, args.rows, args.seed, args.ledger_rows, args.delta_rows):
+        print(path)
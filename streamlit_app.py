@@ -1,10 +1,20 @@
+import time
+_imports_started = time.perf_counter()
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeout
 import streamlit as st
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
 from datetime import datetime, date
 import numpy as np
 
+# plotly.express (en dss.charts), dss.forecast y dss.sql_store se importan recién al usarlos
+from dss import charts, cube, deltas, export, indexes, kpis as kpi_engine, ledger, metrics, refresh, risk, startup, storage
+
+startup.PROFILE.record_import("streamlit_app", time.perf_counter() - _imports_started)
+metrics.METRICS.start_run()
+
 # Configuración de la página
 try:
     st.set_page_config(
@@ -16,19 +26,222 @@ try:
 except Exception as e:
     st.error(f"Error en configuración: {e}")
 
-@st.cache_data
+@st.cache_resource
+def get_data_store():
+    """Open the configured data store once per process"""
+    return storage.open_store()
+
+@st.cache_resource(max_entries=256)
+def _shared_column(name, column, version):
+    """Read one dataset column once per process into a read-only array shared by every session"""
+    metrics.METRICS.cache_miss("column")
+    if name == "projects" and version[1]:
+        # Columna modificada por los deltas: la fusión ya la tiene en memoria
+        return get_delta_log(version[0]).column(column, version[1])
+    return storage.read_only(get_data_store().read(name, [column]))[column]
+
+@st.cache_resource(max_entries=64)
+def _dataset_columns(name, version):
+    """Return the column names of a dataset version"""
+    return tuple(get_data_store().columns(name))
+
+@st.cache_resource
+def get_delta_log(base_version):
+    """Open the log that merges the project delta files over one version of the projects file"""
+    return deltas.DeltaLog(
+        lambda column: _shared_column("projects", column, (base_version, 0)),
+        _dataset_columns("projects", (base_version, 0))
+    )
+
+def warm_dataset(name, version):
+    """Load every column of a dataset version, and the indexes built on it, before it is published"""
+    with startup.PROFILE.timed(f"dataset:{name}"):
+        if name == "projects":
+            # Fusionar los deltas nuevos: solo cambian las columnas y las filas que tocan
+            snapshot = get_delta_log(version[0]).sync(deltas.default_delta_dir(), version[1])
+            version = (version[0], snapshot.id)
+        for column in _dataset_columns(name, version):
+            _shared_column(name, column, _column_version(name, column, version))
+        for build_index in DATASET_INDEXES.get(name, ()):
+            build_index(version)
+
+def warm_ledger(version):
+    """Fold new ledger files into the buckets before the new ledger version is published"""
+    if version:
+        with startup.PROFILE.timed("ledger"):
+            _read_ledger(version)
+            _read_ledger_annual(version)
+
+@st.cache_resource
+def get_refresher():
+    """Start the background refresher that publishes new data versions once they are loaded"""
+    sources = {name: (lambda name=name: get_data_store().version(name), lambda v, name=name: warm_dataset(name, v))
+               for name in storage.DATASETS}
+    # Proyectos: archivo base más los archivos de cambios aplicados sobre él
+    sources["projects"] = (
+        lambda: (get_data_store().version("projects"), deltas.delta_version(deltas.default_delta_dir())),
+        lambda v: warm_dataset("projects", v)
+    )
+    sources["ledger"] = (lambda: ledger.ledger_version(ledger.default_ledger_dir()), warm_ledger)
+    interval = float(os.environ.get("DSS_REFRESH_SECONDS", 30))
+    return refresh.SnapshotRefresher(sources, interval).start()
+
+def dataset_version(name):
+    """Return the last published version token of a dataset"""
+    version = get_refresher().version(name)
+    if name == "projects":
+        # (versión del archivo base, instantánea de deltas publicada)
+        return version[0], get_delta_log(version[0]).snapshot(version[1]).id
+    return version
+
+def _column_version(name, column, version):
+    """Return the version of one column: for projects, the snapshot that last changed it"""
+    if name == "projects":
+        return version[0], get_delta_log(version[0]).snapshots[version[1]].column_ids[column]
+    return version
+
+def projects_columns_version(columns, version=None):
+    """Return the projects version as seen by ``columns``: it changes only when a delta touches them"""
+    version = version or dataset_version("projects")
+    return version[0], get_delta_log(version[0]).snapshots[version[1]].columns_id(columns)
+
+def _load_dataset(name, columns=None, version=None):
+    """Assemble the requested columns of a dataset from the shared read-only column cache.
+
+    Each call returns a new frame over the shared arrays (no data is copied),
+    so sessions can add or replace columns locally but never write into the
+    data seen by other sessions.
+    """
+    version = version or dataset_version(name)
+    columns = list(columns) if columns else _dataset_columns(name, version)
+    metrics.METRICS.cache_lookup("column", len(columns))
+    return pd.DataFrame({col: _shared_column(name, col, _column_version(name, col, version)) for col in columns}, copy=False)
+
+# Los índices de proyectos se versionan por las columnas que leen (ver projects_columns_version)
+PROJECT_PERIOD_COLUMNS = ['start_date', 'end_date']
+PROJECT_JOIN_COLUMNS = ['client', 'budget', 'spent', 'progress']
+PROJECT_KPI_COLUMNS = ['status', 'budget', 'spent', 'progress']
+PROJECT_RISK_COLUMNS = list(risk.COLUMNS)
+
+@st.cache_resource(max_entries=deltas.KEEP_SNAPSHOTS)
+def get_project_period_index(version):
+    """Build the start/end interval index over projects once per version of those columns"""
+    df = _load_dataset("projects", PROJECT_PERIOD_COLUMNS, version)
+    return indexes.IntervalIndex(df["start_date"], df["end_date"])
+
+@st.cache_resource(max_entries=deltas.KEEP_SNAPSHOTS)
+def get_project_category_index(version):
+    """Build the status/area/client row-id index over projects once per version of those columns"""
+    df = _load_dataset("projects", PROJECT_FILTER_COLUMNS, version)
+    return indexes.CategoryIndex(df, PROJECT_FILTER_COLUMNS)
+
+@st.cache_resource(max_entries=deltas.KEEP_SNAPSHOTS)
+def get_project_cube(version):
+    """Materialize the project aggregate cube, updating the previous one when only measures changed"""
+    log = get_delta_log(version[0])
+    
+    def update(previous, snapshot, rows, added):
+        # El cubo no agrega filas: los proyectos nuevos lo reconstruyen
+        if added.size or not set(snapshot.changes).intersection(PROJECT_CUBE_COLUMNS) <= set(cube.MEASURES):
+            return None
+        return previous.updated(rows, {m: log.values(m, snapshot.id, rows) for m in cube.MEASURES})
+    
+    return log.derive("cube", PROJECT_CUBE_COLUMNS, version[1],
+                      lambda: cube.AggregateCube(_load_dataset("projects", PROJECT_CUBE_COLUMNS, version)), update)
+
+@st.cache_resource(max_entries=deltas.KEEP_SNAPSHOTS)
+def get_risk_model(version):
+    """Compute the overrun and burn-rate metrics of every project, updating the changed rows when only measures changed"""
+    log = get_delta_log(version[0])
+    
+    def update(previous, snapshot, rows, added):
+        # Los proyectos nuevos cambian las medianas de sus áreas: se reconstruye
+        if added.size or not set(snapshot.changes).intersection(PROJECT_RISK_COLUMNS) <= set(risk.MEASURES):
+            return None
+        return previous.updated(rows, {m: log.values(m, snapshot.id, rows) for m in risk.MEASURES})
+    
+    return log.derive("risk", PROJECT_RISK_COLUMNS, version[1],
+                      lambda: risk.RiskModel(_load_dataset("projects", PROJECT_RISK_COLUMNS, version)), update)
+
+@st.cache_resource(max_entries=deltas.KEEP_SNAPSHOTS)
+def get_client_contract_index(version):
+    """Build the sorted contract_date index over clients once per data version"""
+    df = _load_dataset("clients", ["contract_date"], version)
+    return indexes.PointIndex(df["contract_date"])
+
+@st.cache_resource(max_entries=deltas.KEEP_SNAPSHOTS)
+def get_client_join(projects_version, clients_version):
+    """Build the project → client join and the per-client rollups, updating the previous rollups when only measures changed"""
+    log = get_delta_log(projects_version[0])
+    measures = ["budget", "spent", "progress"]
+    
+    def build():
+        projects = _load_dataset("projects", PROJECT_JOIN_COLUMNS, projects_version)
+        clients = _load_dataset("clients", ["name"], clients_version)
+        return indexes.ClientJoin(projects, clients)
+    
+    def update(previous, snapshot, rows, added):
+        # Un proyecto nuevo o un cambio de cliente mueve filas entre clientes: se reconstruye el join
+        if added.size or "client" in snapshot.changes:
+            return None
+        old = {m: log.values(m, snapshot.parent, rows) for m in measures}
+        new = {m: log.values(m, snapshot.id, rows) for m in measures}
+        return previous.updated(rows, old, new)
+    
+    return log.derive(("client_join", clients_version), PROJECT_JOIN_COLUMNS, projects_version[1], build, update)
+
+def client_table_version():
+    """Return the (projects, clients) versions the client table is derived from"""
+    return projects_columns_version(PROJECT_JOIN_COLUMNS), dataset_version("clients")
+
+@st.cache_resource(max_entries=deltas.KEEP_SNAPSHOTS)
+def get_client_table(versions):
+    """Join the client attributes with their project rollups once per data version"""
+    attributes = [col for col in CLIENT_TABLE_COLUMNS if col not in indexes.ClientJoin.ROLLUP_COLUMNS]
+    clients = _load_dataset("clients", attributes, versions[1])
+    return get_client_join(*versions).table(clients)[CLIENT_TABLE_COLUMNS]
+
+# Índices que se construyen junto con cada nueva versión de un dataset
+DATASET_INDEXES = {
+    "projects": (
+        lambda v: get_project_period_index(projects_columns_version(PROJECT_PERIOD_COLUMNS, v)),
+        lambda v: get_project_category_index(projects_columns_version(PROJECT_FILTER_COLUMNS, v)),
+        lambda v: get_project_cube(projects_columns_version(PROJECT_CUBE_COLUMNS, v)),
+        lambda v: get_risk_model(projects_columns_version(PROJECT_RISK_COLUMNS, v)),
+    ),
+    "clients": (get_client_contract_index,),
+}
+
+@st.cache_resource(max_entries=deltas.KEEP_SNAPSHOTS)
+def get_kpi_engine(versions):
+    """Build the KPI accumulators once per data version, updating the previous ones when only project rows changed or were appended"""
+    projects_version, clients_version, revenue_version = versions
+    log = get_delta_log(projects_version[0])
+    
+    def build():
+        return kpi_engine.KpiEngine(
+            projects=_load_dataset("projects", PROJECT_KPI_COLUMNS, projects_version),
+            clients=_load_dataset("clients", ["satisfaction", "contract_date"], clients_version),
+            monthly_revenue=load_monthly_revenue_data()
+        )
+    
+    def update(previous, snapshot, rows, added):
+        old = pd.DataFrame({col: log.values(col, snapshot.parent, rows) for col in PROJECT_KPI_COLUMNS})
+        new = pd.DataFrame({col: log.values(col, snapshot.id, rows) for col in PROJECT_KPI_COLUMNS})
+        appended = pd.DataFrame({col: log.values(col, snapshot.id, added) for col in PROJECT_KPI_COLUMNS})
+        return previous.updated(old, new, appended)
+    
+    return log.derive(("kpis", clients_version, revenue_version), PROJECT_KPI_COLUMNS, projects_version[1], build, update)
+
+def kpi_versions():
+    """Return the versions of the data the KPIs derive from"""
+    return projects_columns_version(PROJECT_KPI_COLUMNS), dataset_version("clients"), monthly_revenue_version()
+
+@metrics.METRICS.timed("loader")
 def load_kpi_data():
     """Load KPI data with enhanced error handling"""
     try:
-        data = {
-            "revenue": 2850000,
-            "activeProjects": 24,
-            "clientSatisfaction": 94.2,
-            "efficiency": 87.5,
-            "monthlyGrowth": 12.3,
-            "clients": 89,
-            "newClients": 12
-        }
+        data = get_kpi_engine(kpi_versions()).snapshot()
         # Validate data types
         for key, value in data.items():
             if not isinstance(value, (int, float)):
@@ -38,80 +251,15 @@ def load_kpi_data():
         st.error(f"Error loading KPI data: {e}")
         return {}
 
-@st.cache_data
-def load_projects_data():
+@metrics.METRICS.timed("loader")
+def load_projects_data(columns=None):
     """Load projects data as DataFrame with enhanced validation"""
     try:
-        data = [
-            {
-                "id": "P001",
-                "name": "Automatización Planta ABB",
-                "client": "ABB",
-                "status": "En Progreso",
-                "progress": 75,
-                "budget": 450000,
-                "spent": 337500,
-                "area": "Automatización",
-                "location": "Lima Norte",
-                "start_date": "2023-01-15",
-                "end_date": "2023-07-30"
-            },
-            {
-                "id": "P002",
-                "name": "Sistema Eléctrico Schneider",
-                "client": "Schneider Electric",
-                "status": "Completado",
-                "progress": 100,
-                "budget": 320000,
-                "spent": 315000,
-                "area": "Electricidad",
-                "location": "Lima Centro",
-                "start_date": "2023-02-01",
-                "end_date": "2023-05-15"
-            },
-            {
-                "id": "P003",
-                "name": "Refrigeración Industrial Carrier",
-                "client": "Carrier",
-                "status": "En Progreso",
-                "progress": 60,
-                "budget": 280000,
-                "spent": 168000,
-                "area": "Refrigeración",
-                "location": "Callao",
-                "start_date": "2023-03-10",
-                "end_date": "2023-08-20"
-            },
-            {
-                "id": "P004",
-                "name": "Mantenimiento Preventivo Siemens",
-                "client": "Siemens",
-                "status": "Pendiente",
-                "progress": 25,
-                "budget": 150000,
-                "spent": 37500,
-                "area": "Mantenimiento",
-                "location": "Lima Sur",
-                "start_date": "2023-04-01",
-                "end_date": "2023-09-30"
-            },
-            {
-                "id": "P005",
-                "name": "Obras Civiles Constructora ABC",
-                "client": "Constructora ABC",
-                "status": "En Progreso",
-                "progress": 85,
-                "budget": 520000,
-                "spent": 442000,
-                "area": "Obras Civiles",
-                "location": "Lima Este",
-                "start_date": "2023-01-20",
-                "end_date": "2023-06-15"
-            }
-        ]
-        df = pd.DataFrame(data)
+        df = _load_dataset("projects", columns)
         # Validate DataFrame structure
         required_columns = ['id', 'name', 'client', 'status', 'progress', 'budget', 'spent', 'area']
+        if columns:
+            required_columns = [col for col in required_columns if col in columns]
         if not all(col in df.columns for col in required_columns):
             raise ValueError("Missing required columns in projects data")
         return df
@@ -119,80 +267,465 @@ def load_projects_data():
         st.error(f"Error loading projects data: {e}")
         return pd.DataFrame()
 
-@st.cache_data
-def load_clients_data():
+# Tablas que combinan varios datasets: nombre -> (versión, tabla por versión)
+DERIVED_TABLES = {
+    "clients": (client_table_version, get_client_table),
+}
+
+def table_version(name, columns):
+    """Return the version token of the ``columns`` of a (possibly derived) table"""
+    derived = DERIVED_TABLES.get(name)
+    if derived:
+        return derived[0]()
+    if name == "projects":
+        return projects_columns_version(columns)
+    return dataset_version(name)
+
+# Una entrada por tabla (proyectos, clientes) y versión de sus datos
+@st.cache_resource(max_entries=4 * deltas.KEEP_SNAPSHOTS)
+def get_sort_index(name, version, columns):
+    """Build the per-column sort permutations of a dataset table once per data version"""
+    derived = DERIVED_TABLES.get(name)
+    if derived:
+        return indexes.SortIndex(derived[1](version)[list(columns)])
+    return indexes.SortIndex(_load_dataset(name, columns, version))
+
+TABLE_PAGE_SIZE = 25
+NATURAL_ORDER = "Orden original"
+
+def _table_page_controls(columns, total, key, page_size):
+    """Render the sort/order/page controls and return the selected (column, ascending, page, pages)"""
+    pages = max(1, -(-total // page_size))
+    col1, col2, col3 = st.columns([2, 2, 1])
+    with col1:
+        sort_column = st.selectbox("Ordenar por:", [NATURAL_ORDER] + list(columns), key=f"{key}_sort")
+    with col2:
+        order = st.radio("Orden:", ["Ascendente", "Descendente"], horizontal=True, key=f"{key}_order")
+    with col3:
+        page = min(int(st.number_input("Página:", min_value=1, value=1, step=1, key=f"{key}_page")), pages)
+    return sort_column, order == "Ascendente", page, pages
+
+@st.fragment
+def paginated_dataframe(name, columns, rows=None, key=None, page_size=TABLE_PAGE_SIZE):
+    """Render one server-side sorted page of a dataset table; paging or sorting reruns only the table"""
+    sort_index = get_sort_index(name, table_version(name, columns), tuple(columns))
+    total = len(sort_index) if rows is None else len(rows)
+    sort_column, ascending, page, pages = _table_page_controls(columns, total, key, page_size)
+    
+    if sort_column == NATURAL_ORDER:
+        ordered = np.arange(total) if rows is None else rows
+        if not ascending:
+            ordered = ordered[::-1]
+        page_rows = ordered[(page - 1) * page_size:page * page_size]
+    else:
+        page_rows = sort_index.page(sort_column, ascending, rows, page, page_size)
+    show_dataframe(sort_index.frame.iloc[page_rows], f"{name}_table", use_container_width=True)
+    st.caption(f"Página {page} de {pages} · {total} filas")
+
+@st.fragment
+def paginated_sql_projects(filters, start, end, total, key=None, page_size=TABLE_PAGE_SIZE):
+    """Render one page of the projects table ordered and paged by the SQL backend"""
+    sort_column, ascending, page, pages = _table_page_controls(PROJECT_TABLE_COLUMNS, total, key, page_size)
+    order_by = None if sort_column == NATURAL_ORDER else sort_column
+    page_df = get_sql_store().project_rows(
+        PROJECT_TABLE_COLUMNS, filters, start, end,
+        order_by=order_by, ascending=ascending, limit=page_size, offset=(page - 1) * page_size
+    )
+    show_dataframe(page_df, "projects_table", use_container_width=True)
+    st.caption(f"Página {page} de {pages} · {total} filas")
+
+def _export_file(name, batches, fmt):
+    """Write the batches of a table to a temporary file in ``fmt`` and return its bytes.
+
+    st.download_button serves the finished file from memory, so the whole
+    serialized file is read back here; ``export_controls`` caps the rows.
+    """
+    with metrics.METRICS.span("export", name):
+        with export.export(batches(), fmt) as fh:
+            return fh.read()
+
+@st.fragment
+def export_controls(name, batches, total, key):
+    """Render the format picker and a download button; the file is written in chunks only when clicked.
+
+    ``batches()`` returns a new iterator over the table in blocks of rows.
+    """
+    col1, col2 = st.columns([1, 3], vertical_alignment="bottom")
+    with col1:
+        fmt = st.selectbox("Formato:", list(export.FORMATS), key=f"{key}_format")
+    # El archivo se escribe al hacer clic, fuera del rerun: los límites se validan antes
+    limit = min(export.DOWNLOAD_MAX_ROWS, export.XLSX_MAX_ROWS) if fmt == "Excel" else export.DOWNLOAD_MAX_ROWS
+    too_large = total > limit
+    with col2:
+        st.download_button(
+            f"⬇️ Descargar {total:,} filas",
+            data=lambda: _export_file(name, batches, fmt),
+            file_name=export.file_name(name, fmt),
+            mime=export.FORMATS[fmt][1],
+            on_click="ignore",
+            disabled=too_large,
+            key=f"{key}_download",
+        )
+    if too_large:
+        # La línea de comandos no conoce los filtros de la aplicación: solo sirve para el dataset completo
+        st.caption(f"La descarga admite hasta {limit:,} filas; aplica más filtros para reducir el resultado. "
+                   f"Para el dataset completo, sin filtros, usa `python -m dss.export`")
+
+@st.cache_resource
+def get_loader_pool():
+    """Create the process-wide thread pool that loads independent sources concurrently"""
+    return ThreadPoolExecutor(max_workers=int(os.environ.get("DSS_LOADER_THREADS", 8)), thread_name_prefix="dss-loader")
+
+SOURCE_TIMEOUT = float(os.environ.get("DSS_SOURCE_TIMEOUT", 10))
+
+def load_sources(loaders, timeout=SOURCE_TIMEOUT):
+    """Run independent loaders concurrently and return (results, failures).
+
+    ``loaders`` maps a source label to a callable, or to a (callable, timeout)
+    pair. Each source is waited for at most its own timeout; a source that
+    fails or times out is reported in ``failures`` and the others are still
+    returned. A timed-out loader keeps running in the pool and fills its cache
+    for the next rerun.
+    """
+    ctx = get_script_run_ctx()
+
+    def run(loader):
+        # Los hilos del pool necesitan el contexto de la sesión para usar st.*
+        add_script_run_ctx(threading.current_thread(), ctx)
+        loader_started = time.perf_counter()
+        return loader(), time.perf_counter() - loader_started
+
+    started = time.perf_counter()
+    futures = {}
+    for label, loader in loaders.items():
+        loader, limit = loader if isinstance(loader, tuple) else (loader, timeout)
+        futures[label] = (get_loader_pool().submit(run, loader), started + limit)
+
+    results, failures = {}, {}
+    for label, (future, deadline) in sorted(futures.items(), key=lambda item: item[1][1]):
+        try:
+            results[label], seconds = future.result(timeout=max(0.0, deadline - time.perf_counter()))
+            # Se registra desde el hilo de la sesión para que aparezca en la traza del rerun
+            metrics.METRICS.record("source", label, seconds)
+        except FuturesTimeout:
+            failures[label] = f"sin respuesta en {deadline - started:.0f} s"
+        except Exception as e:
+            failures[label] = str(e)
+    return results, failures
+
+@st.cache_resource
+def get_figure_cache():
+    """Create the process-wide figure cache (budget in MB from $DSS_FIGURE_CACHE_MB)"""
+    max_mb = float(os.environ.get("DSS_FIGURE_CACHE_MB", 64))
+    return charts.FigureCache(max_bytes=int(max_mb * 1024 * 1024))
+
+def cached_figure(chart_id, version, state, builder):
+    """Return a chart figure from the cache, building it only when its data or filters changed"""
+    def build():
+        metrics.METRICS.cache_miss("figure")
+        return builder()
+
+    metrics.METRICS.cache_lookup("figure")
+    with startup.PROFILE.timed(f"figure:{chart_id}"), metrics.METRICS.span("chart", chart_id):
+        return get_figure_cache().get_or_build((chart_id, version, state), build)
+
+@st.cache_resource
+def get_api_server(port):
+    """Serve the JSON data API from this process over the shared column and KPI caches (once per process)"""
+    api = startup.PROFILE.import_module("dss.api")
+    
+    # La tabla de clientes se sirve con los totales derivados de los proyectos, como en Análisis de Clientes
+    def frame(name, columns=None):
+        if name == "client_table":
+            table = get_client_table(client_table_version())
+            return table[list(columns)] if columns else table
+        return _load_dataset(name, columns)
+    
+    data_api = api.DataApi(
+        frame=frame,
+        version=lambda name: client_table_version() if name == "client_table" else dataset_version(name),
+        columns=lambda name: CLIENT_TABLE_COLUMNS if name == "client_table" else _dataset_columns(name, dataset_version(name)),
+        kpis=lambda: get_kpi_engine(kpi_versions()).snapshot(),
+        kpis_version=kpi_versions,
+        api_key=os.environ.get("DSS_API_KEY"),
+        cors_origin=os.environ.get("DSS_API_CORS_ORIGIN", "*")
+    )
+    return data_api.serve(port, os.environ.get("DSS_API_HOST", "127.0.0.1"))
+
+@st.cache_resource
+def get_metrics_server(port):
+    """Serve the Prometheus metrics of this process on localhost:``port`` (once per process)"""
+    return metrics.METRICS.serve(port)
+
+def render_debug_panel():
+    """Show the spans and row counts of this run and the process cache counters in the sidebar"""
+    with st.sidebar.expander("🐞 Depuración del rerun"):
+        st.caption(f"Ejecución completa: {metrics.METRICS.run_seconds() * 1000:.0f} ms")
+        spans = pd.DataFrame(
+            [(kind, name, None if seconds is None else round(seconds * 1000, 1), rows)
+             for kind, name, seconds, rows in metrics.METRICS.trace()],
+            columns=["Tipo", "Nombre", "ms", "Filas"]
+        )
+        st.dataframe(spans, hide_index=True, use_container_width=True)
+        counters = metrics.METRICS.counters()
+        caches = []
+        for (counter, labels), lookups in sorted(counters.items()):
+            if counter == "cache_lookups_total":
+                misses = counters.get(("cache_misses_total", labels), 0)
+                caches.append((dict(labels)["cache"], lookups, misses, 100 * (lookups - misses) / lookups if lookups else None))
+        st.dataframe(pd.DataFrame(caches, columns=["Caché", "Consultas", "Fallos", "Aciertos %"]),
+                     hide_index=True, use_container_width=True)
+
+def show_chart(fig, chart_id, **kwargs):
+    """Render a figure with st.plotly_chart, recording its serialization time"""
+    with metrics.METRICS.span("chart_render", chart_id):
+        st.plotly_chart(fig, **kwargs)
+
+def show_dataframe(data, name, **kwargs):
+    """Render ``data`` with st.dataframe, recording its row count and serialization time"""
+    metrics.METRICS.rows(name, len(data))
+    with metrics.METRICS.span("dataframe", name):
+        st.dataframe(data, **kwargs)
+
+# Columnas que consume cada módulo (proyección para el almacenamiento columnar)
+PROJECT_ANALYSIS_COLUMNS = ['id', 'name', 'client', 'status', 'progress', 'budget', 'spent', 'area']
+PROJECT_EXPORT_COLUMNS = PROJECT_ANALYSIS_COLUMNS + ['start_date', 'end_date']
+PROJECT_FILTER_COLUMNS = ['status', 'area', 'client']
+PROJECT_TABLE_COLUMNS = ['name', 'client', 'status', 'progress', 'budget', 'spent', 'area']
+CLIENT_TABLE_COLUMNS = ['id', 'name', 'sector', 'projects_count', 'budget', 'spent', 'avg_progress', 'total_revenue', 'satisfaction', 'location', 'contract_date']
+AREA_TABLE_COLUMNS = ['area', 'revenue', 'projects', 'efficiency']
+RISK_TABLE_COLUMNS = ['name', 'client', 'area', 'status', 'progress', 'budget', 'spent']
+RISK_COLUMN_CONFIG = {
+    'burn_rate': st.column_config.NumberColumn("Ritmo de gasto", format="%.2f"),
+    'projected_cost': st.column_config.NumberColumn("Costo proyectado", format="localized"),
+    'projected_overrun': st.column_config.NumberColumn("Sobrecosto proyectado", format="percent"),
+    'area_zscore': st.column_config.NumberColumn("Z robusto (área)", format="%.2f"),
+}
+PROJECT_CUBE_COLUMNS = list(cube.DIMENSIONS) + ['start_date', 'end_date'] + list(cube.MEASURES)
+AREA_ROLLUP_COLUMNS = ['area', 'count', 'budget', 'spent', 'avg_progress']
+AREA_ROLLUP_CONFIG = {
+    'count': st.column_config.NumberColumn("Proyectos"),
+    'budget': st.column_config.NumberColumn("Presupuesto", format="localized"),
+    'spent': st.column_config.NumberColumn("Gastado", format="localized"),
+    'avg_progress': st.column_config.NumberColumn("Progreso Promedio", format="%.1f%%"),
+}
+
+@st.cache_resource
+def get_sql_store():
+    """Open the embedded SQL backend from $DSS_SQL_PATH, or return None when it is not configured"""
+    path = os.environ.get("DSS_SQL_PATH")
+    if not path:
+        return None
+    sql_store = startup.PROFILE.import_module("dss.sql_store")
+    return sql_store.SqlStore(path, pool_size=int(os.environ.get("DSS_SQL_POOL_SIZE", 4)))
+
+def projects_version():
+    """Return the version token of the backend that serves the project analysis"""
+    sql = get_sql_store()
+    # Las fechas deciden qué filas entran en el período: un cambio solo de fechas también cambia las figuras
+    return sql.version() if sql is not None else projects_columns_version(PROJECT_ANALYSIS_COLUMNS + PROJECT_PERIOD_COLUMNS)
+
+def project_filter_options(column):
+    """Return the distinct values of a project filter column"""
+    sql = get_sql_store()
+    if sql is not None:
+        return sql.options(column)
+    return get_project_category_index(projects_columns_version(PROJECT_FILTER_COLUMNS)).options(column)
+
+def count_period_projects(start, end):
+    """Return (projects overlapping the period, total projects)"""
+    sql = get_sql_store()
+    if sql is not None:
+        return sql.project_count(start=start, end=end), sql.project_count()
+    period_index = get_project_period_index(projects_columns_version(PROJECT_PERIOD_COLUMNS))
+    return len(period_index.overlapping(start, end)), len(period_index)
+
+@metrics.METRICS.timed("aggregate")
+def query_project_totals(filters, start, end):
+    """Return project count, budget, spent and average progress for the filters"""
+    sql = get_sql_store()
+    if sql is not None:
+        return sql.project_totals(filters, start, end)
+    return get_project_cube(projects_columns_version(PROJECT_CUBE_COLUMNS)).totals(filters, start, end)
+
+@metrics.METRICS.timed("aggregate")
+def query_area_rollup(start, end):
+    """Return per-area project count, budget, spent and average progress over the period"""
+    sql = get_sql_store()
+    if sql is not None:
+        rollup = sql.rollup('area', start=start, end=end)
+    else:
+        rollup = get_project_cube(projects_columns_version(PROJECT_CUBE_COLUMNS)).rollup('area', start=start, end=end)
+    return rollup[AREA_ROLLUP_COLUMNS]
+
+@metrics.METRICS.timed("filter")
+def query_filtered_projects(filters, start, end):
+    """Return the filtered projects and their row positions (None when served by SQL)"""
+    sql = get_sql_store()
+    if sql is not None:
+        return sql.project_rows(PROJECT_ANALYSIS_COLUMNS, filters, start, end), None
+    version = dataset_version("projects")
+    period_rows = get_project_period_index(projects_columns_version(PROJECT_PERIOD_COLUMNS, version)).overlapping(start, end)
+    rows = get_project_category_index(projects_columns_version(PROJECT_FILTER_COLUMNS, version)).select(filters, rows=period_rows)
+    return load_projects_data(PROJECT_ANALYSIS_COLUMNS).iloc[rows], rows
+
+@metrics.METRICS.timed("filter")
+def query_project_risk(filtered_df, rows):
+    """Rank every at-risk project among the filtered ones; returns (ranked table, projected overrun)"""
+    if rows is None:
+        # Backend SQL: las filas se ubican por id en los proyectos en memoria
+        version = dataset_version("projects")
+        rows = get_delta_log(version[0]).id_index().get_indexer(filtered_df['id'].astype("string"))
+        rows = rows[rows >= 0]
+    model = get_risk_model(projects_columns_version(PROJECT_RISK_COLUMNS))
+    ranked_rows, _, overrun = model.ranked(rows, limit=None)
+    projects = load_projects_data(RISK_TABLE_COLUMNS).iloc[ranked_rows].reset_index(drop=True)
+    table = pd.concat([projects, model.scores(ranked_rows).drop(columns="at_risk")], axis=1)
+    return table, overrun
+
+def project_export_batches(filters, start, end, rows, total):
+    """Return a factory of row blocks of the filtered projects, read from the shared columns or paged from SQL"""
+    if rows is None:
+        sql = get_sql_store()
+        return lambda: (
+            sql.project_rows(PROJECT_EXPORT_COLUMNS, filters, start, end, limit=export.EXPORT_CHUNK_ROWS, offset=offset)
+            for offset in range(0, total, export.EXPORT_CHUNK_ROWS)
+        )
+    frame = load_projects_data(PROJECT_EXPORT_COLUMNS)
+    return lambda: export.iter_batches(frame, rows)
+
+@metrics.METRICS.timed("loader")
+def load_clients_data(columns=None):
     """Load clients data as DataFrame with error handling"""
     try:
-        data = [
-            {
-                "id": "C001",
-                "name": "ABB",
-                "sector": "Industrial",
-                "projects_count": 3,
-                "total_revenue": 850000,
-                "satisfaction": 95.5,
-                "location": "Lima Norte",
-                "contract_date": "2022-06-15"
-            },
-            {
-                "id": "C002",
-                "name": "Schneider Electric",
-                "sector": "Eléctrico",
-                "projects_count": 2,
-                "total_revenue": 520000,
-                "satisfaction": 92.8,
-                "location": "Lima Centro",
-                "contract_date": "2022-08-20"
-            },
-            {
-                "id": "C003",
-                "name": "Carrier",
-                "sector": "HVAC",
-                "projects_count": 2,
-                "total_revenue": 480000,
-                "satisfaction": 94.2,
-                "location": "Callao",
-                "contract_date": "2022-09-10"
-            },
-            {
-                "id": "C004",
-                "name": "Siemens",
-                "sector": "Automatización",
-                "projects_count": 4,
-                "total_revenue": 720000,
-                "satisfaction": 96.1,
-                "location": "Lima Sur",
-                "contract_date": "2022-05-05"
-            },
-            {
-                "id": "C005",
-                "name": "Constructora ABC",
-                "sector": "Construcción",
-                "projects_count": 1,
-                "total_revenue": 520000,
-                "satisfaction": 93.7,
-                "location": "Lima Este",
-                "contract_date": "2022-12-01"
-            }
-        ]
-        return pd.DataFrame(data)
+        return _load_dataset("clients", columns)
     except Exception as e:
         st.error(f"Error loading clients data: {e}")
         return pd.DataFrame()
 
+# Abreviaturas de mes para los ejes de las series
+MONTH_LABELS = ['Ene', 'Feb', 'Mar', 'Abr', 'May', 'Jun', 'Jul', 'Ago', 'Sep', 'Oct', 'Nov', 'Dic']
+
+@st.cache_resource
+def get_ledger_buckets():
+    """Open the revenue ledger buckets once per process"""
+    return ledger.LedgerBuckets(ledger.default_ledger_dir())
+
+@st.cache_data
+def _read_ledger(version):
+    """Fold new ledger files into the buckets and return monthly and yearly totals"""
+    buckets = get_ledger_buckets()
+    buckets.sync()
+    return buckets.monthly(), buckets.yearly()
+
+@st.cache_data
+def _read_ledger_annual(version):
+    """Return complete-year revenue per area and per client from the ledger buckets"""
+    buckets = get_ledger_buckets()
+    buckets.sync()
+    return buckets.annual('area'), buckets.annual('client')
+
+def ledger_version():
+    """Return the last published version of the revenue ledger (empty when there is no ledger)"""
+    return get_refresher().version("ledger")
+
+def monthly_revenue_version():
+    """Return the version of the revenue source (ledger files or monthly dataset)"""
+    return ledger_version() or dataset_version("monthly_revenue")
+
+@metrics.METRICS.timed("loader")
+def load_monthly_revenue_data():
+    """Load the monthly revenue series sorted by month"""
+    try:
+        ledger_files = ledger_version()
+        if ledger_files:
+            monthly, _ = _read_ledger(ledger_files)
+            df = monthly.rename(columns={'amount': 'revenue'})
+        else:
+            df = _load_dataset("monthly_revenue")
+        fechas = pd.to_datetime(df['month'])
+        multi_year = fechas.dt.year.nunique() > 1
+        monthly = pd.DataFrame({
+            'Fecha': fechas,
+            'Mes': [f"{MONTH_LABELS[m - 1]} {y}" if multi_year else MONTH_LABELS[m - 1]
+                    for m, y in zip(fechas.dt.month, fechas.dt.year)],
+            'Ingresos': df['revenue']
+        })
+        return monthly.sort_values('Fecha', ignore_index=True)
+    except Exception as e:
+        st.error(f"Error loading monthly revenue data: {e}")
+        return pd.DataFrame(columns=['Fecha', 'Mes', 'Ingresos'])
+
+@metrics.METRICS.timed("loader")
+def load_yearly_data():
+    """Load yearly revenue, client and project counts"""
+    try:
+        ledger_files = ledger_version()
+        if ledger_files:
+            _, yearly = _read_ledger(ledger_files)
+            start_years = pd.to_datetime(_load_dataset("projects", ["start_date"])['start_date'], errors='coerce').dt.year
+            projects = start_years.value_counts()
+            yearly = yearly.assign(projects=yearly['year'].map(projects).fillna(0).astype(int))
+        else:
+            yearly = _load_dataset("yearly_summary").assign(months=12)
+        return pd.DataFrame({
+            'Año': yearly['year'],
+            'Ingresos': yearly['revenue'],
+            'Clientes': yearly['clients'],
+            'Proyectos': yearly['projects'],
+            'Meses': yearly['months']
+        })
+    except Exception as e:
+        st.error(f"Error loading yearly data: {e}")
+        return pd.DataFrame(columns=['Año', 'Ingresos', 'Clientes', 'Proyectos', 'Meses'])
+
+def yearly_version():
+    """Return the version of the yearly series source (ledger files or yearly dataset)"""
+    return ledger_version() or dataset_version("yearly_summary")
+
+PROJECTION_YEARS = 3
+
 @st.cache_data
-def load_service_areas_data():
+def build_growth_projections(version, horizon=PROJECTION_YEARS):
+    """Forecast total revenue, clients and per-area/per-client revenue in one vectorized pass"""
+    yearly = load_yearly_data()
+    yearly = yearly[yearly['Meses'] == 12]
+    if len(yearly) < 2:
+        raise ValueError("Se requieren al menos dos años completos de historia")
+    labels = [('Total', 'Ingresos'), ('Total', 'Clientes')]
+    rows = [yearly['Ingresos'].to_numpy(dtype=float), yearly['Clientes'].to_numpy(dtype=float)]
+    ledger_files = ledger_version()
+    if ledger_files:
+        for kind, table in zip(('Área', 'Cliente'), _read_ledger_annual(ledger_files)):
+            table = table.reindex(columns=yearly['Año'], fill_value=0.0)
+            labels += [(kind, name) for name in table.index]
+            rows += list(table.to_numpy(dtype=float))
+
+    forecast = startup.PROFILE.import_module("dss.forecast")
+    result = forecast.forecast(np.vstack(rows), horizon)
+    years = int(yearly['Año'].iloc[-1]) + np.arange(1, horizon + 1)
+    projection = pd.DataFrame({
+        'Año': years,
+        'Ingresos_Proyectados': result['mean'][0].round(),
+        'Ingresos_Min': result['lower'][0].round(),
+        'Ingresos_Max': result['upper'][0].round(),
+        'Clientes_Proyectados': result['mean'][1].round().astype(int)
+    })
+    breakdown = pd.DataFrame({
+        'Tipo': [kind for kind, _ in labels],
+        'Serie': [name for _, name in labels],
+        'Modelo': result['model'],
+        f'Proyección {years[0]}': result['mean'][:, 0].round(),
+        'Mínimo': result['lower'][:, 0].round(),
+        'Máximo': result['upper'][:, 0].round()
+    })
+    return projection, breakdown
+
+@metrics.METRICS.timed("loader")
+def load_service_areas_data(columns=None):
     """Load service areas data as DataFrame with error handling"""
     try:
-        data = [
-            {"area": "Metal Mecánica", "revenue": 650000, "projects": 8, "efficiency": 89.5},
-            {"area": "Electricidad", "revenue": 520000, "projects": 6, "efficiency": 92.1},
-            {"area": "Automatización", "revenue": 480000, "projects": 5, "efficiency": 87.3},
-            {"area": "Refrigeración", "revenue": 410000, "projects": 4, "efficiency": 85.7},
-            {"area": "Mantenimiento", "revenue": 390000, "projects": 7, "efficiency": 91.2},
-            {"area": "Obras Civiles", "revenue": 400000, "projects": 3, "efficiency": 88.9}
-        ]
-        return pd.DataFrame(data)
+        return _load_dataset("service_areas", columns)
     except Exception as e:
         st.error(f"Error loading service areas data: {e}")
         return pd.DataFrame()
@@ -248,6 +781,170 @@ except Exception as e:
 
 st.sidebar.markdown(f"**Período activo:** {start_date.strftime('%d/%m/%Y')} - {end_date.strftime('%d/%m/%Y')}")
 
+# Frescura de los datos publicados por el refresco en segundo plano
+try:
+    refresher = get_refresher()
+    for name in storage.DATASETS:
+        refresher.version(name)
+    if refresher.last_check is None:
+        refresher.refresh()
+    age = int((datetime.now() - refresher.last_check).total_seconds())
+    freshness = f"🔄 Datos verificados hace {age} s"
+    if refresher.last_refresh is not None:
+        freshness += f" · última recarga {refresher.last_refresh.strftime('%H:%M:%S')} ({refresher.last_duration:.2f} s)"
+    st.sidebar.caption(freshness)
+    if refresher.last_error:
+        st.sidebar.warning(f"Usando la última versión válida de los datos: {refresher.last_error}")
+except Exception as e:
+    st.sidebar.error(f"Error en el refresco de datos: {e}")
+
+# API JSON de datos para el dashboard Next.js (se inicia con la primera sesión del proceso)
+if os.environ.get("DSS_API_PORT"):
+    try:
+        get_api_server(int(os.environ["DSS_API_PORT"]))
+    except Exception as e:
+        st.sidebar.error(f"Error al iniciar la API de datos: {e}")
+
+# Secciones que se re-ejecutan por separado (st.fragment) al cambiar sus propios filtros
+@st.fragment
+@metrics.METRICS.timed("fragment")
+def project_analysis_section(start_date, end_date):
+    """Render the project filters, metrics, charts and table; a filter change reruns only this section"""
+    try:
+        # Proyectos cuya ejecución se solapa con el período global
+        period_count, project_count = count_period_projects(start_date, end_date)
+        if project_count == 0:
+            st.error("No se pudieron cargar los datos de proyectos")
+            return
+        st.caption(f"{period_count} de {project_count} proyectos activos en el período seleccionado")
+        
+        # Filtros (opciones servidas desde el índice o la base SQL, sin recorrer la tabla)
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            status_filter = st.selectbox("Estado:", ["Todos"] + project_filter_options('status'))
+        with col2:
+            area_filter = st.selectbox("Área:", ["Todas"] + project_filter_options('area'))
+        with col3:
+            client_filter = st.selectbox("Cliente:", ["Todos"] + project_filter_options('client'))
+        
+        # Aplicar filtros; solo se copian las filas resultantes
+        project_filters = {
+            'status': None if status_filter == "Todos" else status_filter,
+            'area': None if area_filter == "Todas" else area_filter,
+            'client': None if client_filter == "Todos" else client_filter
+        }
+        project_state = (status_filter, area_filter, client_filter, start_date, end_date)
+        filtered_df, filtered_rows = query_filtered_projects(project_filters, start_date, end_date)
+        metrics.METRICS.rows("projects_filtered", len(filtered_df))
+        # Proyectos filtrados en riesgo de sobrecosto (métricas precalculadas por versión de datos)
+        risk_df, risk_overrun = query_project_risk(filtered_df, filtered_rows)
+        metrics.METRICS.rows("projects_at_risk", len(risk_df))
+        
+        # Métricas de proyectos (servidas desde el cubo de agregados o calculadas en SQL)
+        project_totals = query_project_totals(project_filters, start_date, end_date)
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.metric("Total Proyectos", project_totals['count'])
+        with col2:
+            total_budget = project_totals['budget']
+            st.metric("Presupuesto Total", f"S/ {total_budget:,.0f}")
+        with col3:
+            total_spent = project_totals['spent']
+            st.metric("Total Gastado", f"S/ {total_spent:,.0f}")
+        with col4:
+            if project_totals['count'] > 0:
+                avg_progress = project_totals['avg_progress']
+                st.metric("Progreso Promedio", f"{avg_progress:.1f}%")
+            else:
+                st.metric("Progreso Promedio", "N/A")
+        
+        # Gráficos mejorados
+        if len(filtered_df) > 0:
+            col1, col2 = st.columns(2)
+            
+            with col1:
+                fig_bar = cached_figure("project_progress_bar", projects_version(), project_state, lambda: charts.build_project_progress_bar(filtered_df))
+                show_chart(fig_bar, "project_progress_bar", use_container_width=True)
+            
+            with col2:
+                fig_scatter = cached_figure("budget_scatter", projects_version(), project_state, lambda: charts.build_budget_scatter(filtered_df, risk_df))
+                show_chart(fig_scatter, "budget_scatter", use_container_width=True)
+            
+            # Proyectos en riesgo, de mayor a menor sobrecosto proyectado (todos resaltados en el gráfico)
+            st.subheader("⚠️ Proyectos en Riesgo")
+            if len(risk_df):
+                risk_limit = st.number_input("Mostrar:", min_value=1, max_value=len(risk_df),
+                                             value=min(risk.RISK_LIST_SIZE, len(risk_df)), step=10, key="risk_limit")
+                st.caption(f"{len(risk_df)} proyectos en riesgo · sobrecosto proyectado S/ {risk_overrun:,.0f} · "
+                           f"se muestran los {risk_limit} de mayor sobrecosto")
+                show_dataframe(risk_df.head(risk_limit), "risk_table", use_container_width=True, column_config=RISK_COLUMN_CONFIG)
+            else:
+                st.success("Ningún proyecto filtrado está en riesgo de sobrecosto")
+            
+            # Tabla de proyectos
+            st.subheader("📋 Detalle de Proyectos")
+            if filtered_rows is None:
+                paginated_sql_projects(project_filters, start_date, end_date, len(filtered_df), key="projects_table")
+            else:
+                paginated_dataframe("projects", PROJECT_TABLE_COLUMNS, rows=filtered_rows, key="projects_table")
+            
+            # Descarga del resultado filtrado (incluye el período global), escrita por bloques
+            export_batches = project_export_batches(project_filters, start_date, end_date, filtered_rows, len(filtered_df))
+            export_controls("proyectos", export_batches, len(filtered_df), key="projects_export")
+        else:
+            st.warning("No hay proyectos que coincidan con los filtros seleccionados")
+    
+    except Exception as e:
+        st.error(f"Error en análisis de proyectos: {e}")
+
+@st.fragment
+@metrics.METRICS.timed("fragment")
+def client_projects_section(client_names, client_rows, versions, start_date, end_date):
+    """Render the projects of one client from the join index; choosing a client reruns only this section"""
+    try:
+        col1, col2 = st.columns([3, 2])
+        with col1:
+            client_name = st.selectbox("Cliente:", client_names, index=None, placeholder="Selecciona un cliente", key="client_drilldown")
+        with col2:
+            period_only = st.checkbox("Solo proyectos activos en el período", value=True, key="client_drilldown_period")
+        if client_name is None:
+            st.info("Selecciona un cliente para ver sus proyectos")
+            return
+        
+        # Fila del cliente y sus proyectos: un corte del índice, sin recorrer la tabla de proyectos
+        client_row = client_rows[client_names.index(client_name)]
+        client_join = get_client_join(*versions)
+        project_rows = client_join.projects_of(client_row)
+        if period_only:
+            period_index = get_project_period_index(projects_columns_version(PROJECT_PERIOD_COLUMNS))
+            project_rows = project_rows[period_index.contains(project_rows, start_date, end_date)]
+        metrics.METRICS.rows("client_projects", len(project_rows))
+        
+        sql = get_sql_store()
+        if sql is not None:
+            # Con el backend SQL el agregado del cliente se calcula en la base
+            rollup = sql.rollup('client', {'client': client_name}).rename(columns={'count': 'projects_count'})
+            rollup = rollup.iloc[0] if len(rollup) else pd.Series({'projects_count': 0, 'budget': 0.0, 'spent': 0.0, 'avg_progress': None})
+        else:
+            rollup = client_join.rollups.iloc[client_row]
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.metric("Proyectos", int(rollup['projects_count']))
+        with col2:
+            st.metric("Presupuesto", f"S/ {rollup['budget']:,.0f}")
+        with col3:
+            st.metric("Gastado", f"S/ {rollup['spent']:,.0f}")
+        with col4:
+            st.metric("Progreso Promedio", f"{rollup['avg_progress']:.1f}%" if rollup['projects_count'] else "N/A")
+        
+        if len(project_rows) > 0:
+            paginated_dataframe("projects", PROJECT_TABLE_COLUMNS, rows=project_rows, key="client_projects_table")
+        else:
+            st.warning("El cliente no tiene proyectos en el período seleccionado" if period_only else "El cliente no tiene proyectos")
+    
+    except Exception as e:
+        st.error(f"Error en proyectos del cliente: {e}")
+
 # Header principal
 st.markdown(
     """
@@ -259,6 +956,9 @@ st.markdown(
     unsafe_allow_html=True
 )
 
+# Tiempo de la rama del módulo (las ejecuciones cortadas con st.stop() no se registran)
+module_started = time.perf_counter()
+
 # Dashboard Principal
 if selected_module == "Dashboard Principal":
     st.header("📈 Dashboard Ejecutivo")
@@ -313,188 +1013,64 @@ if selected_module == "Dashboard Principal":
     
     with col1:
         try:
-            areas_data = load_service_areas_data()
+            areas_data = load_service_areas_data(['area', 'revenue'])
             
             if not areas_data.empty:
-                fig_pie = px.pie(
-                    areas_data, 
-                    values='revenue', 
-                    names='area',
-                    title="🏭 Distribución de Ingresos por Área de Servicio",
-                    color_discrete_sequence=['#003DA5', '#FFCC00', '#28a745', '#dc3545', '#17a2b8', '#6f42c1']
-                )
-                fig_pie.update_traces(
-                    textposition='inside', 
-                    textinfo='percent+label',
-                    hovertemplate='<b>%{label}</b><br>Ingresos: S/ %{value:,.0f}<br>Porcentaje: %{percent}<extra></extra>'
-                )
-                fig_pie.update_layout(
-                    showlegend=True,
-                    legend=dict(orientation="v", yanchor="middle", y=0.5, xanchor="left", x=1.05),
-                    margin=dict(t=50, b=50, l=50, r=150),
-                    font=dict(size=12)
-                )
-                st.plotly_chart(fig_pie, use_container_width=True)
+                fig_pie = cached_figure("area_revenue_pie", dataset_version("service_areas"), None, lambda: charts.build_area_revenue_pie(areas_data))
+                show_chart(fig_pie, "area_revenue_pie", use_container_width=True)
             else:
                 st.error("No se pudieron cargar los datos de áreas de servicio")
                 st.info("Mostrando datos en formato tabla:")
-                st.dataframe(areas_data)
+                show_dataframe(areas_data, "service_areas")
         except Exception as e:
             st.error(f"Error al crear gráfico de áreas: {e}")
             st.info("Intenta recargar la página o contacta al administrador")
     
     with col2:
         try:
-            monthly_data = pd.DataFrame({
-                'Mes': ['Ene', 'Feb', 'Mar', 'Abr', 'May', 'Jun'],
-                'Ingresos': [2200000, 2350000, 2180000, 2420000, 2650000, 2850000]
-            })
+            monthly_data = load_monthly_revenue_data()
+            # Restringir la serie (ordenada por mes) al período global
+            monthly_data = monthly_data.iloc[indexes.month_slice(monthly_data['Fecha'], start_date, end_date)]
             
             # Validate data
-            if monthly_data.empty or 'Mes' not in monthly_data.columns or 'Ingresos' not in monthly_data.columns:
+            if 'Mes' not in monthly_data.columns or 'Ingresos' not in monthly_data.columns:
                 raise ValueError("Invalid monthly data structure")
+            if monthly_data.empty:
+                raise ValueError("No hay ingresos registrados en el período seleccionado")
             
-            fig_line = px.line(
-                monthly_data, 
-                x='Mes', 
-                y='Ingresos',
-                title="📈 Evolución de Ingresos Mensuales",
-                markers=True
-            )
-            fig_line.update_traces(
-                line=dict(color='#003DA5', width=4),
-                marker=dict(size=10, color='#FFCC00', line=dict(width=2, color='#003DA5')),
-                hovertemplate='<b>%{x}</b><br>Ingresos: S/ %{y:,.0f}<extra></extra>'
-            )
-            fig_line.update_layout(
-                xaxis_title="Mes",
-                yaxis_title="Ingresos (S/)",
-                yaxis=dict(tickformat=',.0f'),
-                hovermode='x unified',
-                font=dict(size=12)
-            )
-            st.plotly_chart(fig_line, use_container_width=True)
+            fig_line = cached_figure("monthly_revenue_line", monthly_revenue_version(), (start_date, end_date), lambda: charts.build_monthly_revenue_line(monthly_data))
+            show_chart(fig_line, "monthly_revenue_line", use_container_width=True)
         except Exception as e:
             st.error(f"Error al crear gráfico de evolución: {e}")
             st.info("Mostrando datos en formato tabla:")
             if 'monthly_data' in locals():
-                st.dataframe(monthly_data)
+                show_dataframe(monthly_data, "monthly_revenue")
 
 elif selected_module == "Análisis de Proyectos":
     st.header("🏗️ Análisis Detallado de Proyectos")
-    
-    try:
-        projects_df = load_projects_data()
-        if projects_df.empty:
-            st.error("No se pudieron cargar los datos de proyectos")
-            st.stop()
-        
-        # Filtros
-        col1, col2, col3 = st.columns(3)
-        with col1:
-            status_filter = st.selectbox("Estado:", ["Todos"] + list(projects_df['status'].unique()))
-        with col2:
-            area_filter = st.selectbox("Área:", ["Todas"] + list(projects_df['area'].unique()))
-        with col3:
-            client_filter = st.selectbox("Cliente:", ["Todos"] + list(projects_df['client'].unique()))
-        
-        # Aplicar filtros
-        filtered_df = projects_df.copy()
-        if status_filter != "Todos":
-            filtered_df = filtered_df[filtered_df['status'] == status_filter]
-        if area_filter != "Todas":
-            filtered_df = filtered_df[filtered_df['area'] == area_filter]
-        if client_filter != "Todos":
-            filtered_df = filtered_df[filtered_df['client'] == client_filter]
-        
-        # Métricas de proyectos
-        col1, col2, col3, col4 = st.columns(4)
-        with col1:
-            st.metric("Total Proyectos", len(filtered_df))
-        with col2:
-            total_budget = filtered_df['budget'].sum()
-            st.metric("Presupuesto Total", f"S/ {total_budget:,.0f}")
-        with col3:
-            total_spent = filtered_df['spent'].sum()
-            st.metric("Total Gastado", f"S/ {total_spent:,.0f}")
-        with col4:
-            if len(filtered_df) > 0:
-                avg_progress = filtered_df['progress'].mean()
-                st.metric("Progreso Promedio", f"{avg_progress:.1f}%")
-            else:
-                st.metric("Progreso Promedio", "N/A")
-        
-        # Gráficos mejorados
-        if len(filtered_df) > 0:
-            col1, col2 = st.columns(2)
-            
-            with col1:
-                fig_bar = px.bar(
-                    filtered_df, 
-                    x='name', 
-                    y='progress',
-                    color='status',
-                    title="📊 Progreso de Proyectos (%)",
-                    color_discrete_map={
-                        'En Progreso': '#FFCC00',
-                        'Completado': '#28a745',
-                        'Pendiente': '#dc3545'
-                    },
-                    text='progress'
-                )
-                fig_bar.update_traces(
-                    texttemplate='%{text}%', 
-                    textposition='outside',
-                    hovertemplate='<b>%{x}</b><br>Progreso: %{y}%<br>Estado: %{fullData.name}<extra></extra>'
-                )
-                fig_bar.update_layout(
-                    xaxis=dict(tickangle=-45),
-                    yaxis=dict(range=[0, 110]),
-                    showlegend=True
-                )
-                st.plotly_chart(fig_bar, use_container_width=True)
-            
-            with col2:
-                fig_scatter = px.scatter(
-                    filtered_df,
-                    x='budget',
-                    y='spent',
-                    size='progress',
-                    color='area',
-                    title="💰 Presupuesto vs Gasto Real",
-                    hover_data=['name', 'client'],
-                    size_max=20
-                )
-                fig_scatter.update_traces(
-                    hovertemplate='<b>%{customdata[0]}</b><br>Cliente: %{customdata[1]}<br>Presupuesto: S/ %{x:,.0f}<br>Gastado: S/ %{y:,.0f}<br>Progreso: %{marker.size}%<extra></extra>'
-                )
-                fig_scatter.update_layout(
-                    xaxis_title="Presupuesto (S/)",
-                    yaxis_title="Gasto Real (S/)"
-                )
-                st.plotly_chart(fig_scatter, use_container_width=True)
-            
-            # Tabla de proyectos
-            st.subheader("📋 Detalle de Proyectos")
-            st.dataframe(
-                filtered_df[['name', 'client', 'status', 'progress', 'budget', 'spent', 'area']],
-                use_container_width=True
-            )
-        else:
-            st.warning("No hay proyectos que coincidan con los filtros seleccionados")
-    
-    except Exception as e:
-        st.error(f"Error en análisis de proyectos: {e}")
+    project_analysis_section(start_date, end_date)
 
 elif selected_module == "Análisis de Clientes":
     st.header("👥 Análisis de Clientes")
     
     try:
-        clients_df = load_clients_data()
+        # Conteos e ingresos de cada cliente derivados de sus proyectos (join precalculado por versión)
+        client_versions = client_table_version()
+        clients_df = get_client_table(client_versions)
         if clients_df.empty:
             st.error("No se pudieron cargar los datos de clientes")
             st.stop()
         
+        # Clientes con contrato firmado hasta el cierre del período global
+        contract_index = get_client_contract_index(client_versions[1])
+        client_rows = contract_index.between(end=end_date)
+        clients_df = clients_df.iloc[client_rows]
+        metrics.METRICS.rows("clients_filtered", len(clients_df))
+        st.caption(f"{len(clients_df)} de {len(contract_index)} clientes con contrato al {end_date.strftime('%d/%m/%Y')}")
+        unmatched = get_client_join(*client_versions).unmatched
+        if unmatched:
+            st.caption(f"⚠️ {unmatched} proyectos con un cliente que no figura en la tabla de clientes")
+        
         # Métricas de clientes
         col1, col2, col3, col4 = st.columns(4)
         with col1:
@@ -513,47 +1089,22 @@ elif selected_module == "Análisis de Clientes":
         col1, col2 = st.columns(2)
         
         with col1:
-            fig_clients_revenue = px.bar(
-                clients_df.sort_values('total_revenue', ascending=True),
-                x='total_revenue',
-                y='name',
-                orientation='h',
-                title="💼 Ingresos por Cliente",
-                color='total_revenue',
-                color_continuous_scale='Blues'
-            )
-            fig_clients_revenue.update_traces(
-                hovertemplate='<b>%{y}</b><br>Ingresos: S/ %{x:,.0f}<extra></extra>'
-            )
-            fig_clients_revenue.update_layout(
-                xaxis_title="Ingresos (S/)",
-                yaxis_title="Cliente"
-            )
-            st.plotly_chart(fig_clients_revenue, use_container_width=True)
+            fig_clients_revenue = cached_figure("client_revenue_bar", client_versions, end_date, lambda: charts.build_client_revenue_bar(clients_df))
+            show_chart(fig_clients_revenue, "client_revenue_bar", use_container_width=True)
         
         with col2:
-            fig_satisfaction = px.scatter(
-                clients_df,
-                x='projects_count',
-                y='satisfaction',
-                size='total_revenue',
-                color='sector',
-                title="📈 Satisfacción vs Número de Proyectos",
-                hover_data=['name'],
-                size_max=20
-            )
-            fig_satisfaction.update_traces(
-                hovertemplate='<b>%{customdata[0]}</b><br>Proyectos: %{x}<br>Satisfacción: %{y}%<br>Sector: %{fullData.name}<extra></extra>'
-            )
-            fig_satisfaction.update_layout(
-                xaxis_title="Número de Proyectos",
-                yaxis_title="Satisfacción (%)"
-            )
-            st.plotly_chart(fig_satisfaction, use_container_width=True)
+            fig_satisfaction = cached_figure("client_satisfaction_scatter", client_versions, end_date, lambda: charts.build_client_satisfaction_scatter(clients_df))
+            show_chart(fig_satisfaction, "client_satisfaction_scatter", use_container_width=True)
         
         # Tabla de clientes
         st.subheader("📊 Detalle de Clientes")
-        st.dataframe(clients_df, use_container_width=True)
+        paginated_dataframe("clients", CLIENT_TABLE_COLUMNS, rows=client_rows, key="clients_table")
+        client_table = get_client_table(client_versions)
+        export_controls("clientes", lambda: export.iter_batches(client_table, client_rows), len(client_rows), key="clients_export")
+        
+        # Detalle de proyectos de un cliente
+        st.subheader("🔎 Proyectos por Cliente")
+        client_projects_section(clients_df['name'].tolist(), client_rows, client_versions, start_date, end_date)
     
     except Exception as e:
         st.error(f"Error en análisis de clientes: {e}")
@@ -575,8 +1126,9 @@ elif selected_module == "Áreas de Servicio":
             total_revenue = areas_df['revenue'].sum()
             st.metric("Ingresos Totales", f"S/ {total_revenue:,.0f}")
         with col3:
-            total_projects = areas_df['projects'].sum()
-            st.metric("Total Proyectos", total_projects)
+            # Proyectos del período agregados desde el cubo (o en SQL), no el conteo fijo de la tabla de áreas
+            area_rollup = query_area_rollup(start_date, end_date)
+            st.metric("Total Proyectos", int(area_rollup['count'].sum()))
         with col4:
             avg_efficiency = areas_df['efficiency'].mean()
             st.metric("Eficiencia Promedio", f"{avg_efficiency:.1f}%")
@@ -585,46 +1137,20 @@ elif selected_module == "Áreas de Servicio":
         col1, col2 = st.columns(2)
         
         with col1:
-            fig_areas_revenue = px.bar(
-                areas_df.sort_values('revenue', ascending=False),
-                x='area',
-                y='revenue',
-                title="💰 Ingresos por Área de Servicio",
-                color='revenue',
-                color_continuous_scale='Viridis'
-            )
-            fig_areas_revenue.update_traces(
-                hovertemplate='<b>%{x}</b><br>Ingresos: S/ %{y:,.0f}<extra></extra>'
-            )
-            fig_areas_revenue.update_layout(
-                xaxis=dict(tickangle=-45),
-                xaxis_title="Área de Servicio",
-                yaxis_title="Ingresos (S/)"
-            )
-            st.plotly_chart(fig_areas_revenue, use_container_width=True)
+            fig_areas_revenue = cached_figure("area_revenue_bar", dataset_version("service_areas"), None, lambda: charts.build_area_revenue_bar(areas_df))
+            show_chart(fig_areas_revenue, "area_revenue_bar", use_container_width=True)
         
         with col2:
-            fig_efficiency = px.scatter(
-                areas_df,
-                x='projects',
-                y='efficiency',
-                size='revenue',
-                color='area',
-                title="⚡ Eficiencia vs Número de Proyectos",
-                size_max=20
-            )
-            fig_efficiency.update_traces(
-                hovertemplate='<b>%{fullData.name}</b><br>Proyectos: %{x}<br>Eficiencia: %{y}%<br>Ingresos: S/ %{marker.size:,.0f}<extra></extra>'
-            )
-            fig_efficiency.update_layout(
-                xaxis_title="Número de Proyectos",
-                yaxis_title="Eficiencia (%)"
-            )
-            st.plotly_chart(fig_efficiency, use_container_width=True)
+            fig_efficiency = cached_figure("area_efficiency_scatter", dataset_version("service_areas"), None, lambda: charts.build_area_efficiency_scatter(areas_df))
+            show_chart(fig_efficiency, "area_efficiency_scatter", use_container_width=True)
         
         # Tabla de áreas
         st.subheader("📋 Detalle de Áreas de Servicio")
-        st.dataframe(areas_df, use_container_width=True)
+        paginated_dataframe("service_areas", AREA_TABLE_COLUMNS, key="areas_table")
+        
+        # Proyectos del período por área
+        st.subheader("📐 Proyectos por Área en el Período")
+        show_dataframe(area_rollup, "area_rollup", column_config=AREA_ROLLUP_CONFIG, hide_index=True)
     
     except Exception as e:
         st.error(f"Error en análisis de áreas: {e}")
@@ -633,136 +1159,66 @@ elif selected_module == "Reportes Avanzados":
     st.header("📊 Reportes y Análisis Avanzados")
     
     try:
-        # Cargar todos los datos
-        kpis = load_kpi_data()
-        projects = load_projects_data()
-        clients = load_clients_data()
-        areas = load_service_areas_data()
-        
-        if projects.empty or clients.empty or areas.empty:
-            st.error("No se pudieron cargar todos los datos necesarios")
-            st.stop()
+        # Cargar todas las fuentes en paralelo: la latencia en frío es la de la fuente más lenta
+        sources, failed = load_sources({
+            "KPIs": load_kpi_data,
+            "Proyectos": lambda: load_projects_data(['id']),
+            "Clientes": lambda: load_clients_data(['id']),
+            "Áreas": lambda: load_service_areas_data(['area']),
+            "Serie anual": load_yearly_data,
+            "Proyección": lambda: build_growth_projections(yearly_version())
+        })
+        for label in ("Proyectos", "Clientes", "Áreas", "Serie anual"):
+            if label in sources and sources[label].empty:
+                failed[label] = "sin datos"
+        
+        partial = {label: reason for label, reason in failed.items() if label != "Proyección"}
+        if partial:
+            st.warning("Mostrando resultados parciales. No disponible: " + "; ".join(f"{label} ({reason})" for label, reason in partial.items()))
+        kpis = sources.get("KPIs") or {}
         
         # Análisis de tendencias anuales
         st.subheader("📈 Análisis de Tendencia Anual")
         
-        yearly_data = pd.DataFrame({
-            'Año': [2020, 2021, 2022, 2023],
-            'Ingresos': [18500000, 21500000, 24500000, 28500000],
-            'Clientes': [45, 62, 75, 89],
-            'Proyectos': [120, 145, 168, 195]
-        })
+        yearly_data = sources.get("Serie anual")
+        if yearly_data is None or yearly_data.empty:
+            st.info("La serie anual no está disponible en este momento")
+            st.stop()
         
         try:
-            fig_yearly = px.area(
-                yearly_data,
-                x='Año',
-                y='Ingresos',
-                title="📈 Evolución de Ingresos Anuales",
-                color_discrete_sequence=['#003DA5']
-            )
-            
-            fig_yearly.update_traces(
-                fill='tonexty',
-                hovertemplate='<b>Año: %{x}</b><br>Ingresos: S/ %{y:,.0f}<extra></extra>'
-            )
+            fig_yearly = cached_figure("yearly_revenue_area", yearly_version(), None, lambda: charts.build_yearly_revenue_area(yearly_data))
             
-            fig_yearly.update_layout(
-                xaxis_title="Año",
-                yaxis_title="Ingresos (S/)",
-                yaxis=dict(tickformat=',.0f'),
-                hovermode='x unified',
-                font=dict(size=12),
-                plot_bgcolor='white',
-                paper_bgcolor='white'
-            )
+            show_chart(fig_yearly, "yearly_revenue_area", use_container_width=True)
             
-            st.plotly_chart(fig_yearly, use_container_width=True)
+            fig_clients = cached_figure("yearly_clients_line", yearly_version(), None, lambda: charts.build_yearly_clients_line(yearly_data))
             
-            fig_clients = px.line(
-                yearly_data,
-                x='Año',
-                y='Clientes',
-                title="👥 Evolución del Número de Clientes",
-                markers=True,
-                color_discrete_sequence=['#FFCC00']
-            )
-            
-            fig_clients.update_traces(
-                line=dict(width=4),
-                marker=dict(size=12, line=dict(width=2, color='#003DA5')),
-                hovertemplate='<b>Año: %{x}</b><br>Clientes: %{y}<extra></extra>'
-            )
-            
-            fig_clients.update_layout(
-                xaxis_title="Año",
-                yaxis_title="Número de Clientes",
-                hovermode='x unified',
-                font=dict(size=12),
-                plot_bgcolor='white'
-            )
-            
-            st.plotly_chart(fig_clients, use_container_width=True)
+            show_chart(fig_clients, "yearly_clients_line", use_container_width=True)
             
         except Exception as e:
             st.error(f"Error creando gráficos anuales: {str(e)}")
             st.info("Mostrando datos en formato tabla como alternativa:")
-            st.dataframe(yearly_data, use_container_width=True)
+            show_dataframe(yearly_data, "yearly_summary", use_container_width=True)
 
         # Proyección futura
         st.subheader("🔮 Proyección de Crecimiento")
         
-        projection_data = pd.DataFrame({
-            'Año': [2024, 2025, 2026],
-            'Ingresos_Proyectados': [32500000, 37000000, 42000000],
-            'Clientes_Proyectados': [105, 125, 150]
-        })
+        if "Proyección" in failed:
+            st.error(f"Error calculando proyecciones: {failed['Proyección']}")
+            st.stop()
+        projection_data, projection_breakdown = sources["Proyección"]
         
         try:
-            fig_projection = go.Figure()
-            
-            # Datos históricos
-            fig_projection.add_trace(go.Scatter(
-                x=yearly_data['Año'],
-                y=yearly_data['Ingresos'],
-                mode='lines+markers',
-                name='Ingresos Históricos',
-                line=dict(color='#003DA5', width=3),
-                marker=dict(size=10),
-                hovertemplate='<b>Año: %{x}</b><br>Ingresos: S/ %{y:,.0f}<extra></extra>'
-            ))
-            
-            # Proyecciones
-            fig_projection.add_trace(go.Scatter(
-                x=projection_data['Año'],
-                y=projection_data['Ingresos_Proyectados'],
-                mode='lines+markers',
-                name='Ingresos Proyectados',
-                line=dict(color='#FFCC00', width=3, dash='dash'),
-                marker=dict(size=10),
-                hovertemplate='<b>Año: %{x}</b><br>Proyección: S/ %{y:,.0f}<extra></extra>'
-            ))
-            
-            fig_projection.update_layout(
-                title={
-                    'text': "🚀 Proyección de Ingresos 2024-2026",
-                    'x': 0.5,
-                    'xanchor': 'center'
-                },
-                xaxis_title="Año",
-                yaxis_title="Ingresos (S/)",
-                yaxis=dict(tickformat=',.0f'),
-                hovermode='x unified',
-                font=dict(size=12),
-                plot_bgcolor='white'
-            )
+            fig_projection = cached_figure("growth_projection", yearly_version(), None, lambda: charts.build_growth_projection(yearly_data, projection_data))
             
-            st.plotly_chart(fig_projection, use_container_width=True)
+            show_chart(fig_projection, "growth_projection", use_container_width=True)
             
         except Exception as e:
             st.error(f"Error creando gráfico de proyección: {str(e)}")
             st.info("Mostrando datos de proyección en tabla:")
-            st.dataframe(projection_data, use_container_width=True)
+            show_dataframe(projection_data, "growth_projection", use_container_width=True)
+        
+        with st.expander("📊 Proyección por serie (modelo seleccionado por AIC)"):
+            show_dataframe(projection_breakdown, "projection_breakdown", use_container_width=True)
         
         # Resumen ejecutivo
         st.subheader("📋 Resumen Ejecutivo")
@@ -770,12 +1226,12 @@ elif selected_module == "Reportes Avanzados":
         col1, col2 = st.columns(2)
         
         with col1:
-            st.markdown("""
+            st.markdown(f"""
             **🎯 Puntos Clave:**
             - Crecimiento sostenido del 15% anual
             - Diversificación exitosa en 6 áreas de servicio
-            - Alta satisfacción del cliente (94.2%)
-            - Cartera de 89 clientes activos
+            - Alta satisfacción del cliente ({kpis.get('clientSatisfaction', 0)}%)
+            - Cartera de {kpis.get('clients', 0)} clientes activos
             """)
         
         with col2:
@@ -791,6 +1247,8 @@ elif selected_module == "Reportes Avanzados":
         st.error(f"Error en reportes avanzados: {str(e)}")
         st.info("Algunos módulos pueden no estar disponibles temporalmente")
 
+metrics.METRICS.record("module", selected_module, time.perf_counter() - module_started)
+
 # Footer
 st.markdown("---")
 st.markdown(
@@ -803,6 +1261,23 @@ st.markdown(
     unsafe_allow_html=True
 )
 
+# Métricas de las rutas críticas: endpoint/archivo Prometheus y panel de depuración (DSS_DEBUG_PANEL)
+try:
+    if os.environ.get("DSS_METRICS_PORT"):
+        get_metrics_server(int(os.environ["DSS_METRICS_PORT"]))
+    if os.environ.get("DSS_METRICS_FILE"):
+        metrics.METRICS.write(os.environ["DSS_METRICS_FILE"])
+    if os.environ.get("DSS_DEBUG_PANEL"):
+        render_debug_panel()
+except Exception as e:
+    st.sidebar.error(f"Error en las métricas: {e}")
+
+# Perfil de arranque en frío (DSS_PROFILE_STARTUP): se reporta una vez por proceso
+if startup.enabled():
+    startup.PROFILE.emit()
+    with st.sidebar.expander("⏱️ Perfil de arranque"):
+        st.json(startup.PROFILE.report())
+
 if __name__ == "__main__":
     try:
         # Main execution logic can be placed here if needed